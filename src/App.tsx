@@ -39,14 +39,39 @@ const MOCK_CATEGORIES = [
 // API Configuration
 const API_BASE_URL = 'http://localhost:5000/api';
 
-// API functions
-const scanImage = async (imageData: string): Promise<Finding[]> => {
+// Live mode streams frames over a websocket; HTTP polling is the fallback
+const LIVE_WS_URL = `${API_BASE_URL.replace(/^http/, 'ws')}/live`;
+const LIVE_FRAME_INTERVAL = 250;
+
+// Frames wider than this are downscaled in the browser before upload; the server maps boxes back
+const MAX_UPLOAD_WIDTH = 1920;
+
+// Encode a frame as JPEG (much cheaper than PNG in the browser), downscaling wide captures
+const encodeFrame = (source: CanvasImageSource, width: number, height: number): Promise<{ blob: Blob; scale: number }> => {
+  const scale = Math.min(1, MAX_UPLOAD_WIDTH / width);
+  const canvas = document.createElement('canvas');
+  canvas.width = Math.round(width * scale);
+  canvas.height = Math.round(height * scale);
+  canvas.getContext('2d')?.drawImage(source, 0, 0, canvas.width, canvas.height);
+
+  return new Promise((resolve, reject) => {
+    canvas.toBlob(
+      blob => (blob ? resolve({ blob, scale }) : reject(new Error('Frame encoding failed'))),
+      'image/jpeg',
+      0.9,
+    );
+  });
+};
+
+// API functions (multipart uploads; the server also still accepts base64 JSON)
+// findingsId lets /redact-image reuse this scan instead of detecting again
+const scanImage = async (image: Blob): Promise<{ findings: Finding[]; findingsId?: string }> => {
+  const body = new FormData();
+  body.append('image', image);
+
   const response = await fetch(`${API_BASE_URL}/scan-image`, {
     method: 'POST',
-    headers: {
-      'Content-Type': 'application/json',
-    },
-    body: JSON.stringify({ image: imageData }),
+    body,
   });
 
   if (!response.ok) {
@@ -54,16 +79,18 @@ const scanImage = async (imageData: string): Promise<Finding[]> => {
   }
 
   const data = await response.json();
-  return data.findings || [];
+  return { findings: data.findings || [], findingsId: data.findingsId };
 };
 
-const scanFrameData = async (frameData: string): Promise<Finding[]> => {
+const scanFrameData = async (frame: Blob, scale: number, sessionId?: string): Promise<Finding[]> => {
+  const body = new FormData();
+  body.append('image', frame, 'frame.jpg');
+  body.append('scale', String(scale));
+  if (sessionId) body.append('sessionId', sessionId);
+
   const response = await fetch(`${API_BASE_URL}/scan-frame`, {
     method: 'POST',
-    headers: {
-      'Content-Type': 'application/json',
-    },
-    body: JSON.stringify({ frameData }),
+    body,
   });
 
   if (!response.ok) {
@@ -74,21 +101,30 @@ const scanFrameData = async (frameData: string): Promise<Finding[]> => {
   return data.findings || [];
 };
 
-const redactImage = async (imageData: string, method: 'blackout' | 'blur' = 'blackout'): Promise<string> => {
+// Returns an object URL for the redacted PNG (sent back as raw bytes, not a data URL)
+const redactImage = async (
+  image: Blob,
+  method: 'blackout' | 'blur' | 'pixelate' = 'blackout',
+  findingsId?: string,
+): Promise<string> => {
+  const body = new FormData();
+  body.append('image', image);
+  body.append('method', method);
+  if (findingsId) body.append('findingsId', findingsId);
+
   const response = await fetch(`${API_BASE_URL}/redact-image`, {
     method: 'POST',
     headers: {
-      'Content-Type': 'application/json',
+      'Accept': 'image/png',
     },
-    body: JSON.stringify({ image: imageData, method }),
+    body,
   });
 
   if (!response.ok) {
     throw new Error(`API Error: ${response.statusText}`);
   }
 
-  const data = await response.json();
-  return data.redactedImage;
+  return URL.createObjectURL(await response.blob());
 };
 
 function App() {
@@ -111,6 +147,10 @@ function App() {
   const fileInputRef = useRef<HTMLInputElement>(null);
   const streamRef = useRef<MediaStream | null>(null);
   const scanIntervalRef = useRef<number | null>(null);
+  const sessionIdRef = useRef<string | null>(null);
+  const sourceBlobRef = useRef<Blob | null>(null);
+  const findingsIdRef = useRef<string | undefined>(undefined);
+  const socketRef = useRef<WebSocket | null>(null);
 
   const updateState = (updates: Partial<AppState>) => {
     setState(prev => ({ ...prev, ...updates }));
@@ -135,12 +175,14 @@ function App() {
       canvas.height = img.height;
       ctx.drawImage(img, 0, 0);
 
-      // Convert canvas to base64 for API
-      const imageData = canvas.toDataURL('image/png');
-      setOriginalImageData(imageData);
+      // Send the file's own bytes; no re-encoding in the browser
+      sourceBlobRef.current = file;
+      findingsIdRef.current = undefined;
+      setOriginalImageData(img.src);
 
       try {
-        const findings = await scanImage(imageData);
+        const { findings, findingsId } = await scanImage(file);
+        findingsIdRef.current = findingsId;
         updateState({ findings, isScanning: false });
         renderOverlay();
       } catch (error) {
@@ -161,6 +203,7 @@ function App() {
       });
 
       streamRef.current = stream;
+      sessionIdRef.current = crypto.randomUUID();
       updateState({ mode: 'live', isStreaming: true });
 
       const video = videoRef.current;
@@ -169,22 +212,29 @@ function App() {
       video.srcObject = stream;
       video.play();
 
-      const scanFrame = async () => {
+      // Draw the current video frame to the preview and encode it for upload
+      const captureFrame = async () => {
         const canvas = canvasRef.current;
-        if (!canvas || !video) return;
+        if (!canvas || !video) return null;
 
         const ctx = canvas.getContext('2d');
-        if (!ctx) return;
+        if (!ctx) return null;
 
         canvas.width = video.videoWidth || 1920;
         canvas.height = video.videoHeight || 1080;
         ctx.drawImage(video, 0, 0);
 
-        const frameData = canvas.toDataURL('image/png');
-        setOriginalImageData(frameData);
-        
+        const frame = await encodeFrame(video, canvas.width, canvas.height);
+        sourceBlobRef.current = frame.blob;
+        findingsIdRef.current = undefined;
+        return frame;
+      };
+
+      const scanFrame = async () => {
         try {
-          const findings = await scanFrameData(frameData);
+          const frame = await captureFrame();
+          if (!frame) return;
+          const findings = await scanFrameData(frame.blob, frame.scale, sessionIdRef.current ?? undefined);
           setState(prev => ({ ...prev, findings }));
           renderOverlay();
         } catch (error) {
@@ -193,11 +243,54 @@ function App() {
         }
       };
 
-      video.onloadedmetadata = () => {
-        // Start scanning frames every 2 seconds
-        scanIntervalRef.current = window.setInterval(scanFrame, 2000);
+      const startStreaming = () => {
+        const ws = new WebSocket(LIVE_WS_URL);
+        socketRef.current = ws;
+        let opened = false;
+        let sending = false;
+        let lastScale = 0;
+
+        ws.onopen = () => {
+          opened = true;
+          scanIntervalRef.current = window.setInterval(async () => {
+            // Skip this tick while the previous frame is still being encoded or sent;
+            // the server drops anything it can't keep up with
+            if (sending || ws.readyState !== WebSocket.OPEN || ws.bufferedAmount > 0) return;
+            sending = true;
+            try {
+              const frame = await captureFrame();
+              if (!frame) return;
+              if (frame.scale !== lastScale) {
+                ws.send(JSON.stringify({ scale: frame.scale }));
+                lastScale = frame.scale;
+              }
+              ws.send(frame.blob);
+            } catch (error) {
+              console.error('Frame send failed:', error);
+            } finally {
+              sending = false;
+            }
+          }, LIVE_FRAME_INTERVAL);
+        };
+
+        ws.onmessage = (event: MessageEvent<string>) => {
+          const data = JSON.parse(event.data);
+          setState(prev => ({ ...prev, findings: data.findings || [] }));
+          renderOverlay();
+        };
+
+        ws.onclose = () => {
+          if (socketRef.current !== ws) return;
+          socketRef.current = null;
+          if (!opened && streamRef.current) {
+            // No websocket support on the server: poll every 2 seconds instead
+            scanIntervalRef.current = window.setInterval(scanFrame, 2000);
+          }
+        };
       };
 
+      video.onloadedmetadata = startStreaming;
+
       stream.getVideoTracks()[0].onended = () => {
         stopScreenShare();
       };
@@ -220,8 +313,20 @@ function App() {
       scanIntervalRef.current = null;
     }
 
+    if (socketRef.current) {
+      const ws = socketRef.current;
+      socketRef.current = null;
+      ws.close();
+    }
+
+    if (sessionIdRef.current) {
+      fetch(`${API_BASE_URL}/scan-frame/${sessionIdRef.current}`, { method: 'DELETE' }).catch(() => {});
+      sessionIdRef.current = null;
+    }
+
     updateState({ mode: 'idle', isStreaming: false, findings: [] });
     setOriginalImageData(null);
+    sourceBlobRef.current = null;
 
     const canvas = canvasRef.current;
     if (canvas) {
@@ -294,17 +399,18 @@ function App() {
   };
 
   const exportRedacted = async () => {
-    if (!originalImageData) return;
+    if (!sourceBlobRef.current) return;
 
     try {
       // Get redacted image from backend
-      const redactedImageData = await redactImage(originalImageData, 'blackout');
+      const redactedImageUrl = await redactImage(sourceBlobRef.current, 'blackout', findingsIdRef.current);
       
       // Create download link
       const link = document.createElement('a');
       link.download = 'redacted-content.png';
-      link.href = redactedImageData;
+      link.href = redactedImageUrl;
       link.click();
+      setTimeout(() => URL.revokeObjectURL(redactedImageUrl), 0);
     } catch (error) {
       console.error('Export failed:', error);
       setApiError(error instanceof Error ? error.message : 'Export failed');
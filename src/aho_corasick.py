@@ -0,0 +1,75 @@
+from collections import deque
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+def is_token_edge(text: str, i: int) -> bool:
+    """False only when position i falls between two word characters (a match there cuts a token)."""
+    def word(c):
+        return c.isalnum() or c == "_"
+    return i <= 0 or i >= len(text) or not (word(text[i - 1]) and word(text[i]))
+
+class AhoCorasick:
+    """
+    Multi-pattern exact string matcher: finds every occurrence of every pattern in one
+    pass over the text, in O(len(text) + matches) after an O(total pattern length) build.
+    """
+
+    def __init__(self, patterns: Sequence[str]):
+        self.patterns = list(patterns)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+
+        for pi, pat in enumerate(self.patterns):
+            if not pat:
+                continue
+            node = 0
+            for ch in pat:
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                node = nxt
+            self._out[node].append(pi)
+
+        # breadth-first failure links; each node inherits the outputs of its failure node
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                queue.append(nxt)
+                f = self._fail[node]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[nxt] = self._goto[f].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, int]]:
+        """Yield (start, end, pattern_index) for every match, ordered by end position."""
+        goto, fail, out, patterns = self._goto, self._fail, self._out, self.patterns
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for pi in out[node]:
+                yield i + 1 - len(patterns[pi]), i + 1, pi
+
+    def iter_line_matches(self, texts: Sequence[str],
+                          edge: Optional[Callable[[str, int], bool]] = None) -> Iterator[Tuple[int, int, int, int]]:
+        """
+        Yield (text_index, start, end, pattern_index) for every match in each text, keeping
+        non-overlapping matches per pattern like re.finditer. With edge, a match counts only
+        when edge(text, start) and edge(text, end) both hold (e.g. is_token_edge).
+        """
+        for ti, text in enumerate(texts):
+            last_end = {}
+            for s, e, pi in sorted(self.iter_matches(text)):
+                if s < last_end.get(pi, 0):
+                    continue
+                if edge is not None and not (edge(text, s) and edge(text, e)):
+                    continue
+                last_end[pi] = e
+                yield ti, s, e, pi
@@ -1,19 +1,21 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, request, jsonify
 from flask_cors import CORS
 import base64
-import io
+import binascii
 import cv2
+import json
 import numpy as np
-from PIL import Image
-import tempfile
 import os
 import sys
+import threading
+from collections import OrderedDict
 
 # Add current directory to Python path to help with imports
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 try:
-    from detector import detector
+    # detector also provides the LLM backend singleton (its src.detectors import path is set up there)
+    from detector import detect_regions, get_backend
     print("✓ Successfully imported detector module")
 except ImportError as e:
     print(f"✗ Error importing detector: {e}")
@@ -21,7 +23,7 @@ except ImportError as e:
     sys.exit(1)
 
 try:
-    from hiding_data import blackout_regions, blur_regions
+    from hiding_data import redact_regions
     print("✓ Successfully imported hiding_data module")
 except ImportError as e:
     print(f"✗ Error importing hiding_data: {e}")
@@ -29,8 +31,105 @@ except ImportError as e:
     print("Rename 'hiding data.py' to 'hiding_data.py' if needed")
     sys.exit(1)
 
+from live_session import LiveSession
+from box_tracker import TrackedDetector
+from findings_store import findings_store
+from redactor import STYLES
+from classification_cache import classification_cache
+from warmup import warmup, WARMUP, WARMUP_OCR_WORKERS
+import metrics
+import ocr
+from live_stream import serve_live_stream
+from pipeline import cascade_stats
+
+try:
+    from flask_sock import Sock
+except ImportError:
+    Sock = None  # optional: /api/live websocket is disabled without flask-sock
+
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
+sock = Sock(app) if Sock else None
+
+# Live scanning sessions keyed by the client's sessionId (oldest evicted first)
+MAX_LIVE_SESSIONS = 32
+live_sessions = OrderedDict()
+live_sessions_lock = threading.Lock()
+
+# -------------------- metrics --------------------
+# Every HTTP request is one trace (see metrics.py); the websocket is traced per frame instead
+UNTRACED_ENDPOINTS = {'/api/metrics', '/api/live', '/api/health', '/api/ready'}
+
+@app.before_request
+def start_request_trace():
+    endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+    if endpoint not in UNTRACED_ENDPOINTS:
+        g.trace = metrics.start_trace(endpoint)
+
+@app.after_request
+def finish_request_trace(response):
+    trace = g.pop('trace', None)
+    if trace is not None:
+        metrics.finish_trace(trace, str(response.status_code))
+    return response
+
+@app.teardown_request
+def abort_request_trace(exc):
+    # only still open when the view raised past after_request
+    trace = g.pop('trace', None)
+    if trace is not None:
+        metrics.finish_trace(trace, 'error')
+
+@metrics.registry.add_collector
+def service_metrics():
+    """Counters other modules already keep, read at scrape time"""
+    llm = get_backend().status()
+    stored = findings_store.stats()
+    yield ('shareshield_llm_calls_total', 'counter', 'LLM calls by outcome',
+           [({'outcome': k}, v) for k, v in llm['calls'].items()])
+    yield ('shareshield_llm_retries_total', 'counter', 'LLM attempts retried', [({}, llm['retries'])])
+    yield ('shareshield_llm_seconds_total', 'counter', 'Time spent in LLM calls', [({}, llm['seconds'])])
+    yield ('shareshield_llm_circuit_open', 'gauge', '1 while the LLM circuit breaker rejects calls',
+           [({}, int(llm['circuit'] == 'open'))])
+    yield ('shareshield_cache_hits_total', 'counter', 'Cache lookups that hit',
+           [({'cache': 'classification'}, classification_cache.hits), ({'cache': 'findings'}, stored['hits'])])
+    yield ('shareshield_cache_misses_total', 'counter', 'Cache lookups that missed',
+           [({'cache': 'classification'}, classification_cache.misses), ({'cache': 'findings'}, stored['misses'])])
+    yield ('shareshield_findings_entries', 'gauge', 'Scan results kept for redaction', [({}, stored['entries'])])
+    yield ('shareshield_live_sessions', 'gauge', 'Open /api/scan-frame sessions', [({}, len(live_sessions))])
+    # span-mode cascade (pipeline.classify_text): lines settled per tier, and what became of the LLM call
+    cascade = cascade_stats.snapshot()
+    yield ('shareshield_cascade_lines_total', 'counter', 'Lines triaged by the detection cascade, by tier',
+           [({'tier': tier}, cascade.get(f'lines_{tier}', 0)) for tier in ('clean', 'sensitive', 'ambiguous')])
+    yield ('shareshield_cascade_llm_total', 'counter', 'Cascade LLM calls made, skipped (nothing ambiguous) or failed',
+           [({'outcome': outcome}, cascade.get(f'llm_{outcome}', 0))
+            for outcome in ('calls', 'skipped', 'circuit_open', 'failures')])
+
+def get_live_session(session_id):
+    """Return the LiveSession for a client, creating it if needed"""
+    with live_sessions_lock:
+        session = live_sessions.get(session_id)
+        if session is None:
+            session = LiveSession()
+            live_sessions[session_id] = session
+            while len(live_sessions) > MAX_LIVE_SESSIONS:
+                live_sessions.popitem(last=False)
+        else:
+            live_sessions.move_to_end(session_id)
+        return session
+
+IMAGE_MIMETYPES = {'png': 'image/png', 'jpeg': 'image/jpeg', 'jpg': 'image/jpeg', 'webp': 'image/webp'}
+
+class ImageDecodeError(ValueError):
+    """The uploaded bytes are not a decodable image (a client error, answered with 400)"""
+
+def decode_image_bytes(image_data):
+    """Decode PNG/JPEG/WebP bytes straight to a BGR OpenCV image"""
+    with metrics.span('decode'):
+        opencv_image = cv2.imdecode(np.frombuffer(image_data, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if opencv_image is None:
+        raise ImageDecodeError('Could not decode image data')
+    return opencv_image
 
 def convert_base64_to_image(base64_string):
     """Convert base64 string to OpenCV image"""
@@ -39,197 +138,295 @@ def convert_base64_to_image(base64_string):
         base64_string = base64_string.split(',')[1]
     
     # Decode base64
-    image_data = base64.b64decode(base64_string)
-    image = Image.open(io.BytesIO(image_data))
-    
-    # Convert PIL to OpenCV format
-    opencv_image = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
-    return opencv_image
+    try:
+        image_data = base64.b64decode(base64_string)
+    except (binascii.Error, TypeError) as e:
+        raise ImageDecodeError('Could not decode image data') from e
+    return decode_image_bytes(image_data)
+
+def read_request_image(json_field):
+    """
+    Read the uploaded image from the current request. Accepts, in order:
+    - multipart/form-data with the file in 'image' (or json_field), params as form fields
+    - a raw body with Content-Type image/* or application/octet-stream, params in the query string
+    - JSON with a base64 data URL in json_field (the original API)
+
+    Returns (opencv_image or None, params dict)
+    """
+    params = request.args.to_dict()
+    if request.files:
+        params.update(request.form.to_dict())
+        upload = request.files.get('image') or request.files.get(json_field)
+        if upload is None:
+            return None, params
+        return decode_image_bytes(upload.read()), params
+
+    if request.mimetype.startswith('image/') or request.mimetype == 'application/octet-stream':
+        body = request.get_data()
+        return (decode_image_bytes(body) if body else None), params
+
+    data = request.get_json(silent=True) or {}
+    params.update(data)
+    if json_field not in data:
+        return None, params
+    return convert_base64_to_image(data[json_field]), params
 
-def save_temp_image(opencv_image):
-    """Save OpenCV image to temporary file and return path"""
-    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.png')
-    cv2.imwrite(temp_file.name, opencv_image)
-    return temp_file.name
+def get_scale_hint(params):
+    """Client-side downscale factor of the uploaded frame (e.g. 0.5), 1.0 if not given"""
+    try:
+        scale = float(params.get('scale') or request.headers.get('X-Frame-Scale') or 1.0)
+    except (TypeError, ValueError):
+        return 1.0
+    return scale if 0 < scale <= 1.0 else 1.0
+
+def wants_binary_image(params):
+    """True if the client asked for raw image bytes instead of a base64 data URL"""
+    if params.get('response') == 'binary':
+        return True
+    best = request.accept_mimetypes.best_match(['application/json'] + list(IMAGE_MIMETYPES.values()))
+    return best is not None and best.startswith('image/')
+
+def parse_styles(styles):
+    """
+    Per-category styles from the client ({category: style}, as a dict or a JSON string).
+    Returns None when the value is not such a mapping; unknown styles are left for the
+    renderer, which falls back to the request's method.
+    """
+    if not styles:
+        return {}
+    if isinstance(styles, str):
+        try:
+            styles = json.loads(styles)
+        except ValueError:
+            return None
+    if not isinstance(styles, dict) or not all(isinstance(k, str) and isinstance(v, str)
+                                               for k, v in styles.items()):
+        return None
+    return styles
 
-def format_findings(sensitive_info, img_shape):
-    """Convert detector output to frontend format"""
+def format_findings(sensitive_info, img_shape, scale=1.0, labels=None):
+    """Convert detector output to frontend format, in the client's original (un-downscaled) pixels"""
     findings = []
+    labels = labels or ['sensitive_data'] * len(sensitive_info)
     
-    for i, (x, y, w, h) in enumerate(sensitive_info):
+    for i, ((x, y, w, h), label) in enumerate(zip(sensitive_info, labels)):
         findings.append({
             'id': str(i + 1),
-            'label': 'sensitive_data',  # Your detector returns coordinates, so we use generic label
+            'label': label or 'sensitive_data',  # category from detect_regions (regex kind at the flagged text's spot)
             'confidence': 0.9,  # Default confidence since your detector doesn't return this
-            'bbox': [int(x), int(y), int(w), int(h)],
+            'bbox': [int(x / scale), int(y / scale), int(round(w / scale)), int(round(h / scale))],
             'risk': 'high'  # Default to high risk for all detected items
         })
     
     return findings
 
+def get_categories(params):
+    """Categories to detect from the client's settings (a list of names); empty means all"""
+    categories = params.get('categories')
+    if not isinstance(categories, list) or not all(isinstance(c, str) for c in categories):
+        return []
+    return categories
+
+def detect_frame(opencv_image, session=None, categories=()):
+    """Shared detection core of /api/scan-frame and the /api/live stream"""
+    # An empty list detects ALL sensitive information
+    if session is None:
+        return detect_regions(list(categories), opencv_image)
+    # Incremental mode: only changed tiles are re-OCRed
+    with session.lock:
+        return detect_regions(list(categories), opencv_image, session=session)
+
 @app.route('/api/scan-image', methods=['POST'])
 def scan_image():
     try:
-        data = request.get_json()
+        # Multipart, raw bytes or base64 JSON
+        opencv_image, data = read_request_image('image')
         
-        if 'image' not in data:
+        if opencv_image is None:
             return jsonify({'error': 'No image data provided'}), 400
         
-        # Convert base64 to OpenCV image
-        opencv_image = convert_base64_to_image(data['image'])
-        
-        # Save to temporary file for detector
-        temp_path = save_temp_image(opencv_image)
-        
         try:
             # Run detection using your existing detector
             # Pass empty list to detect ALL sensitive information
-            print(f"Running detection on: {temp_path}")
-            img, sensitive_info = detector([], temp_path)  # Fixed: pass categories parameter
-            print(f"Detection found {len(sensitive_info)} sensitive items")
-            print(f"Sensitive info coordinates: {sensitive_info}")
+            img, sensitive_info, labels = detect_regions([], opencv_image)
+            metrics.debug(f"Detection found {len(sensitive_info)} sensitive items")
+            
+            # Keep the result so /api/redact-image on the same image skips detection
+            findings_id = findings_store.put(img, [], sensitive_info, labels)
             
             # Format findings for frontend
-            findings = format_findings(sensitive_info, img.shape)
+            findings = format_findings(sensitive_info, img.shape, get_scale_hint(data), labels)
             
-            return jsonify({'findings': findings})
+            return jsonify({'findings': findings, 'findingsId': findings_id})
             
         except PermissionError as pe:
-            print(f"Permission error in scan_image: {str(pe)}")
+            metrics.error('scan_image', pe)
             # Return empty findings instead of failing
             return jsonify({'findings': [], 'warning': 'API permission issue - detection skipped'})
             
         except Exception as detection_error:
-            print(f"Detection error in scan_image: {str(detection_error)}")
+            metrics.error('scan_image', detection_error)
             # Return empty findings instead of failing
-            return jsonify({'findings': [], 'warning': f'Detection failed: {str(detection_error)}'})
-            
-        finally:
-            # Clean up temporary file
-            if os.path.exists(temp_path):
-                try:
-                    os.unlink(temp_path)
-                except:
-                    pass  # Ignore cleanup errors
+            return jsonify({'findings': [], 'warning': f'Detection failed: {type(detection_error).__name__}'})
             
+    except ImageDecodeError:
+        return jsonify({'error': 'Could not decode image data'}), 400
+    
     except Exception as e:
-        print(f"Error in scan_image: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        return jsonify({'error': str(e)}), 500
+        metrics.error('scan_image', e)
+        return jsonify({'error': f'Internal error: {type(e).__name__}'}), 500
 
 @app.route('/api/scan-frame', methods=['POST'])
 def scan_frame():
     """Endpoint for real-time frame scanning"""
     try:
-        data = request.get_json()
+        # Multipart, raw bytes or base64 JSON
+        opencv_image, data = read_request_image('frameData')
         
-        if 'frameData' not in data:
+        if opencv_image is None:
             return jsonify({'error': 'No frame data provided'}), 400
         
-        # Convert base64 to OpenCV image
-        opencv_image = convert_base64_to_image(data['frameData'])
-        
-        # Save to temporary file for detector
-        temp_path = save_temp_image(opencv_image)
-        
         try:
             # Run detection using your existing detector
-            # Pass empty list to detect ALL sensitive information
-            img, sensitive_info = detector([], temp_path)  # Fixed: pass categories parameter
+            session_id = data.get('sessionId')
+            session = get_live_session(session_id) if session_id else None
+            img, sensitive_info, labels = detect_frame(opencv_image, session)
             
             # Format findings for frontend
-            findings = format_findings(sensitive_info, img.shape)
+            findings = format_findings(sensitive_info, img.shape, get_scale_hint(data), labels)
             
             return jsonify({'findings': findings})
             
         except PermissionError as pe:
-            print(f"Permission error in scan_frame: {str(pe)}")
+            metrics.error('scan_frame', pe)
             # Return empty findings instead of failing
             return jsonify({'findings': [], 'warning': 'API permission issue - detection skipped'})
             
         except Exception as detection_error:
-            print(f"Detection error in scan_frame: {str(detection_error)}")
+            metrics.error('scan_frame', detection_error)
             # Return empty findings instead of failing
-            return jsonify({'findings': [], 'warning': f'Detection failed: {str(detection_error)}'})
-            
-        finally:
-            # Clean up temporary file
-            if os.path.exists(temp_path):
-                try:
-                    os.unlink(temp_path)
-                except:
-                    pass  # Ignore cleanup errors
+            return jsonify({'findings': [], 'warning': f'Detection failed: {type(detection_error).__name__}'})
             
+    except ImageDecodeError:
+        return jsonify({'error': 'Could not decode image data'}), 400
+    
     except Exception as e:
-        print(f"Error in scan_frame: {str(e)}")
-        return jsonify({'error': str(e)}), 500
+        metrics.error('scan_frame', e)
+        return jsonify({'error': f'Internal error: {type(e).__name__}'}), 500
 
 @app.route('/api/redact-image', methods=['POST'])
 def redact_image():
     """Apply redaction to image and return redacted version"""
     try:
-        data = request.get_json()
+        # Multipart, raw bytes or base64 JSON
+        opencv_image, data = read_request_image('image')
         
-        if 'image' not in data:
+        if opencv_image is None:
             return jsonify({'error': 'No image data provided'}), 400
         
-        # Convert base64 to OpenCV image
-        opencv_image = convert_base64_to_image(data['image'])
+        # Apply redaction based on method using your existing functions
+        redaction_method = data.get('method', 'blackout')
+        if redaction_method not in STYLES:
+            redaction_method = 'blackout'
+        # Optional per-category styles, e.g. {"password": "blackout", "email": "blur"}
+        styles = parse_styles(data.get('styles'))
+        if styles is None:
+            return jsonify({'error': 'styles must be an object of category -> style'}), 400
         
-        # Save to temporary file
-        temp_input = save_temp_image(opencv_image)
-        temp_output = tempfile.NamedTemporaryFile(delete=False, suffix='.png').name
+        # Create empty categories dict to trigger detection of ALL sensitive info
+        categories = {}
         
         try:
-            # Apply redaction based on method using your existing functions
-            redaction_method = data.get('method', 'blackout')
-            
-            # Create empty categories dict to trigger detection of ALL sensitive info
-            categories = {}
-            
-            try:
-                if redaction_method == 'blur':
-                    output_path = blur_regions(temp_output, categories, temp_input)
-                else:
-                    output_path = blackout_regions(temp_output, categories, temp_input)
-
-                # Read the redacted image and convert back to base64
-                redacted_image = cv2.imread(output_path)
-                if redacted_image is None:
-                    # If the output file doesn't exist, use the input image
-                    redacted_image = opencv_image
-                
-            except (PermissionError, Exception) as redact_error:
-                print(f"Redaction failed: {str(redact_error)}")
-                # Return original image if redaction fails
-                redacted_image = opencv_image
+            # Findings from /api/scan-image of this exact image are reused (findingsId is
+            # optional; a handle from another image never matches)
+            stored = findings_store.get(opencv_image, [], data.get('findingsId'))
+            if stored is not None:
+                metrics.debug("Reusing stored findings, detection skipped")
+            redacted_image = redact_regions(categories, opencv_image, method=redaction_method,
+                                            findings=stored, styles=styles)
             
-            _, buffer = cv2.imencode('.png', redacted_image)
-            redacted_base64 = base64.b64encode(buffer).decode('utf-8')
-            
-            return jsonify({
-                'redactedImage': f'data:image/png;base64,{redacted_base64}'
-            })
-            
-        finally:
-            # Clean up temporary files
-            for path in [temp_input, temp_output]:
-                if os.path.exists(path):
-                    try:
-                        os.unlink(path)
-                    except:
-                        pass  # Ignore cleanup errors
+        except Exception as redact_error:
+            metrics.error('redact_image', redact_error)
+            # Never hand back the unredacted image as the export
+            return jsonify({'error': 'Redaction failed'}), 500
+        
+        # Encode straight from memory, in the requested format (png by default)
+        output_format = str(data.get('format', 'png')).lower()
+        if output_format not in IMAGE_MIMETYPES:
+            output_format = 'png'
+        with metrics.span('encode'):
+            _, buffer = cv2.imencode(f'.{output_format}', redacted_image)
+        
+        if wants_binary_image(data):
+            return Response(buffer.tobytes(), mimetype=IMAGE_MIMETYPES[output_format])
+        
+        redacted_base64 = base64.b64encode(buffer).decode('utf-8')
+        
+        return jsonify({
+            'redactedImage': f'data:{IMAGE_MIMETYPES[output_format]};base64,{redacted_base64}'
+        })
             
+    except ImageDecodeError:
+        return jsonify({'error': 'Could not decode image data'}), 400
+    
     except Exception as e:
-        print(f"Error in redact_image: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        return jsonify({'error': str(e)}), 500
+        metrics.error('redact_image', e)
+        return jsonify({'error': f'Internal error: {type(e).__name__}'}), 500
+
+def live_stream(ws):
+    """
+    Live sanitization over a websocket. The client sends frames as binary messages
+    (PNG/JPEG/WebP bytes) and optional JSON text messages with settings such as
+    {"scale": 0.5, "categories": ["email", "password"]}. The server always works on the newest frame, drops frames it can't
+    keep up with, and pushes {"findings": [...], "frame", "dropped", "latencyMs"} back.
+
+    Every frame is answered at tracking speed: the last detection's boxes are moved with
+    scrolled content, and detection re-runs in the background only when tracking loses
+    confidence ("tracking" carries that confidence).
+    """
+    session = LiveSession()
+    tracked = TrackedDetector(lambda img, categories: detect_frame(img, session, categories)[1:])
+
+    def process(frame, params):
+        with metrics.traced('/api/live'):
+            img = decode_image_bytes(frame)
+            result = tracked.process(img, tuple(get_categories(params)))
+        return {'findings': format_findings(result.boxes, img.shape, get_scale_hint(params), result.labels),
+                'tracking': round(result.confidence, 3)}
+
+    serve_live_stream(ws, process)
+
+if sock:
+    sock.route('/api/live')(live_stream)
+
+@app.route('/api/scan-frame/<session_id>', methods=['DELETE'])
+def end_scan_session(session_id):
+    """Drop the cached frame and OCR tokens of a live session"""
+    with live_sessions_lock:
+        live_sessions.pop(session_id, None)
+    return jsonify({'status': 'ok'})
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
-    return jsonify({'status': 'ok', 'message': 'ScreenGuard API is running'})
+    return jsonify({'status': 'ok', 'message': 'ScreenGuard API is running', 'llm': get_backend().status()})
+
+@app.route('/api/ready', methods=['GET'])
+def readiness_check():
+    """Readiness probe: 503 until warm-up has loaded OCR (engine and workers) and the LLM client"""
+    # WSGI servers never run __main__: the first probe starts warm-up (no-op once started)
+    status = warmup.start(WARMUP).status()
+    return jsonify(status), 200 if status['ready'] else 503
+
+@app.route('/api/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Stage timings, request latencies, LLM/cache/fallback counters in Prometheus text format"""
+    return Response(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+# -------------------- warm-up --------------------
+# Nothing heavy is created at import; these do the first use ahead of traffic. They run once
+# started: by the server entry point below, or by the first /api/ready probe.
+warmup.add('ocr', lambda: ocr.warm_up(workers=WARMUP_OCR_WORKERS))
+warmup.add('llm', lambda: get_backend().warm_up(), required=False)  # regex fallback covers it
 
 if __name__ == '__main__':
     print("=" * 50)
@@ -245,9 +442,12 @@ if __name__ == '__main__':
             print(f"✗ Missing: {file}")
     
     print("\nMake sure to install required packages:")
-    print("pip install flask flask-cors opencv-python pillow numpy")
-    print("Also ensure Tesseract OCR is installed and your Gemini API key is set in detector.py")
+    print("pip install flask flask-cors flask-sock opencv-python pillow numpy")
+    print("Also ensure Tesseract OCR is installed and GEMINI_API_KEY is set (exported or in .env)")
     print("\nServer starting on http://localhost:5000")
     print("=" * 50)
     
+    # under the debug reloader only the child (WERKZEUG_RUN_MAIN) serves; the watcher stays cold
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        warmup.start(WARMUP)
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
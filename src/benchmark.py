@@ -0,0 +1,286 @@
+# Offline benchmark and accuracy suite for the detection pipeline. Runs every stage of
+# detect_regions() on the synthetic corpus with the LLM backend stubbed (regex answers,
+# optional fixed latency) and writes one JSON report: per-stage latency percentiles,
+# throughput, peak RSS and box-level precision/recall against the planted secrets.
+#
+#   python benchmark.py --out bench.json
+#   python benchmark.py --resolutions 1920x1080 --repeat 3 --compare bench.json --max-regression 10
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import List, Optional, Tuple
+import numpy as np
+import cv2
+
+from detector import (MIN_CONF, OcrResult, classify_chunks, detect_regions, detect_spans, fallback_items,
+                      locate_items, ocr_frame)
+from classification_cache import classification_cache
+from ocr import OCR_WORKERS
+from ocr_engine import get_engine
+from redactor import render_redactions
+from synthetic_corpus import LAYOUTS, RESOLUTIONS, iter_samples, render
+from src.detectors.llm_backend import StubBackend, set_backend
+
+STAGES = ("ocr", "index", "classify", "locate", "render")
+COVER_FRACTION = 0.5    # share of a box that must be covered to count as a match
+MATCH_TOLERANCE = 0.4   # ground-truth boxes are grown by this share of their height (OCR ink boxes
+                        # include descenders and padding the cap-height ground truth doesn't)
+
+# -------------------- pipeline --------------------
+def run_stages(img: np.ndarray, categories):
+    """
+    The steps of detect_regions() one by one (no caches, no session).
+    Returns (seconds per stage, the frame's OcrResult, boxes, labels).
+    """
+    timings = {}
+    t0 = time.perf_counter()
+    ocr = ocr_frame(img)
+    t1 = time.perf_counter()
+    index = OcrResult(ocr, min_conf=MIN_CONF)
+    lines = index.texts
+    t2 = time.perf_counter()
+    items = []
+    if lines:
+        keys = {L.text: L.key[:2] for L in index.lines}
+        for chunk, result in classify_chunks(lines, categories, [keys.get(l) for l in lines]):
+            items.extend(fallback_items(chunk) if isinstance(result, Exception) else result)
+    t3 = time.perf_counter()
+    boxes, labels = locate_items(index, list(dict.fromkeys(items)))
+    t4 = time.perf_counter()
+    render_redactions(img.copy(), boxes, labels)
+    t5 = time.perf_counter()
+    for name, (a, b) in zip(STAGES, ((t0, t1), (t1, t2), (t2, t3), (t3, t4), (t4, t5))):
+        timings[name] = b - a
+    return timings, index, boxes, labels
+
+def label_mismatches(index: OcrResult, boxes, labels, categories) -> Tuple[int, int]:
+    """
+    Boxes found by both DETECTION_MODE=items (boxes, labels) and spans on the same OCR result,
+    and how many of them got a different category label: (compared, mismatched).
+    Reported alongside accuracy; per-category redaction styles rely on both modes labelling alike.
+    """
+    span_labels = dict(zip(*detect_spans(index, categories)))
+    pairs = [(label, span_labels[box]) for box, label in zip(boxes, labels) if box in span_labels]
+    return len(pairs), sum(a != b for a, b in pairs)
+
+# -------------------- accuracy --------------------
+def _coverage(target, boxes) -> float:
+    """Share of target's area covered by the union of boxes."""
+    x, y, w, h = (int(v) for v in target)
+    if w <= 0 or h <= 0:
+        return 0.0
+    covered = np.zeros((h, w), dtype=bool)
+    for bx, by, bw, bh in boxes:
+        x1, y1 = max(0, int(bx) - x), max(0, int(by) - y)
+        x2, y2 = min(w, int(bx + bw) - x), min(h, int(by + bh) - y)
+        if x2 > x1 and y2 > y1:
+            covered[y1:y2, x1:x2] = True
+    return float(covered.mean())
+
+def _grow(box, ratio: float):
+    x, y, w, h = box
+    pad = max(2, int(round(h * ratio)))
+    return (x - pad, y - pad, w + 2 * pad, h + 2 * pad)
+
+def score_boxes(predicted, planted) -> dict:
+    """
+    Box-level matching: a planted secret is found when predicted boxes cover at least
+    COVER_FRACTION of it; a predicted box is correct when at least COVER_FRACTION of it lies
+    on planted secrets (grown by MATCH_TOLERANCE).
+    """
+    truth = [_grow(p.box, MATCH_TOLERANCE) for p in planted]
+    found = [_coverage(p.box, predicted) >= COVER_FRACTION for p in planted]
+    correct = [_coverage(b, truth) >= COVER_FRACTION for b in predicted]
+    by_kind = defaultdict(lambda: [0, 0])
+    for p, hit in zip(planted, found):
+        by_kind[p.kind][0] += hit
+        by_kind[p.kind][1] += 1
+    return {"tp_boxes": sum(correct), "predicted": len(predicted),
+            "found": sum(found), "planted": len(planted), "by_kind": dict(by_kind)}
+
+def _ratio(a: int, b: int) -> Optional[float]:
+    return round(a / b, 4) if b else None
+
+def summarize_accuracy(scores: List[dict]) -> dict:
+    tp = sum(s["tp_boxes"] for s in scores)
+    pred = sum(s["predicted"] for s in scores)
+    found = sum(s["found"] for s in scores)
+    planted = sum(s["planted"] for s in scores)
+    precision, recall = _ratio(tp, pred), _ratio(found, planted)
+    kinds = defaultdict(lambda: [0, 0])
+    for s in scores:
+        for kind, (hit, total) in s["by_kind"].items():
+            kinds[kind][0] += hit
+            kinds[kind][1] += total
+    f1 = round(2 * precision * recall / (precision + recall), 4) if precision and recall else 0.0
+    return {"precision": precision, "recall": recall, "f1": f1,
+            "predicted_boxes": pred, "planted": planted,
+            "recall_by_kind": {k: _ratio(h, t) for k, (h, t) in sorted(kinds.items())}}
+
+# -------------------- reporting --------------------
+def percentiles(values_s: List[float]) -> dict:
+    ms = np.asarray(values_s, dtype=np.float64) * 1000
+    if not len(ms):
+        return {}
+    return {"n": int(len(ms)), "mean_ms": round(float(ms.mean()), 2),
+            **{f"p{p}_ms": round(float(np.percentile(ms, p)), 2) for p in (50, 90, 99)},
+            "max_ms": round(float(ms.max()), 2)}
+
+def peak_rss_mb() -> dict:
+    """Peak resident set size of this process and of its largest child (OCR pool workers)."""
+    try:
+        import resource
+    except ImportError:   # Windows
+        return {}
+    unit = 1 if sys.platform == "darwin" else 1024   # ru_maxrss is bytes on macOS, KiB elsewhere
+    return {who: round(resource.getrusage(flag).ru_maxrss * unit / 2**20, 1)
+            for who, flag in (("self", resource.RUSAGE_SELF), ("children", resource.RUSAGE_CHILDREN))}
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = ""
+    return {"commit": commit or None, "python": platform.python_version(), "platform": platform.platform(),
+            "cpus": os.cpu_count(), "opencv": cv2.__version__, "numpy": np.__version__,
+            "ocr_engine": type(get_engine()).__name__, "ocr_workers": OCR_WORKERS}
+
+def compare(baseline: dict, current: dict) -> dict:
+    """Relative change (%) of the headline numbers; positive latency = slower."""
+    def pct(a, b):
+        return round(100.0 * (b - a) / a, 1) if a else None
+    out = {"baseline_commit": baseline.get("env", {}).get("commit"), "latency_p50_pct": {}, "latency_p90_pct": {}}
+    for stage, cur in current["latency"].items():
+        base = baseline.get("latency", {}).get(stage)
+        if base and cur:
+            out["latency_p50_pct"][stage] = pct(base["p50_ms"], cur["p50_ms"])
+            out["latency_p90_pct"][stage] = pct(base["p90_ms"], cur["p90_ms"])
+    out["throughput_pct"] = pct(baseline.get("throughput_ips"), current["throughput_ips"])
+    for key in ("precision", "recall", "f1"):
+        a, b = baseline.get("accuracy", {}).get(key), current["accuracy"].get(key)
+        out[f"{key}_delta"] = round(b - a, 4) if a is not None and b is not None else None
+    return out
+
+# -------------------- driver --------------------
+def run(corpus: dict, repeat: int = 1, categories=(), quiet: bool = True) -> dict:
+    """corpus: iter_samples() arguments; screenshots are rendered on the fly, outside the timings."""
+    stage_times = defaultdict(list)
+    by_resolution = defaultdict(list)
+    by_layout = defaultdict(list)
+    scores = []
+    labels_compared = labels_mismatched = 0
+
+    sink = io.StringIO()
+    redirect = contextlib.redirect_stdout(sink) if quiet else contextlib.nullcontext()
+    with redirect:
+        # warm-up: OCR pool start, engine init, first-call allocations
+        (w, h), layout = corpus["resolutions"][0], corpus["layouts"][0]
+        run_stages(render(layout, w, h, -1).image, list(categories))
+        rss_floor = peak_rss_mb()
+        for r in range(repeat):
+            for sample in iter_samples(**corpus):
+                timings, index, boxes, labels = run_stages(sample.image, list(categories))
+                if r == 0:
+                    compared, mismatched = label_mismatches(index, boxes, labels, list(categories))
+                    labels_compared += compared
+                    labels_mismatched += mismatched
+                for name, dt in timings.items():
+                    stage_times[name].append(dt)
+                total = sum(timings.values())
+                stage_times["pipeline"].append(total)
+                h, w = sample.image.shape[:2]
+                by_resolution[f"{w}x{h}"].append(total)
+                by_layout[sample.layout].append(total)
+
+                # end to end through the real entry point, cold (no cached verdicts)
+                classification_cache.clear()
+                t0 = time.perf_counter()
+                _, boxes, _ = detect_regions(list(categories), sample.image)
+                stage_times["detect_regions"].append(time.perf_counter() - t0)
+                if r == 0:
+                    scores.append(score_boxes(boxes, sample.planted))
+                sink.seek(0)
+                sink.truncate()
+
+    e2e = stage_times["detect_regions"]
+    return {
+        "latency": {name: percentiles(v) for name, v in stage_times.items()},
+        "latency_by_resolution": {k: percentiles(v) for k, v in by_resolution.items()},
+        "latency_by_layout": {k: percentiles(v) for k, v in by_layout.items()},
+        "throughput_ips": round(len(e2e) / sum(e2e), 3) if sum(e2e) else None,
+        "peak_rss_mb": {**peak_rss_mb(), "after_warmup": rss_floor.get("self")},
+        "accuracy": {**summarize_accuracy(scores),
+                     "labels_compared": labels_compared, "label_mismatches": labels_mismatched},
+    }
+
+def _resolution(text: str):
+    w, h = text.lower().split("x")
+    return int(w), int(h)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark detection speed and accuracy on a synthetic corpus")
+    parser.add_argument("--out", help="write the JSON report here (default: stdout)")
+    parser.add_argument("--resolutions", nargs="*", type=_resolution, default=list(RESOLUTIONS))
+    parser.add_argument("--layouts", nargs="*", choices=LAYOUTS, default=list(LAYOUTS))
+    parser.add_argument("--per-layout", type=int, default=1, help="screenshots per layout and resolution")
+    parser.add_argument("--repeat", type=int, default=1, help="timed passes over the corpus")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="simulated model latency per request")
+    parser.add_argument("--compare", help="earlier report to compare against")
+    parser.add_argument("--max-regression", type=float,
+                        help="exit 1 if pipeline p50 got this many %% slower or recall dropped (needs --compare)")
+    parser.add_argument("--verbose", action="store_true", help="keep the pipeline's own logging")
+    args = parser.parse_args()
+
+    set_backend(StubBackend(latency_ms=args.llm_latency_ms))
+    corpus = {"resolutions": args.resolutions, "layouts": args.layouts,
+              "per_layout": args.per_layout, "seed": args.seed}
+    count = len(args.resolutions) * len(args.layouts) * args.per_layout
+    print(f"Benchmarking {count} screenshots x {args.repeat} pass(es)...", file=sys.stderr)
+
+    report = {
+        "env": environment(),
+        "config": {"seed": args.seed, "resolutions": [f"{w}x{h}" for w, h in args.resolutions],
+                   "layouts": args.layouts, "per_layout": args.per_layout, "repeat": args.repeat,
+                   "llm": "stub", "llm_latency_ms": args.llm_latency_ms},
+        **run(corpus, args.repeat, quiet=not args.verbose),
+    }
+
+    failed = False
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            report["comparison"] = compare(json.load(f), report)
+        if args.max_regression is not None:
+            c = report["comparison"]
+            slower = c["latency_p50_pct"].get("pipeline")
+            failed = (slower is not None and slower > args.max_regression) or (c["recall_delta"] or 0) < 0
+
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+        acc = report["accuracy"]
+        print(f"✓ Wrote {args.out}: p50 {report['latency']['pipeline'].get('p50_ms')} ms, "
+              f"{report['throughput_ips']} img/s, precision {acc['precision']}, recall {acc['recall']}",
+              file=sys.stderr)
+    else:
+        print(text)
+    if report["accuracy"]["label_mismatches"]:
+        # informational: the modes may legitimately disagree (e.g. generic sensitive_data)
+        print(f"⚠ {report['accuracy']['label_mismatches']} of {report['accuracy']['labels_compared']} box(es) "
+              f"labelled differently in items and spans mode", file=sys.stderr)
+    if failed:
+        print("✗ Regression against the baseline", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+# Carries redaction boxes across frames between detections, so scrolled or moved content
+# stays covered at capture rate while the next OCR + LLM pass runs in the background.
+# Global motion comes from phase correlation on a downsampled gray frame; each box is then
+# refined by template-matching its previous patch around the predicted position. Detection
+# is only re-run when tracking can't account for what changed on screen.
+
+import threading
+import time
+import numpy as np
+import cv2
+import metrics
+from typing import Callable, List, NamedTuple, Optional, Tuple
+
+Box = Tuple[int, int, int, int]
+
+TRACK_SCALE = 0.25          # global motion is estimated on a 1/4 gray frame
+PATCH_PAD = 4               # context around a box used as its template (source px)
+SEARCH_MARGIN = 16          # template search radius around the predicted position (source px)
+FLAT_STD = 3.0              # patches flatter than this have no texture to match
+MIN_BOX_SCORE = 0.6         # TM_CCOEFF_NORMED below this means the box is lost
+RESIDUAL_DIFF = 40          # gray delta (downsampled, blurred) that motion doesn't explain
+RESIDUAL_RATIO = 0.0002     # share of such pixels (a couple of typed characters) that calls for a new detection
+REVEAL_RATIO = 0.05         # share of the frame scrolled into view since the last detection
+MAX_TRACK_AGE = 5.0         # seconds a detection is trusted without a refresh
+
+class TrackResult(NamedTuple):
+    boxes: List[Box]
+    confidence: float               # worst box match score (1.0 with no boxes to match)
+    shift: Tuple[float, float]      # global motion of this step, source px
+    residual: float                 # share of the frame the motion doesn't explain
+    labels: List[str]               # category of each box, aligned with boxes
+
+def to_gray(img: np.ndarray) -> np.ndarray:
+    return img if img.ndim == 2 else cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+
+class BoxTracker:
+    """
+    Frame-to-frame box tracking. reset() with the frame a detection ran on and its boxes,
+    then track() every later frame; boxes move with the content under them and boxes that
+    scroll out of the frame are dropped.
+    """
+
+    def __init__(self, scale: float = TRACK_SCALE, search_margin: int = SEARCH_MARGIN):
+        self.scale = scale
+        self.search_margin = search_margin
+        self.prev: Optional[np.ndarray] = None
+        self.prev_small: Optional[np.ndarray] = None
+        self.boxes = np.zeros((0, 4), dtype=np.float64)
+        self.labels: List[str] = []
+
+    @property
+    def ready(self) -> bool:
+        return self.prev is not None
+
+    def _small(self, gray: np.ndarray) -> np.ndarray:
+        H, W = gray.shape
+        small = cv2.resize(gray, (max(1, int(W * self.scale)), max(1, int(H * self.scale))),
+                           interpolation=cv2.INTER_AREA)
+        return cv2.GaussianBlur(small, (3, 3), 0)
+
+    def reset(self, gray: np.ndarray, boxes, labels=None):
+        self.prev = to_gray(gray)
+        self.prev_small = self._small(self.prev)
+        self.boxes = np.array([tuple(b) for b in boxes], dtype=np.float64).reshape(-1, 4)
+        self.labels = list(labels) if labels is not None else [None] * len(self.boxes)
+
+    # -------------------- motion --------------------
+    def global_motion(self, small: np.ndarray) -> Tuple[float, float]:
+        """Translation of the whole frame since the previous one, in source px."""
+        a, b = np.float32(self.prev_small), np.float32(small)
+        window = cv2.createHanningWindow(a.shape[::-1], cv2.CV_32F)
+        (dx, dy), _ = cv2.phaseCorrelate(a, b, window)
+        return dx / self.scale, dy / self.scale
+
+    def _residual(self, small: np.ndarray, dx: float, dy: float) -> float:
+        """Share of the overlapping area that still differs after undoing the motion."""
+        sx, sy = dx * self.scale, dy * self.scale
+        h, w = small.shape
+        if abs(sx) >= w - 1 or abs(sy) >= h - 1:
+            return 1.0
+        # sub-pixel warp of the previous frame onto this one, compared where both have pixels
+        M = np.float32([[1, 0, sx], [0, 1, sy]])
+        warped = cv2.warpAffine(self.prev_small, M, (w, h), flags=cv2.INTER_LINEAR)
+        x1, y1 = int(np.ceil(max(0, sx))), int(np.ceil(max(0, sy)))
+        x2, y2 = int(np.floor(w + min(0, sx))), int(np.floor(h + min(0, sy)))
+        diff = cv2.absdiff(small[y1:y2, x1:x2], warped[y1:y2, x1:x2])
+        return float(np.mean(diff > RESIDUAL_DIFF))
+
+    def _refine(self, gray: np.ndarray, box, dx: float, dy: float) -> Tuple[np.ndarray, Optional[float]]:
+        """
+        Box moved by the global motion, then snapped to where its own patch matches best.
+        Score None when the patch can't be matched (flat, or at the frame edge).
+        """
+        H, W = gray.shape
+        x, y, w, h = box
+        px1, py1 = int(max(0, x - PATCH_PAD)), int(max(0, y - PATCH_PAD))
+        px2, py2 = int(min(W, x + w + PATCH_PAD)), int(min(H, y + h + PATCH_PAD))
+        moved = np.array([x + dx, y + dy, w, h])
+        patch = self.prev[py1:py2, px1:px2]
+        if patch.size == 0 or float(patch.std()) < FLAT_STD:
+            return moved, None
+
+        m = self.search_margin
+        sx1, sy1 = int(round(px1 + dx)) - m, int(round(py1 + dy)) - m
+        sx2, sy2 = int(round(px2 + dx)) + m, int(round(py2 + dy)) + m
+        if sx1 < 0 or sy1 < 0 or sx2 > W or sy2 > H:
+            return moved, None
+        scores = cv2.matchTemplate(gray[sy1:sy2, sx1:sx2], patch, cv2.TM_CCOEFF_NORMED)
+        _, score, _, (mx, my) = cv2.minMaxLoc(scores)
+        return np.array([x + (sx1 + mx - px1), y + (sy1 + my - py1), w, h]), float(score)
+
+    def track(self, frame: np.ndarray) -> TrackResult:
+        """Move the boxes onto `frame` (BGR or gray) and make it the reference for the next call."""
+        gray = to_gray(frame)
+        if gray.shape != self.prev.shape:
+            # resolution changed: nothing can be carried over
+            self.reset(gray, [])
+            return TrackResult([], 0.0, (0.0, 0.0), 1.0, [])
+
+        small = self._small(gray)
+        dx, dy = self.global_motion(small)
+        residual = self._residual(small, dx, dy)
+
+        H, W = gray.shape
+        kept, kept_labels, scores = [], [], []
+        for box, label in zip(self.boxes, self.labels):
+            moved, score = self._refine(gray, box, dx, dy)
+            x, y, w, h = moved
+            if x + w <= 0 or y + h <= 0 or x >= W or y >= H:
+                continue   # scrolled out of view
+            kept.append(moved)
+            kept_labels.append(label)
+            if score is not None:
+                scores.append(score)
+
+        self.boxes = np.array(kept, dtype=np.float64).reshape(-1, 4)
+        self.labels = kept_labels
+        self.prev, self.prev_small = gray, small
+        boxes = []
+        for x, y, w, h in self.boxes:
+            x1, y1 = max(0, int(round(x))), max(0, int(round(y)))
+            x2, y2 = min(W, int(round(x + w))), min(H, int(round(y + h)))
+            boxes.append((x1, y1, x2 - x1, y2 - y1))
+        return TrackResult(boxes, min(scores, default=1.0), (dx, dy), residual, list(self.labels))
+
+class TrackedDetector:
+    """
+    Boxes for every frame at capture rate: the last detection's boxes are carried forward
+    by a BoxTracker, and a new detection is started on a background thread whenever
+    tracking can't vouch for them any more (a box lost its match, content changed in a way
+    motion doesn't explain, new content scrolled into view, or the result got too old).
+
+    detect(img, *args) -> (list of (x, y, w, h) boxes for img, list of their category labels).
+    """
+
+    def __init__(self, detect: Callable[..., list], tracker: Optional[BoxTracker] = None,
+                 min_confidence: float = MIN_BOX_SCORE, max_age: float = MAX_TRACK_AGE):
+        self.detect = detect
+        self.tracker = tracker or BoxTracker()
+        self.min_confidence = min_confidence
+        self.max_age = max_age
+        self.confidence = 0.0
+        self.detections = 0
+        self.last_detect_s = 0.0
+        self._lock = threading.Lock()
+        self._pending = None
+        self._running = False
+        self._started_at = 0.0
+        self._unexplained = 0.0
+        self._revealed = 0.0
+        self._args = ()
+
+    @property
+    def detecting(self) -> bool:
+        return self._running
+
+    def _apply_pending(self):
+        with self._lock:
+            pending, self._pending = self._pending, None
+        if pending is not None:
+            self.tracker.reset(*pending)
+
+    def track(self, img: np.ndarray) -> TrackResult:
+        """Boxes for this frame, from the newest finished detection moved onto it."""
+        self._apply_pending()
+        if not self.tracker.ready:
+            return TrackResult([], 0.0, (0.0, 0.0), 1.0, [])
+        with metrics.span("track"):
+            result = self.tracker.track(img)
+        H, W = self.tracker.prev.shape
+        self.confidence = result.confidence
+        self._unexplained = max(self._unexplained, result.residual)
+        self._revealed += abs(result.shift[0]) / W + abs(result.shift[1]) / H
+        return result
+
+    def due(self, args: Optional[tuple] = None) -> bool:
+        """
+        True when a new detection should start (never while one is running).
+        args: the detect() arguments for this frame; a change from the last ones is due too.
+        """
+        if self._running:
+            return False
+        if not self.tracker.ready and self._pending is None:
+            return True
+        return ((args is not None and args != self._args)
+                or self.confidence < self.min_confidence
+                or self._unexplained > RESIDUAL_RATIO
+                or self._revealed > REVEAL_RATIO
+                or time.monotonic() - self._started_at > self.max_age)
+
+    def _run(self, img, gray, args):
+        t0 = time.perf_counter()
+        try:
+            boxes, labels = self.detect(img, *args)
+            with self._lock:
+                self._pending = (gray, boxes, labels)
+            self.detections += 1
+        except Exception as e:
+            # leave the current boxes in place; the next trigger retries
+            metrics.error("tracked_detection", e)
+        finally:
+            self.last_detect_s = time.perf_counter() - t0
+            self._running = False
+
+    def start_detection(self, img: np.ndarray, *args, wait: bool = False):
+        """
+        Detect on img (kept alive until detect returns) on a background thread; the result
+        is picked up by the next track(). Change tracking restarts from this frame.
+        """
+        self._running = True
+        self._started_at = time.monotonic()
+        self._unexplained = self._revealed = 0.0
+        job = (img, to_gray(img).copy(), args)
+        if wait:
+            self._run(*job)
+        else:
+            threading.Thread(target=self._run, args=job, name="tracked-detect", daemon=True).start()
+
+    def process(self, img: np.ndarray, *args) -> TrackResult:
+        """
+        track() plus a background detection when due; args go on to detect(). The first frame
+        (and the first after a resolution change) is detected synchronously, so nothing is
+        shown before a result. Detection also re-runs when args change (e.g. new categories).
+        """
+        fresh = not self.tracker.ready or self.tracker.prev.shape != img.shape[:2]
+        if fresh and not self._running and self._pending is None:
+            self._args = args
+            self.start_detection(img, *args, wait=True)
+        result = self.track(img)
+        if self.due(args):
+            self._args = args
+            self.start_detection(img, *args)
+        return result
@@ -0,0 +1,250 @@
+# Long-lived screen capture: one mss handle per thread, grabs of the whole monitor or just
+# the requested regions, and a shared-memory ring of frames that OCR worker processes can
+# read by name instead of receiving pickled copies.
+
+import atexit
+import threading
+import numpy as np
+import cv2
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+Rect = Tuple[int, int, int, int]
+
+RING_SLOTS = 4
+
+class FrameRef(NamedTuple):
+    """Picklable handle to one frame in a FrameRing (a few bytes instead of the pixels)."""
+    name: str
+    shape: Tuple[int, int, int]
+    slots: int
+    slot: int
+    seq: int
+
+# Before Python 3.13 attaching always registers the block with the resource tracker. Readers
+# skip that through a register wrapper installed once; it only drops names the calling thread
+# is attaching, so registrations from other threads are never lost. (Unregistering after the
+# attach is no alternative: pool workers share the owner's tracker, so that would drop the
+# owner's registration too.)
+_untracked = threading.local()
+_register_lock = threading.Lock()
+_register_wrapped = False
+
+def _wrap_register():
+    global _register_wrapped
+    with _register_lock:
+        if _register_wrapped:
+            return
+        register = resource_tracker.register
+
+        def register_unless_attaching(name, rtype):
+            if name not in getattr(_untracked, "names", ()):
+                register(name, rtype)
+
+        resource_tracker.register = register_unless_attaching
+        _register_wrapped = True
+
+def _attach_untracked(name: str) -> shared_memory.SharedMemory:
+    """
+    Attach to an existing block without registering it with this process's resource
+    tracker: the creating process owns it, and a reader exiting must not unlink it.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)   # Python 3.13+
+    except TypeError:
+        _wrap_register()
+        names = _untracked.names = {name, "/" + name}   # POSIX registers the "/"-prefixed name
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            names.clear()
+
+class FrameRing:
+    """
+    Fixed set of preallocated BGR frame slots in one shared-memory block, plus a small
+    header of per-slot sequence numbers and pin counts. The writer fills the oldest
+    unpinned slot; readers in other processes attach by name and get zero-copy views.
+    """
+
+    def __init__(self, shape: Tuple[int, int, int], slots: int = RING_SLOTS, name: Optional[str] = None):
+        self.shape = tuple(shape)
+        self.slots = slots
+        frame_bytes = int(np.prod(self.shape))
+        header_bytes = 16 * slots
+        self._owner = name is None
+        if self._owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=header_bytes + frame_bytes * slots)
+        else:
+            self.shm = _attach_untracked(name)
+        # header: int64 seq per slot (0 = never written), then int64 pin count per slot
+        self._seq = np.ndarray((slots,), dtype=np.int64, buffer=self.shm.buf, offset=0)
+        self._pins = np.ndarray((slots,), dtype=np.int64, buffer=self.shm.buf, offset=8 * slots)
+        self.frames = np.ndarray((slots,) + self.shape, dtype=np.uint8, buffer=self.shm.buf, offset=header_bytes)
+        self._lock = threading.Lock()
+        self._next_seq = int(self._seq.max(initial=0)) + 1
+        if self._owner:
+            self._seq[:] = 0
+            self._pins[:] = 0
+            atexit.register(self.close)
+
+    @classmethod
+    def attach(cls, ref: FrameRef) -> "FrameRing":
+        return cls(ref.shape, ref.slots, name=ref.name)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    # -------------------- writer --------------------
+    def acquire(self) -> int:
+        """Oldest unpinned slot for the next frame."""
+        with self._lock:
+            free = [i for i in range(self.slots) if self._pins[i] == 0]
+            if not free:
+                raise RuntimeError("All frame ring slots are pinned")
+            return min(free, key=lambda i: self._seq[i])
+
+    def commit(self, slot: int) -> FrameRef:
+        with self._lock:
+            seq = self._next_seq
+            self._next_seq += 1
+            self._seq[slot] = seq
+        return FrameRef(self.name, self.shape, self.slots, slot, seq)
+
+    def latest(self) -> Optional[FrameRef]:
+        slot = int(np.argmax(self._seq))
+        if self._seq[slot] == 0:
+            return None
+        return FrameRef(self.name, self.shape, self.slots, slot, int(self._seq[slot]))
+
+    # -------------------- readers --------------------
+    def view(self, ref: FrameRef) -> np.ndarray:
+        """Zero-copy view of a frame; check is_current(ref) afterwards if it wasn't pinned."""
+        return self.frames[ref.slot]
+
+    def is_current(self, ref: FrameRef) -> bool:
+        return int(self._seq[ref.slot]) == ref.seq
+
+    def pin(self, ref: FrameRef):
+        """Keep the writer off this slot until unpin (e.g. while workers OCR it)."""
+        with self._lock:
+            self._pins[ref.slot] += 1
+
+    def unpin(self, ref: FrameRef):
+        with self._lock:
+            self._pins[ref.slot] = max(0, self._pins[ref.slot] - 1)
+
+    def close(self):
+        try:
+            self.shm.close()
+            if self._owner:
+                self.shm.unlink()
+        except (FileNotFoundError, BufferError):
+            pass
+
+# Reader side: rings attached by worker processes, kept open for the process lifetime
+_attached: Dict[str, FrameRing] = {}
+
+def read_frame(ref: FrameRef) -> np.ndarray:
+    """Frame behind a FrameRef, from any process (attaches to the ring once per process)."""
+    ring = _attached.get(ref.name)
+    if ring is None:
+        ring = _attached[ref.name] = FrameRing.attach(ref)
+    return ring.view(ref)
+
+class ScreenCapture:
+    """
+    Persistent capture of one monitor. The mss handle is opened once per thread (mss
+    handles are not shareable across threads) and reused for every grab; handles of
+    threads that have ended are closed whenever a new one is opened; BGRA->BGR
+    conversion writes straight into the destination, so a frame costs one pass and no
+    fresh allocation when a ring is used.
+    """
+
+    def __init__(self, monitor_index: int = 1, ring_slots: int = 0):
+        self.monitor_index = monitor_index
+        self._local = threading.local()
+        self._handles: List[Tuple[threading.Thread, object]] = []
+        self._handles_lock = threading.Lock()
+        self.monitor = dict(self._sct().monitors[monitor_index])
+        self.shape = (self.monitor["height"], self.monitor["width"], 3)
+        self.ring = FrameRing(self.shape, ring_slots) if ring_slots else None
+        self.last: Optional[FrameRef] = None
+
+    def _sct(self):
+        sct = getattr(self._local, "sct", None)
+        if sct is None:
+            import mss  # only processes that grab the screen pay for it (the API server never does)
+            sct = self._local.sct = mss.mss()
+            with self._handles_lock:
+                # thread-per-request servers start a thread for every call: don't keep their handles
+                alive = []
+                for thread, old in self._handles:
+                    if thread.is_alive():
+                        alive.append((thread, old))
+                    else:
+                        old.close()
+                self._handles = alive + [(threading.current_thread(), sct)]
+        return sct
+
+    def _grab_into(self, dst: np.ndarray, rect: Rect):
+        x, y, w, h = rect
+        shot = self._sct().grab({"left": self.monitor["left"] + x, "top": self.monitor["top"] + y,
+                                 "width": w, "height": h})
+        bgra = np.frombuffer(shot.raw, dtype=np.uint8).reshape(shot.height, shot.width, 4)
+        if dst.flags.c_contiguous:
+            cv2.cvtColor(bgra, cv2.COLOR_BGRA2BGR, dst=dst)
+        else:
+            # OpenCV can't write into a strided sub-view; region patches are small anyway
+            dst[...] = cv2.cvtColor(bgra, cv2.COLOR_BGRA2BGR)
+
+    def grab(self, region: Optional[Rect] = None) -> np.ndarray:
+        """BGR copy of the monitor, or of one (x, y, w, h) region of it."""
+        H, W = self.shape[:2]
+        x, y, w, h = region or (0, 0, W, H)
+        out = np.empty((h, w, 3), dtype=np.uint8)
+        self._grab_into(out, (x, y, w, h))
+        return out
+
+    def grab_to_ring(self, regions: Optional[Sequence[Rect]] = None) -> FrameRef:
+        """
+        Capture into the next ring slot and return its FrameRef. With `regions`, only those
+        rectangles are grabbed and the rest of the frame is carried over from the last one.
+        """
+        if self.ring is None:
+            raise RuntimeError("ScreenCapture was created without a frame ring")
+        H, W = self.shape[:2]
+        slot = self.ring.acquire()
+        dst = self.ring.frames[slot]
+        if regions is None or self.last is None or not self.ring.is_current(self.last):
+            self._grab_into(dst, (0, 0, W, H))
+        else:
+            if self.last.slot != slot:
+                np.copyto(dst, self.ring.frames[self.last.slot])
+            for x, y, w, h in regions:
+                x, y = max(0, x), max(0, y)
+                w, h = min(W - x, w), min(H - y, h)
+                if w > 0 and h > 0:
+                    self._grab_into(dst[y:y+h, x:x+w], (x, y, w, h))
+        self.last = self.ring.commit(slot)
+        return self.last
+
+    def close(self):
+        with self._handles_lock:
+            for _, sct in self._handles:
+                sct.close()
+            self._handles.clear()
+        if self.ring is not None:
+            self.ring.close()
+
+_captures: Dict[int, ScreenCapture] = {}
+_captures_lock = threading.Lock()
+
+def get_capture(monitor_index: int = 1) -> ScreenCapture:
+    """Process-wide ScreenCapture per monitor."""
+    with _captures_lock:
+        cap = _captures.get(monitor_index)
+        if cap is None:
+            cap = _captures[monitor_index] = ScreenCapture(monitor_index)
+            atexit.register(cap.close)
+        return cap
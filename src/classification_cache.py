@@ -0,0 +1,140 @@
+import atexit
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterable, List, Optional, Tuple
+import metrics
+from aho_corasick import AhoCorasick, is_token_edge
+
+CACHE_MAX_ENTRIES = int(os.getenv("CLASSIFY_CACHE_SIZE", "20000"))
+CACHE_TTL_SECONDS = float(os.getenv("CLASSIFY_CACHE_TTL", "86400"))
+CACHE_PATH = os.getenv("CLASSIFY_CACHE_PATH")  # optional on-disk persistence (JSON)
+
+Spans = List[Tuple[int, int]]
+
+def normalize_line(line: str) -> str:
+    return " ".join((line or "").split())
+
+class ClassificationCache:
+    """
+    LRU + TTL cache of per-line verdicts from the LLM classifier.
+
+    Keys are a hash of the normalized (lowercased) line and the requested category set;
+    a verdict is the list of (start, end) spans of sensitive text inside the normalized
+    line (empty = clean). Nothing in the cache, or on disk, is plaintext.
+    """
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, ttl: float = CACHE_TTL_SECONDS,
+                 path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+        self._data: "OrderedDict[str, Tuple[float, Spans]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if path:
+            self.load()
+            atexit.register(self.save)
+
+    @staticmethod
+    def _key(line: str, categories: Iterable[str]) -> str:
+        cats = ",".join(sorted(c.lower() for c in (categories or [])))
+        return hashlib.sha256(f"{cats}\x00{normalize_line(line).lower()}".encode("utf-8")).hexdigest()
+
+    def get(self, line: str, categories) -> Optional[Spans]:
+        key = self._key(line, categories)
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] < time.time():
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, line: str, categories, spans: Spans):
+        key = self._key(line, categories)
+        with self._lock:
+            self._data[key] = (time.time() + self.ttl, [tuple(s) for s in spans])
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def lookup(self, lines: List[str], categories) -> Tuple[List[str], List[str]]:
+        """
+        Split lines into cached and uncached.
+        Returns (sensitive items recovered from cached verdicts, lines that still need the model).
+        """
+        items, missing = [], []
+        for line in lines:
+            spans = self.get(line, categories)
+            if spans is None:
+                missing.append(line)
+                continue
+            norm = normalize_line(line)
+            items.extend(norm[s:e] for s, e in spans)
+        return items, missing
+
+    def store_verdicts(self, lines: List[str], categories, items: List[str]) -> bool:
+        """
+        Attribute the model's sensitive items to every whole-token occurrence in the lines and
+        cache every line. Nothing is cached when an item occurs in none of the lines (e.g. it
+        spans a line break): the lines' verdicts would be incomplete, and a line cached as clean
+        would hide it from then on. Returns whether the verdicts were cached.
+        """
+        patterns = list(dict.fromkeys(normalize_line(i).lower() for i in items if normalize_line(i)))
+        norms = [normalize_line(line).lower() for line in lines]
+        spans: List[Spans] = [[] for _ in lines]
+        matched = set()
+        if patterns:
+            for li, s, e, pi in AhoCorasick(patterns).iter_line_matches(norms, is_token_edge):
+                spans[li].append((s, e))
+                matched.add(pi)
+        if len(matched) < len(patterns):
+            return False
+        for line, line_spans in zip(lines, spans):
+            self.put(line, categories, line_spans)
+        return True
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+        except (OSError, ValueError) as e:
+            metrics.error("classification_cache_load", e)
+            return
+        now = time.time()
+        with self._lock:
+            for key, (expires, spans) in raw.items():
+                if expires >= now:
+                    self._data[key] = (expires, [tuple(s) for s in spans])
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            raw = {k: [v[0], v[1]] for k, v in self._data.items()}
+        tmp = f"{self.path}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(raw, f)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            metrics.error("classification_cache_save", e)
+
+# Shared by every detector() call in this process
+classification_cache = ClassificationCache(path=CACHE_PATH)
@@ -0,0 +1,142 @@
+import bisect
+import math
+import os
+import re
+import threading
+from collections import Counter
+from typing import Dict, List, NamedTuple, Sequence, Tuple
+from src.schema import Finding
+
+# Tier thresholds (env overrides, tune with the counters in cascade_stats, exported on /api/metrics)
+CASCADE_HIGH_CONF = float(os.getenv("CASCADE_HIGH_CONF", "0.85"))    # regex hits settled without the LLM
+CASCADE_ENTROPY_BITS = float(os.getenv("CASCADE_ENTROPY_BITS", "3.5"))  # per char, for key-like tokens
+CASCADE_MIN_TOKEN_LEN = int(os.getenv("CASCADE_MIN_TOKEN_LEN", "16"))
+
+# Words that make a line worth a second look even without a regex hit
+_CONTEXT = re.compile(
+    r"(?i)\b(?:pass(?:word|wd|phrase)?|pwd|secret|token|api[_-]?key|key|auth|credential|bearer|"
+    r"private|ssn|sin|account|acct|routing|iban|swift|passport|licen[cs]e|dob|birth)\b")
+_TOKEN = re.compile(r"[A-Za-z0-9_\-+/=.]+")
+_DIGIT_RUN = re.compile(r"\d[\d \-]{6,}\d")
+
+CLEAN, SENSITIVE, AMBIGUOUS = "clean", "sensitive", "ambiguous"
+
+class Segment(NamedTuple):
+    start: int   # offset of the line in the full text
+    text: str
+
+class CascadeStats:
+    """Per-tier counters: lines settled clean/sensitive locally vs escalated, and LLM outcomes."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts: Counter = Counter()
+
+    def add(self, **counts):
+        with self._lock:
+            self._counts.update({k: v for k, v in counts.items() if v})
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counts)
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+
+cascade_stats = CascadeStats()
+
+def shannon_entropy(s: str) -> float:
+    """Bits per character."""
+    if not s:
+        return 0.0
+    n = len(s)
+    return -sum(c / n * math.log2(c / n) for c in Counter(s).values())
+
+def _looks_random(token: str) -> bool:
+    return (len(token) >= CASCADE_MIN_TOKEN_LEN and not token.isalpha()
+            and shannon_entropy(token) >= CASCADE_ENTROPY_BITS)
+
+def score_line(line: str, findings: Sequence[Finding], line_start: int = 0) -> str:
+    """
+    Local tier for one line, given the regex findings that fall inside it.
+    sensitive: only high-confidence validated hits and nothing suspicious left over.
+    clean: no hits and nothing suspicious. ambiguous: everything else (goes to the LLM).
+    """
+    if any(f.confidence < CASCADE_HIGH_CONF for f in findings):
+        return AMBIGUOUS
+    # blank out what regex already explained, then look for leftovers
+    rest = list(line)
+    for f in findings:
+        for i in range(max(0, f.start - line_start), min(len(line), f.end - line_start)):
+            rest[i] = " "
+    rest = "".join(rest)
+    # a context word next to a settled hit ("password: ...") is explained by that hit
+    suspicious = ((not findings and _CONTEXT.search(rest) is not None) or _DIGIT_RUN.search(rest) is not None
+                  or any(_looks_random(t) for t in _TOKEN.findall(rest)))
+    if suspicious:
+        return AMBIGUOUS
+    return SENSITIVE if findings else CLEAN
+
+def triage(text: str, findings: Sequence[Finding]) -> Tuple[List[Segment], Dict[str, int]]:
+    """
+    Score every line of text against the regex findings.
+    Returns (ambiguous line segments for the LLM, per-tier line counts); counts are also
+    added to cascade_stats.
+    """
+    segments, starts = [], []
+    pos = 0
+    for line in text.split("\n"):
+        segments.append(Segment(pos, line))
+        starts.append(pos)
+        pos += len(line) + 1
+
+    per_line: List[List[Finding]] = [[] for _ in segments]
+    for f in findings:
+        per_line[bisect.bisect_right(starts, f.start) - 1].append(f)
+
+    tiers: Counter = Counter()
+    ambiguous = []
+    for seg, hits in zip(segments, per_line):
+        if not seg.text.strip():
+            continue
+        tier = score_line(seg.text, hits, seg.start)
+        tiers[tier] += 1
+        if tier == AMBIGUOUS:
+            ambiguous.append(seg)
+
+    counts = {f"lines_{t}": tiers[t] for t in (CLEAN, SENSITIVE, AMBIGUOUS)}
+    cascade_stats.add(**counts)
+    return ambiguous, counts
+
+def settled_findings(findings: Sequence[Finding], segments: Sequence[Segment]) -> List[Finding]:
+    """Findings outside the ambiguous segments: the hits of lines triage settled as sensitive."""
+    starts = [s.start for s in segments]
+    out = []
+    for f in findings:
+        i = bisect.bisect_right(starts, f.start) - 1
+        if i < 0 or f.start >= segments[i].start + len(segments[i].text):
+            out.append(f)
+    return out
+
+def join_segments(segments: Sequence[Segment]) -> str:
+    """Text sent upstream for the ambiguous lines, one per line."""
+    return "\n".join(s.text for s in segments)
+
+def rebase_to_segments(findings: Sequence[Finding], segments: Sequence[Segment]) -> List[Finding]:
+    """Map spans in join_segments(segments) back to offsets in the original text."""
+    starts, pos = [], 0
+    for s in segments:
+        starts.append(pos)
+        pos += len(s.text) + 1
+    out = []
+    for f in findings:
+        i = bisect.bisect_right(starts, f.start) - 1
+        if i < 0:
+            continue
+        seg = segments[i]
+        rel_start = f.start - starts[i]
+        rel_end = min(f.end - starts[i], len(seg.text))  # a span can't run into the next (non-adjacent) line
+        if rel_start < rel_end:
+            out.append(f.model_copy(update={"start": seg.start + rel_start, "end": seg.start + rel_end}))
+    return out
@@ -0,0 +1,97 @@
+import os
+from typing import Dict, Hashable, List, NamedTuple, Optional, Sequence, Tuple
+from src.schema import Finding
+
+# Prompt budget per chunk; keeps each request (and its response) well under the model's
+# output cap so dense screens aren't truncated, and lets chunks run concurrently.
+CHUNK_TOKEN_BUDGET = int(os.getenv("CHUNK_TOKEN_BUDGET", "1500"))
+CHARS_PER_TOKEN = 4
+
+class Chunk(NamedTuple):
+    offset: int        # start of `text` within the full "\n"-joined text
+    text: str
+    lines: List[int]   # indices of the input lines this chunk covers
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+def _paragraphs(keys: Sequence[Hashable]) -> List[List[int]]:
+    """Runs of consecutive lines sharing a paragraph key."""
+    groups: List[List[int]] = []
+    for i, key in enumerate(keys):
+        if groups and keys[groups[-1][-1]] == key:
+            groups[-1].append(i)
+        else:
+            groups.append([i])
+    return groups
+
+def chunk_lines(lines: Sequence[str], keys: Optional[Sequence[Hashable]] = None,
+                budget: int = CHUNK_TOKEN_BUDGET) -> List[Chunk]:
+    """
+    Pack lines into chunks of at most `budget` estimated tokens, keeping paragraphs
+    (consecutive lines with the same key, e.g. OCR (block_num, par_num)) together.
+    A paragraph over budget is split between lines; a single line over budget is its own chunk.
+    Chunk offsets index into "\n".join(lines).
+    """
+    if not lines:
+        return []
+    keys = list(keys) if keys is not None else list(range(len(lines)))
+    starts = []
+    pos = 0
+    for line in lines:
+        starts.append(pos)
+        pos += len(line) + 1
+
+    chunks: List[Chunk] = []
+    current: List[int] = []
+    used = 0
+
+    def flush():
+        nonlocal current, used
+        if current:
+            text = "\n".join(lines[i] for i in current)
+            chunks.append(Chunk(starts[current[0]], text, current))
+        current, used = [], 0
+
+    for para in _paragraphs(keys):
+        cost = sum(estimate_tokens(lines[i]) for i in para)
+        if used + cost > budget:
+            flush()
+        if cost <= budget:
+            current, used = current + para, used + cost
+            continue
+        for i in para:
+            line_cost = estimate_tokens(lines[i])
+            if used + line_cost > budget:
+                flush()
+            current.append(i)
+            used += line_cost
+    flush()
+    return chunks
+
+def chunk_text(text: str, budget: int = CHUNK_TOKEN_BUDGET) -> List[Chunk]:
+    """chunk_lines over plain text, treating blank lines as paragraph breaks."""
+    lines = text.split("\n")
+    keys, para = [], 0
+    for line in lines:
+        if not line.strip():
+            para += 1
+        keys.append(para)
+    return chunk_lines(lines, keys, budget)
+
+def rebase_findings(findings: Sequence[Finding], chunk: Chunk) -> List[Finding]:
+    """Shift chunk-relative spans into the full text, dropping spans outside the chunk."""
+    out = []
+    for f in findings:
+        if 0 <= f.start < f.end <= len(chunk.text):
+            out.append(f.model_copy(update={"start": f.start + chunk.offset, "end": f.end + chunk.offset}))
+    return out
+
+def merge_findings(findings: Sequence[Finding]) -> List[Finding]:
+    """Dedupe by (kind, start, end), keeping the most confident, sorted by position."""
+    best: Dict[Tuple[str, int, int], Finding] = {}
+    for f in findings:
+        key = (f.kind, f.start, f.end)
+        if key not in best or f.confidence > best[key].confidence:
+            best[key] = f
+    return sorted(best.values(), key=lambda f: (f.start, f.end))
@@ -1,14 +1,72 @@
 import re
-from typing import List
+import base64
+import ipaddress
+import json
+import math
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Tuple
 from src.schema import Finding, Findings
 
-RE_EMAIL = re.compile(r"\b[a-zA-Z0-9._%+\-]+@[a-zA-Z0-9.\-]+\.[A-Za-z]{2,}\b")
-RE_PHONE = re.compile(r"(?:\+?\d{1,3}[-.\s]?)?(?:\(?\d{3}\)?[-.\s]?){2}\d{4}\b")
-RE_CC    = re.compile(r"\b(?:\d[ -]*?){13,19}\b")
-# add Luhn check to reduce FPs
-def _luhn_ok(s: str) -> bool:
-    digits = [int(c) for c in re.sub(r"\D","",s)]
-    if not (13 <= len(digits) <= 19): return False
+# One rule per SensitiveKind. All rules are compiled into a single alternation that is
+# scanned once; earlier rules win at a given position. Rules with a `value` group report
+# only that group (e.g. the secret after "password:"), the rest report the whole match.
+# (kind, pattern, confidence, reason)
+_RULES: List[Tuple[str, str, float, str]] = [
+    ("private_key_block",
+     r"-----BEGIN (?:[A-Z0-9]+ )*PRIVATE KEY-----(?:[\s\S]*?-----END (?:[A-Z0-9]+ )*PRIVATE KEY-----)?",
+     0.99, "regex:pem-header"),
+    ("gcp_service_account_key",
+     r"\"(?:type\"\s*:\s*\"service_account|private_key_id\"\s*:\s*\"[a-f0-9]{40})\"",
+     0.95, "regex:gcp-json"),
+    ("jwt", r"\beyJ[A-Za-z0-9_-]{8,}\.eyJ[A-Za-z0-9_-]{8,}\.[A-Za-z0-9_-]{8,}", 0.95, "regex+jwt-header"),
+    ("url_with_token",
+     r"\bhttps?://[^\s?#]+\?(?:[^\s#]*&)?(?i:access_token|token|api_key|apikey|key|sig|signature|auth|secret|password|code)=[^\s&#]{6,}[^\s#]*",
+     0.85, "regex:url-query-secret"),
+    ("bearer_token", r"\b(?i:bearer)\s+(?P<value>[A-Za-z0-9\-._~+/]{16,}=*)", 0.9, "regex:bearer"),
+    ("oauth_token",
+     r"\b(?:ya29\.[0-9A-Za-z_-]{20,}|gh[pousr]_[A-Za-z0-9]{36,}|xox[abprs]-[A-Za-z0-9-]{10,}|github_pat_[A-Za-z0-9_]{40,})",
+     0.95, "regex:provider-prefix"),
+    ("aws_access_key_id", r"\b(?:AKIA|ASIA|ABIA|ACCA|AGPA|AIDA|AIPA|ANPA|ANVA|AROA|APKA|ASCA)[A-Z0-9]{16}\b",
+     0.95, "regex:aws-key-prefix"),
+    ("aws_secret_access_key",
+     r"(?i:aws_?secret(?:_?access)?_?key)[\"']?\s*[:=]\s*[\"']?(?P<value>[A-Za-z0-9/+=]{40})(?![A-Za-z0-9/+=])",
+     0.95, "regex:aws-secret-context"),
+    ("password",
+     r"(?i:password|passwd|pwd|passphrase)[\"']?\s*[:=]\s*[\"']?(?P<value>[^\s\"',;]{3,})",
+     0.85, "regex:password-context"),
+    ("email", r"\b[A-Za-z0-9._%+\-]+@[A-Za-z0-9.\-]+\.[A-Za-z]{2,}\b", 0.85, "regex"),
+    ("iban", r"\b[A-Z]{2}\d{2}(?: ?[A-Z0-9]{4}){2,7}(?: ?[A-Z0-9]{1,4})?\b", 0.9, "regex+mod97"),
+    ("swift_bic", r"(?i:swift|bic)(?:\s*code)?\s*[:#]?\s*(?P<value>[A-Z]{4}[A-Z]{2}[A-Z0-9]{2}(?:[A-Z0-9]{3})?)\b",
+     0.8, "regex:swift-context"),
+    ("routing_number", r"(?i:routing|aba|rtn)[^\d\n]{0,20}(?P<value>\d{9})\b", 0.85, "regex+aba-checksum"),
+    ("bank_account", r"(?i:account|acct)(?:\s*(?i:no|number|#))?[^\w\n]{0,5}(?P<value>\d{6,17})\b",
+     0.7, "regex:account-context"),
+    ("ssn", r"\b\d{3}-\d{2}-\d{4}\b", 0.85, "regex+ssn-ranges"),
+    ("credit_card", r"\b(?:\d[ -]?){12,18}\d\b", 0.9, "regex+luhn"),
+    ("sin", r"\b\d{3}[ -]\d{3}[ -]\d{3}\b", 0.75, "regex+luhn"),
+    ("phone_number", r"(?<![\w.])(?:\+?\d{1,3}[-.\s]?)?(?:\(\d{3}\)|\d{3})[-.\s]?\d{3}[-.\s]?\d{4}\b",
+     0.6, "regex"),
+    ("ip_address", r"(?<![\d.])(?:\d{1,3}\.){3}\d{1,3}(?!\.?\d)", 0.6, "regex+ip-range"),
+    ("national_id",
+     r"(?i:passport|national\s+id|id\s+(?:no|number)|driver'?s?\s+licen[cs]e)[^\w\n]{0,5}(?:(?i:no|number)\W{0,3})?(?P<value>[A-Z0-9]{6,12})\b",
+     0.75, "regex:id-context"),
+    ("license_plate",
+     r"(?i:licen[cs]e\s+plate|plate(?:\s+(?:no|number))?|registration)[^\w\n]{0,5}(?P<value>[A-Z0-9]{2,4}[- ]?[A-Z0-9]{2,4})\b",
+     0.6, "regex:plate-context"),
+    ("address",
+     r"\b\d{1,5}\s+(?:[A-Z][a-z]+\s){1,3}(?:Street|St|Avenue|Ave|Road|Rd|Boulevard|Blvd|Lane|Ln|Drive|Dr|Court|Ct|Way|Place|Pl|Crescent|Cres)\b\.?",
+     0.6, "regex:street-address"),
+    ("api_key_unknown",
+     r"\b(?:(?:sk|pk|rk)_(?:live|test)_[A-Za-z0-9]{16,}|AIza[0-9A-Za-z_-]{35})\b"
+     r"|(?i:api[_-]?key|secret|token|access[_-]?key)[\"']?\s*[:=]\s*[\"']?(?P<value>[A-Za-z0-9_\-+/=]{16,})"
+     r"|\b[A-Za-z0-9]{32,}\b",
+     0.7, "regex:key-shape"),
+]
+
+# -------------------- validators --------------------
+def _luhn_ok(s: str, lengths=range(13, 20)) -> bool:
+    digits = [int(c) for c in re.sub(r"\D", "", s)]
+    if len(digits) not in lengths: return False
     checksum = 0
     reverse = digits[::-1]
     for i, d in enumerate(reverse):
@@ -18,17 +76,171 @@ def _luhn_ok(s: str) -> bool:
         checksum += d
     return checksum % 10 == 0
 
+def _iban_ok(s: str) -> bool:
+    v = s.replace(" ", "")
+    if not (15 <= len(v) <= 34):
+        return False
+    moved = v[4:] + v[:4]
+    return int("".join(str(int(c, 36)) for c in moved)) % 97 == 1
+
+def _jwt_ok(s: str) -> bool:
+    header = s.split(".", 1)[0]
+    try:
+        decoded = json.loads(base64.urlsafe_b64decode(header + "=" * (-len(header) % 4)))
+    except (ValueError, TypeError):
+        return False
+    return isinstance(decoded, dict) and "alg" in decoded
+
+def _aba_ok(s: str) -> bool:
+    d = [int(c) for c in s]
+    return len(d) == 9 and (3 * (d[0] + d[3] + d[6]) + 7 * (d[1] + d[4] + d[7]) + d[2] + d[5] + d[8]) % 10 == 0
+
+def _ssn_ok(s: str) -> bool:
+    area, group, serial = s.split("-")
+    return area not in ("000", "666") and not area.startswith("9") and group != "00" and serial != "0000"
+
+def _sin_ok(s: str) -> bool:
+    return not s.startswith(("0", "8")) and _luhn_ok(s, lengths=(9,))
+
+def _ip_ok(s: str) -> bool:
+    try:
+        ip = ipaddress.IPv4Address(s)
+    except ValueError:
+        return False
+    return not (ip.is_unspecified or ip.is_multicast or ip.is_reserved)
+
+def _phone_ok(s: str) -> bool:
+    # NANP shape (10 digits, or 11 with the leading 1); other country codes only in E.164 "+" form
+    digits = re.sub(r"\D", "", s)
+    if s.startswith("+"):
+        return 11 <= len(digits) <= 15
+    return len(digits) == 10 or (len(digits) == 11 and digits[0] == "1")
+
+_HEX_RUN = re.compile(r"[0-9a-fA-F]+")
+
+def _labelled_key_ok(s: str) -> bool:
+    # key-shaped values must mix character classes (drops long plain words and digit runs)
+    return not (s.isalpha() or s.isdigit())
+
+# bare key-shaped runs must look random: enough bits per character (random base62 is ~4.5 at
+# 32 chars), and little of the run in word-like same-class stretches (camelCase names are mostly that)
+_MIN_KEY_ENTROPY = 3.5
+_MAX_WORDLIKE_SHARE = 0.55
+_WORDLIKE_RUN = re.compile(r"[a-z]{4,}|[A-Z]{4,}|[0-9]{4,}")
+
+def _entropy(s: str) -> float:
+    n = len(s)
+    return -sum(c / n * math.log2(c / n) for c in Counter(s).values())
+
+def _mixed_key_ok(s: str) -> bool:
+    # a bare run has no label to vouch for it: it must use upper, lower and digits, not be
+    # pure hex (git SHAs, checksums) and look random (drops identifiers and base-36 ids)
+    if not (any(c.isupper() for c in s) and any(c.islower() for c in s) and any(c.isdigit() for c in s)):
+        return False
+    if _HEX_RUN.fullmatch(s) or _entropy(s) < _MIN_KEY_ENTROPY:
+        return False
+    return sum(len(run) for run in _WORDLIKE_RUN.findall(s)) / len(s) <= _MAX_WORDLIKE_SHARE
+
+# text just before a dotted quad that makes it a version number, not an address
+_VERSION_BEFORE = re.compile(r"(?i)\b(?:v|version|ver|release|build|rev(?:ision)?|firmware|fw)\.?\s*[:#]?\s*$")
+
+_VALIDATORS: Dict[str, Callable[[str], bool]] = {
+    "jwt": _jwt_ok,
+    "iban": _iban_ok,
+    "routing_number": _aba_ok,
+    "ssn": _ssn_ok,
+    "credit_card": _luhn_ok,
+    "sin": _sin_ok,
+    "ip_address": _ip_ok,
+    "phone_number": _phone_ok,
+    "api_key_unknown": _mixed_key_ok,
+}
+
+# Values behind a context label ("api_key=...") pass a looser check than bare matches
+_LABELLED_VALIDATORS: Dict[str, Callable[[str], bool]] = {
+    "api_key_unknown": _labelled_key_ok,
+}
+
+def _ip_reason(value: str) -> str:
+    ip = ipaddress.IPv4Address(value)
+    if ip.is_loopback: return "regex+ip-range:loopback"
+    if ip.is_private: return "regex+ip-range:private"
+    return "regex+ip-range:public"
+
+def _preview(kind: str, value: str) -> str:
+    if kind == "credit_card":
+        return "**** **** **** " + re.sub(r"\D", "", value)[-4:]
+    if kind == "email":
+        return value[:2] + "***"
+    if kind in ("phone_number", "ssn", "sin", "iban", "bank_account", "routing_number"):
+        return "***" + value[-4:]
+    return value[:4] + "***" if len(value) > 8 else "***"
+
+# -------------------- engine --------------------
+class RegexEngine:
+    """Precompiled single-pass scanner over all rules, emitting validated Findings."""
+
+    def __init__(self, rules=_RULES):
+        self.rules = rules
+        parts = []
+        self._single = []
+        for i, (kind, pattern, _, _) in enumerate(rules):
+            # rename each rule's `value` group so the names stay unique in the combined pattern
+            named = pattern.replace("(?P<value>", f"(?P<v{i}>")
+            parts.append(f"(?P<r{i}>{named})")
+            self._single.append(re.compile(pattern))
+        self._combined = re.compile("|".join(parts))
+
+    def _finding(self, i: int, m: "re.Match", value_group: str, text: str) -> Optional[Finding]:
+        kind, _, confidence, reason = self.rules[i]
+        has_value = value_group in m.re.groupindex and m.group(value_group) is not None
+        start, end = m.span(value_group) if has_value else m.span()
+        value = text[start:end]
+        check = _LABELLED_VALIDATORS.get(kind, _VALIDATORS.get(kind)) if has_value else _VALIDATORS.get(kind)
+        if check and not check(value):
+            return None
+        if kind == "ip_address":
+            if _VERSION_BEFORE.search(text, max(0, start - 24), start):
+                return None
+            reason = _ip_reason(value)
+        return Finding(kind=kind, start=start, end=end, value_preview=_preview(kind, value),
+                       confidence=confidence, reason=reason, rule=self.rules[i][1])
+
+    def _retry_at(self, text: str, pos: int, after: int) -> Optional[Tuple[Finding, int]]:
+        """A rule matched at pos but failed validation: try the remaining rules at the same spot."""
+        for j in range(after + 1, len(self.rules)):
+            m = self._single[j].match(text, pos)
+            if not m:
+                continue
+            f = self._finding(j, m, "value", text)
+            if f:
+                return f, m.end()
+        return None
+
+    def scan(self, text: str) -> List[Finding]:
+        out: List[Finding] = []
+        pos = 0
+        while pos <= len(text):
+            m = self._combined.search(text, pos)
+            if not m:
+                break
+            i = int(m.lastgroup[1:])
+            f = self._finding(i, m, f"v{i}", text)
+            end = m.end()
+            if f is None:
+                retry = self._retry_at(text, m.start(), i)
+                if retry is None:
+                    pos = m.start() + 1
+                    continue
+                f, end = retry
+            out.append(f)
+            pos = max(end, m.start() + 1)
+        return out
+
+_engine = RegexEngine()
+
+def scan_text(text: str) -> List[Finding]:
+    return _engine.scan(text)
+
 def run_fallback(text: str) -> Findings:
-    out: List[Finding] = []
-    for m in RE_EMAIL.finditer(text):
-        out.append(Finding(kind="email", start=m.start(), end=m.end(),
-                           value_preview=m.group()[:2]+"***", confidence=0.85, reason="regex"))
-    for m in RE_PHONE.finditer(text):
-        out.append(Finding(kind="phone_number", start=m.start(), end=m.end(),
-                           value_preview="***"+m.group()[-4:], confidence=0.6, reason="regex"))
-    for m in RE_CC.finditer(text):
-        if _luhn_ok(m.group()):
-            out.append(Finding(kind="credit_card", start=m.start(), end=m.end(),
-                               value_preview="**** **** **** "+re.sub(r'\D','',m.group())[-4:],
-                               confidence=0.9, reason="regex+luhn"))
-    return Findings(findings=out)
+    return Findings(findings=scan_text(text))
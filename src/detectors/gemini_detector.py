@@ -1,9 +1,9 @@
-import json, os
 from typing import List
 from pydantic import BaseModel
-from google import genai
-from google.genai import types
 from src.schema import Finding, Findings
+from src.detectors.llm_backend import get_backend, TEXT_START, TEXT_END
+from src.detectors.chunking import chunk_text, rebase_findings, merge_findings
+import metrics  # src/ module, importable wherever the server runs
 
 SYSTEM_INSTRUCTIONS = """You are a security DLP classifier.
 Given plain text from an OCR pass, identify sensitive data and return spans.
@@ -21,26 +21,27 @@ class _FindingsPyd(BaseModel):
     findings: List[Finding]
 
 def detect_with_gemini(text: str) -> Findings:
-    client = genai.Client(  # picks GEMINI_API_KEY automatically if set
-        api_key=os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY")
-    ) if (os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY")) else genai.Client()
+    # Token-budgeted chunks on paragraph boundaries, classified concurrently
+    chunks = chunk_text(text)
+    prompts = [f"{SYSTEM_INSTRUCTIONS}\n\n{TEXT_START}\n{c.text}\n{TEXT_END}" for c in chunks]
 
-    prompt = f"{SYSTEM_INSTRUCTIONS}\n\nTEXT START\n{text}\nTEXT END"
+    # Ask the shared backend for JSON matching our Pydantic schema
+    responses = get_backend().generate_many(prompts, schema=_FindingsPyd, max_output_tokens=2048)
 
-    # Ask Gemini for JSON matching our Pydantic schema
-    resp = client.models.generate_content(
-        model="gemini-2.5-flash",
-        contents=prompt,
-        config=types.GenerateContentConfig(
-            response_mime_type="application/json",
-            response_schema=_FindingsPyd,
-            temperature=0.0,
-            thinking_config=types.ThinkingConfig(thinking_budget=0),
-            max_output_tokens=2048,
-        ),
-    )
-
-    # Either use parsed or fallback to JSON text
-    if getattr(resp, "parsed", None):
-        return Findings.model_validate(resp.parsed.model_dump())
-    return Findings.model_validate_json(resp.text)
+    findings, errors = [], []
+    for chunk, resp in zip(chunks, responses):
+        if isinstance(resp, Exception):
+            errors.append(resp)
+            continue
+        try:
+            parsed = Findings.model_validate_json(resp)
+        except ValueError as e:  # pydantic ValidationError: malformed or truncated JSON
+            errors.append(e)
+            continue
+        findings.extend(rebase_findings(parsed.findings, chunk))
+    if errors and len(errors) == len(chunks):
+        raise errors[0]
+    for e in errors:
+        # type only: a validation error echoes the model's answer, i.e. the sensitive values
+        metrics.error("llm_span_chunk", e)
+    return Findings(findings=merge_findings(findings))
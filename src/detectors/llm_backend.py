@@ -0,0 +1,290 @@
+import asyncio
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Sequence, Type, Union
+from pydantic import BaseModel
+
+try:
+    from dotenv import load_dotenv
+    # GEMINI_API_KEY and the LLM_* settings below may live in the repo's .env (exported variables win)
+    load_dotenv()
+except ImportError:
+    pass  # python-dotenv missing: only exported variables are seen
+
+# Backend selection and call limits (env overrides)
+LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini")            # gemini | stub
+LLM_MODEL = os.getenv("LLM_MODEL", "gemini-2.5-flash")
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "20"))          # seconds per attempt
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))     # extra attempts after the first
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "5"))
+LLM_BREAKER_COOLDOWN = float(os.getenv("LLM_BREAKER_COOLDOWN", "30"))
+LLM_STUB_LATENCY_MS = float(os.getenv("LLM_STUB_LATENCY_MS", "0"))
+
+# Prompts wrap the text under analysis in these markers (the stub backend reads them back)
+TEXT_START = "TEXT START"
+TEXT_END = "TEXT END"
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling the LLM while the circuit breaker is open."""
+
+class CircuitBreaker:
+    """
+    Opens after `failures` consecutive failed calls and rejects calls for `cooldown`
+    seconds; then lets one trial call through (half-open) and closes again if it succeeds.
+    """
+
+    def __init__(self, failures: int = LLM_BREAKER_FAILURES, cooldown: float = LLM_BREAKER_COOLDOWN):
+        self.failures = failures
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._consecutive = 0
+        self._opened_at: Optional[float] = None
+        self._trial = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            return "half-open" if time.monotonic() - self._opened_at >= self.cooldown else "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.cooldown or self._trial:
+                return False
+            self._trial = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._consecutive = 0
+            self._opened_at = None
+            self._trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self._consecutive += 1
+            if self._trial or self._consecutive >= self.failures:
+                self._opened_at = time.monotonic()
+            self._trial = False
+
+_transient: Optional[tuple] = None
+
+def _transient_errors() -> tuple:
+    """Timeout / connection exception types, including httpx's (google-genai's transport) when installed."""
+    global _transient
+    if _transient is None:
+        errors = (TimeoutError, ConnectionError)
+        try:
+            import httpx
+            errors += (httpx.TimeoutException, httpx.NetworkError)
+        except ImportError:
+            pass
+        _transient = errors
+    return _transient
+
+def _retryable(exc: Exception) -> bool:
+    # google-genai APIError carries the HTTP status in .code: only 429 and 5xx can improve on retry
+    code = getattr(exc, "code", None)
+    if isinstance(code, int):
+        return code == 429 or code >= 500
+    # otherwise only transport failures; a missing key (ValueError) or bad config fails the same way every time
+    return isinstance(exc, _transient_errors())
+
+class LLMBackend:
+    """
+    Shared LLM client: every call goes through one concurrency cap, a per-attempt timeout,
+    a bounded retry budget with backoff, and a circuit breaker. Subclasses implement _generate.
+    """
+    name = "base"
+
+    def __init__(self, timeout: float = LLM_TIMEOUT, max_retries: int = LLM_MAX_RETRIES,
+                 max_concurrency: int = LLM_MAX_CONCURRENCY, breaker: Optional[CircuitBreaker] = None):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.max_concurrency = max_concurrency
+        self.breaker = breaker or CircuitBreaker()
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        # call accounting for /api/metrics: outcome counts, retries and time spent in _generate
+        self._stats_lock = threading.Lock()
+        self.calls = {"ok": 0, "error": 0, "rejected": 0}
+        self.retries = 0
+        self.seconds = 0.0
+
+    def _count(self, outcome: Optional[str] = None, seconds: float = 0.0, retry: bool = False):
+        with self._stats_lock:
+            if outcome:
+                self.calls[outcome] += 1
+            self.seconds += seconds
+            self.retries += retry
+
+    def _generate(self, prompt: str, schema: Optional[Type[BaseModel]], max_output_tokens: Optional[int]) -> str:
+        raise NotImplementedError
+
+    def warm_up(self) -> str:
+        """Create whatever the first call would (client, worker pool) without making a request."""
+        self._pool()
+        return self.name
+
+    def generate(self, prompt: str, *, schema: Optional[Type[BaseModel]] = None,
+                 max_output_tokens: Optional[int] = None) -> str:
+        """
+        Response text for one prompt (JSON matching `schema` if given).
+        Raises CircuitOpenError without calling out while the breaker is open, or the last
+        error once the retry budget is spent.
+        """
+        if not self.breaker.allow():
+            self._count("rejected")
+            raise CircuitOpenError(f"{self.name} backend unavailable (circuit open)")
+        attempt = 0
+        while True:
+            t0 = time.perf_counter()
+            try:
+                with self._slots:
+                    t0 = time.perf_counter()
+                    text = self._generate(prompt, schema, max_output_tokens)
+                self.breaker.record_success()
+                self._count("ok", time.perf_counter() - t0)
+                return text
+            except Exception as e:
+                if attempt >= self.max_retries or not _retryable(e):
+                    self.breaker.record_failure()
+                    self._count("error", time.perf_counter() - t0)
+                    raise
+                self._count(seconds=time.perf_counter() - t0, retry=True)
+                attempt += 1
+                # exponential backoff with jitter: 0.5s, 1s, 2s ... capped at 4s
+                time.sleep(min(4.0, 0.5 * 2 ** (attempt - 1)) * (0.5 + random.random() / 2))
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency,
+                                                    thread_name_prefix=f"llm-{self.name}")
+            return self._executor
+
+    def generate_many(self, prompts: Sequence[str], **kwargs) -> List[Union[str, Exception]]:
+        """Run prompts concurrently (up to max_concurrency); failed prompts yield their exception."""
+        futures = [self._pool().submit(self.generate, p, **kwargs) for p in prompts]
+        results: List[Union[str, Exception]] = []
+        for fut in futures:
+            try:
+                results.append(fut.result())
+            except Exception as e:
+                results.append(e)
+        return results
+
+    async def agenerate(self, prompt: str, **kwargs) -> str:
+        """Async form of generate for asyncio callers; runs on the backend's shared pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool(), lambda: self.generate(prompt, **kwargs))
+
+    def status(self) -> dict:
+        with self._stats_lock:
+            calls, retries, seconds = dict(self.calls), self.retries, self.seconds
+        return {"backend": self.name, "circuit": self.breaker.state,
+                "calls": calls, "retries": retries, "seconds": round(seconds, 3)}
+
+class GeminiBackend(LLMBackend):
+    """Gemini via google-genai, with one client shared by every caller."""
+    name = "gemini"
+
+    def __init__(self, model: str = LLM_MODEL, **kwargs):
+        super().__init__(**kwargs)
+        self.model = model
+        self._client = None
+        self._client_lock = threading.Lock()
+
+    @property
+    def client(self):
+        with self._client_lock:
+            if self._client is None:
+                from google import genai
+                from google.genai import types
+                # picks GEMINI_API_KEY / GOOGLE_API_KEY from the environment
+                self._client = genai.Client(http_options=types.HttpOptions(timeout=int(self.timeout * 1000)))
+            return self._client
+
+    def warm_up(self) -> str:
+        # importing google-genai and building the client is most of a cold first call
+        self.client
+        return super().warm_up()
+
+    def _generate(self, prompt, schema, max_output_tokens):
+        from google.genai import types
+        if schema is not None:
+            config = types.GenerateContentConfig(
+                response_mime_type="application/json",
+                response_schema=schema,
+                temperature=0.0,
+                thinking_config=types.ThinkingConfig(thinking_budget=0),
+                max_output_tokens=max_output_tokens,
+            )
+        else:
+            config = types.GenerateContentConfig(max_output_tokens=max_output_tokens) if max_output_tokens else None
+        resp = self.client.models.generate_content(model=self.model, contents=prompt, config=config)
+        return resp.text or ""
+
+class StubBackend(LLMBackend):
+    """
+    Deterministic offline stand-in for load tests: answers from the regex engine over the
+    text between TEXT_START/TEXT_END, after an optional fixed latency.
+    Plain prompts get comma-separated values (or NONE), schema prompts get Findings JSON.
+    """
+    name = "stub"
+
+    def __init__(self, latency_ms: float = LLM_STUB_LATENCY_MS, **kwargs):
+        super().__init__(**kwargs)
+        self.latency_ms = latency_ms
+
+    @staticmethod
+    def _text(prompt: str) -> str:
+        start = prompt.rfind(TEXT_START)
+        if start < 0:
+            return prompt
+        body = prompt[start + len(TEXT_START):]
+        end = body.rfind(TEXT_END)
+        body = body[:end] if end >= 0 else body
+        # the markers sit on their own lines; keep the text's own blank lines intact
+        body = body[1:] if body.startswith("\n") else body
+        return body[:-1] if body.endswith("\n") else body
+
+    def _generate(self, prompt, schema, max_output_tokens):
+        from src.detectors.fallback_regex import scan_text
+        from src.schema import Findings
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000.0)
+        text = self._text(prompt)
+        findings = scan_text(text)
+        if schema is not None:
+            return Findings(findings=findings).model_dump_json()
+        values = [text[f.start:f.end] for f in findings]
+        return ", ".join(values) if values else "NONE"
+
+_BACKENDS = {"gemini": GeminiBackend, "stub": StubBackend}
+_backend: Optional[LLMBackend] = None
+_backend_lock = threading.Lock()
+
+def get_backend() -> LLMBackend:
+    """Process-wide backend chosen by LLM_BACKEND (gemini, or stub for offline runs)."""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            if LLM_BACKEND not in _BACKENDS:
+                raise ValueError(f"Unknown LLM_BACKEND {LLM_BACKEND!r}; expected one of {sorted(_BACKENDS)}")
+            _backend = _BACKENDS[LLM_BACKEND]()
+        return _backend
+
+def set_backend(backend: LLMBackend):
+    """Swap the process-wide backend (benchmarks, load tests)."""
+    global _backend
+    with _backend_lock:
+        _backend = backend
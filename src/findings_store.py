@@ -0,0 +1,73 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+import numpy as np
+
+FINDINGS_MAX_ENTRIES = int(os.getenv("FINDINGS_CACHE_SIZE", "64"))
+FINDINGS_TTL_SECONDS = float(os.getenv("FINDINGS_CACHE_TTL", "900"))
+
+class StoredFindings(NamedTuple):
+    boxes: List[Tuple[int, int, int, int]]
+    labels: List[str]
+
+class FindingsStore:
+    """
+    Short-lived LRU + TTL store of detection results, so a redact request can render the
+    boxes a scan request already found instead of running OCR and the LLM again.
+
+    Handles are a hash of the decoded pixels and the category set, so a handle only
+    resolves for the exact image (and categories) it was computed on; an edited or
+    different image simply misses. Only boxes and labels are kept, never text.
+    """
+
+    def __init__(self, max_entries: int = FINDINGS_MAX_ENTRIES, ttl: float = FINDINGS_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data: "OrderedDict[str, Tuple[float, StoredFindings]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def handle(img: np.ndarray, categories: Iterable[str]) -> str:
+        h = hashlib.blake2b(digest_size=16)
+        h.update(repr((img.shape, sorted(c.lower() for c in (categories or [])))).encode("utf-8"))
+        h.update(np.ascontiguousarray(img).data)
+        return h.hexdigest()
+
+    def put(self, img: np.ndarray, categories, boxes, labels) -> str:
+        key = self.handle(img, categories)
+        with self._lock:
+            self._data[key] = (time.time() + self.ttl, StoredFindings(list(boxes), list(labels)))
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+        return key
+
+    def get(self, img: np.ndarray, categories, handle: Optional[str] = None) -> Optional[StoredFindings]:
+        """Findings stored for this image; a handle from a different image never matches."""
+        key = self.handle(img, categories)
+        if handle and handle != key:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] < time.time():
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._data), "hits": self.hits, "misses": self.misses}
+
+# Shared by /api/scan-image and /api/redact-image
+findings_store = FindingsStore()
@@ -1,44 +1,71 @@
 import cv2
 import numpy as np
-from detector import detector
+from detector import detect_regions
+from redactor import load_bgr, render_redactions
 
-def blackout_regions(output_path, categories, image_path=None):
+def split_categories(categories):
     """
-    Black out sensitive areas in an image.
+    categories: {category: 1/0, or a style name}. Returns (categories to detect,
+    {category: style} for the ones that named a style instead of 1).
+    """
+    cat = [key for key, value in categories.items() if value]
+    styles = {key: value for key, value in categories.items() if isinstance(value, str)}
+    return cat, styles
 
-    output_path: where to save the blacked-out image
-    categories: a dictionary of categories and if they are sensitive
-    image_path: path to original image if none is provided, a screenshot of the current screen will be taken
+def redact_regions(categories, image=None, output_path=None, method="blackout", findings=None, styles=None):
     """
-    cat = [key for key in categories.keys() if categories[key] == 1]
+    Redact sensitive areas in an image.
 
-    img, boxes = detector(cat, image_path)
+    categories: a dictionary of categories and if they are sensitive; a value may also be a
+                style ("blackout", "blur", "pixelate") to redact that category differently
+    image: BGR ndarray or path to the original image; if none is provided, a screenshot of the current screen will be taken
+    output_path: optional path to also save the redacted image to
+    method: style for every category without its own
+    findings: (boxes, labels) from an earlier detection of this image (e.g. findings_store),
+              so detection is not run again
+    styles: extra {category: style} overrides that don't change what is detected
 
-    for (x, y, w, h) in boxes:
-        cv2.rectangle(img, (x, y), (x + w, y + h), (0, 0, 0), -1)
+    Returns the redacted image as a BGR ndarray.
+    """
+    cat, category_styles = split_categories(categories)
+    styles = {**category_styles, **(styles or {})}
 
-    cv2.imwrite(output_path, img)
-    return output_path
+    if findings is not None:
+        img = load_bgr(image)
+        boxes, labels = findings
+    else:
+        img, boxes, labels = detect_regions(cat, image)
+    render_redactions(img, boxes, labels, styles, default=method)
 
-def blur_regions(output_path, categories, image_path=None):
+    if output_path:
+        cv2.imwrite(output_path, img)
+    return img
+
+def blackout_regions(output_path=None, categories=None, image_path=None, *, findings=None):
     """
-    Blur sensitive areas in an image.
+    Black out sensitive areas in an image.
 
-    output_path: where to save the blurred image
+    output_path: optional path to also save the blacked-out image to
     categories: a dictionary of categories and if they are sensitive
-    image_path: path to original image if none is provided, a screenshot of the current screen will be taken
+    image_path: path to original image, or a BGR ndarray; if none is provided, a screenshot of the current screen will be taken
+    findings: (boxes, labels) from an earlier detection of this image, so detection is not run again
+
+    Returns the redacted image as a BGR ndarray.
+    """
+    return redact_regions(categories or {}, image_path, output_path, "blackout", findings)
+
+def blur_regions(output_path=None, categories=None, image_path=None, *, findings=None):
     """
-    cat = [key for key in categories.keys() if categories[key] == 1]
-    
-    img, boxes = detector(cat, image_path)
+    Blur sensitive areas in an image.
 
-    for (x, y, w, h) in boxes:
-        roi = img[y:y+h, x:x+w]
-        blurred = cv2.GaussianBlur(roi, (51, 51), 0)
-        img[y:y+h, x:x+w] = blurred
+    output_path: optional path to also save the blurred image to
+    categories: a dictionary of categories and if they are sensitive
+    image_path: path to original image, or a BGR ndarray; if none is provided, a screenshot of the current screen will be taken
+    findings: (boxes, labels) from an earlier detection of this image, so detection is not run again
 
-    cv2.imwrite(output_path, img)
-    return output_path
+    Returns the redacted image as a BGR ndarray.
+    """
+    return redact_regions(categories or {}, image_path, output_path, "blur", findings)
 
 if __name__ == "__main__":
-    blur_regions("output_blurred.png", {})
\ No newline at end of file
+    blur_regions("output_blurred.png", {})
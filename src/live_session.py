@@ -0,0 +1,142 @@
+import threading
+import numpy as np
+import cv2
+from typing import List, Optional, Tuple
+from ocr_schedule import ocr_regions
+from ocr_tokens import OcrTokens
+
+DIFF_SCALE = 0.125         # change map is computed on a 1/8 downsampled gray frame
+TILE = 64                  # tile size in source pixels
+DIFF_THRESHOLD = 12        # per-pixel gray delta that counts as "changed"
+FULL_REFRESH_RATIO = 0.5   # above this share of changed tiles, just OCR the whole frame
+
+class LiveSession:
+    """
+    Per-client state for live scanning: the previous frame (downsampled), its OCR tokens
+    and the last detection result. Only tiles that changed since the previous frame are
+    re-OCRed and spliced into the cached token set.
+
+    Token coordinates are source-frame pixels, as run_ocr returns them; layout rows
+    without text are dropped from the cache. Changed regions are read with the same OCR
+    profiles as a full frame (see ocr_schedule.ocr_regions).
+    """
+
+    def __init__(self, tile: int = TILE, diff_threshold: int = DIFF_THRESHOLD,
+                 full_refresh_ratio: float = FULL_REFRESH_RATIO):
+        self.tile = tile
+        self.diff_threshold = diff_threshold
+        self.full_refresh_ratio = full_refresh_ratio
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.shape: Optional[Tuple[int, int]] = None
+        self.prev_small: Optional[np.ndarray] = None
+        self.ocr: Optional[OcrTokens] = None
+        self.boxes: Optional[list] = None
+        self.labels: list = []
+        self.categories_key: Optional[tuple] = None
+        self.changed = True
+        self.last_change_ratio = 1.0
+        self.last_regions: List[Tuple[int, int, int, int]] = []
+
+    # -------------------- change detection --------------------
+    def _small_gray(self, img: np.ndarray) -> np.ndarray:
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        H, W = gray.shape
+        return cv2.resize(gray, (max(1, int(W * DIFF_SCALE)), max(1, int(H * DIFF_SCALE))),
+                          interpolation=cv2.INTER_AREA)
+
+    def _changed_tiles(self, small: np.ndarray) -> np.ndarray:
+        diff = cv2.absdiff(small, self.prev_small) > self.diff_threshold
+        t = max(1, int(round(self.tile * DIFF_SCALE)))
+        h, w = diff.shape
+        gh, gw = -(-h // t), -(-w // t)
+        padded = np.zeros((gh * t, gw * t), dtype=bool)
+        padded[:h, :w] = diff
+        return padded.reshape(gh, t, gw, t).any(axis=(1, 3))
+
+    def _changed_regions(self, grid: np.ndarray) -> List[Tuple[int, int, int, int]]:
+        """Group changed tiles (dilated by one tile) into source-pixel rectangles."""
+        H, W = self.shape
+        mask = cv2.dilate(grid.astype(np.uint8), np.ones((3, 3), np.uint8))
+        n, _, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+        regions = []
+        for gx, gy, gw, gh, _ in stats[1:n]:
+            x, y = gx * self.tile, gy * self.tile
+            regions.append((x, y, min(W, (gx + gw) * self.tile) - x, min(H, (gy + gh) * self.tile) - y))
+        return regions
+
+    # -------------------- token splicing --------------------
+    def _expand_to_tokens(self, region):
+        """Grow a region so words cut by its edge are re-read whole instead of as fragments."""
+        x, y, w, h = region
+        x1, y1, x2, y2 = x, y, x + w, y + h
+        hit = self.ocr.boxes()[self.ocr.intersecting([region])]
+        if len(hit):
+            x1, y1 = min(x1, hit[:, 0].min()), min(y1, hit[:, 1].min())
+            x2, y2 = max(x2, (hit[:, 0] + hit[:, 2]).max()), max(y2, (hit[:, 1] + hit[:, 3]).max())
+        H, W = self.shape
+        nx, ny = max(0, int(x1)), max(0, int(y1))
+        nx2, ny2 = min(W, int(x2)), min(H, int(y2))
+        return (nx, ny, nx2 - nx, ny2 - ny)
+
+    def _splice(self, img: np.ndarray, regions, region_ocr):
+        regions = [self._expand_to_tokens(r) for r in regions]
+        kept = self.ocr.select(~self.ocr.intersecting(regions))
+
+        fresh = region_ocr(img, [r for r in regions if r[2] > 0 and r[3] > 0]).words()
+        # re-read blocks are numbered after the kept ones so their lines never mix
+        fresh.data["block_num"] += int(kept.data["block_num"].max(initial=0)) + 1
+
+        self.last_regions = regions
+        return OcrTokens.concat([kept, fresh])
+
+    # -------------------- public API --------------------
+    def update(self, img: np.ndarray, full_ocr, region_ocr=ocr_regions) -> OcrTokens:
+        """
+        Bring the cached OCR tokens up to date with a new frame.
+
+        full_ocr: callable(img) -> OcrTokens, used for the first frame, size changes and
+        frames where most of the screen changed.
+        region_ocr: callable(img, regions) -> OcrTokens for the changed regions.
+        Sets self.changed to False when nothing on screen moved.
+        """
+        small = self._small_gray(img)
+        shape = img.shape[:2]
+
+        if self.ocr is None or shape != self.shape or self.prev_small is None:
+            self.shape = shape
+            self.ocr = full_ocr(img).words()
+            self.prev_small = small
+            self.changed, self.last_change_ratio = True, 1.0
+            self.last_regions = [(0, 0, shape[1], shape[0])]
+            return self.ocr
+
+        grid = self._changed_tiles(small)
+        self.last_change_ratio = float(grid.mean()) if grid.size else 0.0
+        self.prev_small = small
+
+        if not grid.any():
+            self.changed = False
+            self.last_regions = []
+            return self.ocr
+
+        self.changed = True
+        if self.last_change_ratio > self.full_refresh_ratio:
+            self.ocr = full_ocr(img).words()
+            self.last_regions = [(0, 0, shape[1], shape[0])]
+        else:
+            self.ocr = self._splice(img, self._changed_regions(grid), region_ocr)
+        return self.ocr
+
+    def cached_boxes(self, categories) -> Optional[list]:
+        """Previous detection result, if the screen is unchanged and the categories match."""
+        if not self.changed and self.boxes is not None and self.categories_key == tuple(sorted(categories or [])):
+            return list(self.boxes)
+        return None
+
+    def store_boxes(self, categories, boxes, labels=None):
+        self.categories_key = tuple(sorted(categories or []))
+        self.boxes = list(boxes)
+        self.labels = list(labels) if labels is not None else ["sensitive_data"] * len(self.boxes)
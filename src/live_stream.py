@@ -0,0 +1,106 @@
+import json
+import metrics
+import threading
+import time
+from typing import Callable, Optional
+
+# Settings a client may change with a JSON text message; any other key is ignored
+CLIENT_SETTINGS = ('scale', 'categories')
+
+class LatestFrameSlot:
+    """
+    Single-slot mailbox between the socket reader and the detection loop.
+    Only the newest frame is kept; a frame that arrives before the previous one
+    was taken replaces it (and is counted as dropped).
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._item = None
+        self._seq = 0
+        self.dropped = 0
+        self.closed = False
+
+    def put(self, frame: bytes, params: dict):
+        with self._cond:
+            if self._item is not None:
+                self.dropped += 1
+            self._seq += 1
+            self._item = (self._seq, frame, dict(params), time.perf_counter())
+            self._cond.notify()
+
+    def take(self, timeout: Optional[float] = None):
+        """Block until a frame is available; returns (seq, frame, params, received_at) or None if closed."""
+        with self._cond:
+            while self._item is None and not self.closed:
+                if not self._cond.wait(timeout):
+                    return None
+            item, self._item = self._item, None
+            return item
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+def parse_settings(message) -> dict:
+    """The CLIENT_SETTINGS in a JSON text message; {} for anything that is not a JSON object."""
+    try:
+        settings = json.loads(message)
+    except ValueError:
+        return {}
+    if not isinstance(settings, dict):
+        return {}
+    return {k: settings[k] for k in CLIENT_SETTINGS if k in settings}
+
+def _read_frames(ws, slot: LatestFrameSlot, params: dict):
+    """Reader thread: binary messages are frames, text messages are JSON settings (see CLIENT_SETTINGS)."""
+    try:
+        while True:
+            message = ws.receive()
+            if message is None:
+                break
+            if isinstance(message, (bytes, bytearray)):
+                slot.put(bytes(message), params)
+            else:
+                params.update(parse_settings(message))
+    except Exception:
+        pass  # connection closed
+    finally:
+        slot.close()
+
+def serve_live_stream(ws, process_frame: Callable[[bytes, dict], dict]):
+    """
+    Run one live session over a websocket until the client disconnects.
+
+    A reader thread keeps only the newest frame; this thread processes frames one at a
+    time with process_frame(frame_bytes, params) -> dict and pushes each result back as
+    JSON as soon as it is ready. Frames that arrive while a detection is running are
+    dropped, so latency stays bounded by a single detection.
+    """
+    slot = LatestFrameSlot()
+    params: dict = {}
+    reader = threading.Thread(target=_read_frames, args=(ws, slot, params), daemon=True)
+    reader.start()
+
+    while True:
+        item = slot.take()
+        if item is None:
+            break
+        seq, frame, frame_params, received_at = item
+        try:
+            result = process_frame(frame, frame_params)
+        except Exception as e:
+            metrics.error('live_frame', e)
+            result = {'findings': [], 'warning': f'Detection failed: {type(e).__name__}'}
+        result.update({
+            'frame': seq,
+            'dropped': slot.dropped,
+            'latencyMs': round((time.perf_counter() - received_at) * 1000, 1),
+        })
+        try:
+            ws.send(json.dumps(result))
+        except Exception:
+            break  # client went away
+
+    slot.close()
@@ -0,0 +1,388 @@
+# In-process observability for the API: timing spans for each pipeline stage, grouped
+# per request, plus counters and histograms rendered in the Prometheus text format on
+# /api/metrics. Only stage names, counts and durations are recorded, never frame text,
+# OCR output or model answers.
+#
+# Slow requests (over SLOW_REQUEST_MS) are logged with their span breakdown and passed
+# to on_slow_request hooks; with PROFILE_SLOW_REQUESTS=1 a sampling profiler also keeps
+# their folded stacks (flamegraph.pl / speedscope input) in PROFILE_DIR.
+
+import contextlib
+import contextvars
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter as _Tally
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+VERBOSE = os.getenv("SHIELD_VERBOSE", "0") == "1"      # per-frame progress prints (counts only)
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "2000"))
+PROFILE_SLOW = os.getenv("PROFILE_SLOW_REQUESTS", "0") == "1"
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "1.0"))   # share of requests profiled
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_DIR = os.getenv("PROFILE_DIR")                  # folded stacks of slow requests go here
+PROFILE_MAX_DEPTH = 64
+
+STAGE_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+def debug(msg: str):
+    """Progress print for local debugging; silent unless SHIELD_VERBOSE=1. Never pass frame text."""
+    if VERBOSE:
+        print(msg)
+
+def error(where: str, exc: BaseException):
+    """
+    Count a handled error under `where` and note it on stderr by exception type only (messages
+    can carry frame text); the traceback follows with SHIELD_VERBOSE=1.
+    """
+    ERRORS.inc(where=where, type=type(exc).__name__)
+    print(f"✗ {where} failed: {type(exc).__name__}", file=sys.stderr)
+    if VERBOSE:
+        traceback.print_exception(type(exc), exc, exc.__traceback__, file=sys.stderr)
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(pairs: Sequence[Tuple[str, object]]) -> str:
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}" if pairs else ""
+
+def _number(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if isinstance(v, float) and not float(v).is_integer() else str(int(v))
+
+# -------------------- metric types --------------------
+class _Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[k]) for k in self.labelnames)
+
+    def samples(self) -> List[Tuple[str, tuple, float]]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        out = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        out += [f"{self.name}{suffix}{_labels(pairs)} {_number(v)}" for suffix, pairs, v in self.samples()]
+        return out
+
+class Counter(_Metric):
+    type = "counter"
+
+    def __init__(self, name, help, labelnames=()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [("", tuple(zip(self.labelnames, key)), v) for key, v in items]
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets: Sequence[float] = STAGE_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[tuple, list] = {}   # key -> [per-bucket counts..., +Inf count, sum]
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            else:
+                series[len(self.buckets)] += 1
+            series[-1] += value
+
+    def samples(self):
+        with self._lock:
+            items = sorted((k, list(s)) for k, s in self._series.items())
+        out = []
+        for key, series in items:
+            pairs = tuple(zip(self.labelnames, key))
+            total = 0
+            for bound, n in zip(self.buckets + (float("inf"),), series[:-1]):
+                total += n
+                out.append(("_bucket", pairs + (("le", _number(bound)),), total))
+            out.append(("_sum", pairs, series[-1]))
+            out.append(("_count", pairs, total))
+        return out
+
+class Registry:
+    """
+    Metrics of this process plus collectors: callables evaluated at scrape time that return
+    (name, type, help, [(labels dict, value)]) for state other modules already keep.
+    """
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], Iterable[tuple]]] = []
+
+    def counter(self, name, help, labelnames=()) -> Counter:
+        metric = Counter(name, help, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name, help, labelnames=(), buckets=STAGE_BUCKETS) -> Histogram:
+        metric = Histogram(name, help, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collect: Callable[[], Iterable[tuple]]):
+        self._collectors.append(collect)
+        return collect
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines += metric.render()
+        for collect in self._collectors:
+            try:
+                families = list(collect())
+            except Exception as e:
+                error("metrics_collector", e)
+                continue
+            for name, kind, help, values in families:
+                lines += [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+                lines += [f"{name}{_labels(tuple(labels.items()))} {_number(v)}" for labels, v in values]
+        return "\n".join(lines) + "\n"
+
+registry = Registry()
+
+STAGE_SECONDS = registry.histogram("shareshield_stage_seconds", "Time spent in each pipeline stage", ["stage"])
+REQUEST_SECONDS = registry.histogram("shareshield_request_seconds", "End-to-end request latency",
+                                     ["endpoint"], REQUEST_BUCKETS)
+REQUESTS = registry.counter("shareshield_requests_total", "Requests handled", ["endpoint", "status"])
+FALLBACKS = registry.counter("shareshield_fallback_total",
+                             "Regex fallback activations instead of LLM classification", ["reason"])
+BOXES_PER_FRAME = registry.histogram("shareshield_boxes_per_frame", "Redaction boxes found per detection",
+                                     (), COUNT_BUCKETS)
+WHOLE_FRAME_OCR = registry.counter("shareshield_whole_frame_ocr_total",
+                                   "Frames OCRed whole instead of by proposed region", ["reason"])
+ERRORS = registry.counter("shareshield_errors_total", "Errors caught and handled, by place and exception type",
+                          ["where", "type"])
+SLOW_REQUESTS = registry.counter("shareshield_slow_requests_total",
+                                 f"Requests slower than SLOW_REQUEST_MS ({SLOW_REQUEST_MS:g} ms)", ["endpoint"])
+
+# -------------------- tracing --------------------
+class Trace:
+    """Spans of one request (or one live frame): (stage, start offset s, duration s)."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.start = time.perf_counter()
+        self.spans: List[Tuple[str, Optional[float], float]] = []
+        self.elapsed: Optional[float] = None
+        self.profile: Optional[_Tally] = None
+        self._token = None
+
+    def summary(self) -> dict:
+        stages: Dict[str, float] = {}
+        for stage, _, seconds in self.spans:
+            stages[stage] = stages.get(stage, 0.0) + seconds
+        return {"request": self.name,
+                "total_ms": round(1000 * (self.elapsed or time.perf_counter() - self.start), 1),
+                "stages_ms": {k: round(1000 * v, 1) for k, v in stages.items()}}
+
+_current: "contextvars.ContextVar[Optional[Trace]]" = contextvars.ContextVar("shareshield_trace", default=None)
+
+def current_trace() -> Optional[Trace]:
+    return _current.get()
+
+def record(stage: str, seconds: float, started: Optional[float] = None):
+    """Record a stage duration measured elsewhere (e.g. in a pool worker)."""
+    STAGE_SECONDS.observe(seconds, stage=stage)
+    trace = _current.get()
+    if trace is not None:
+        trace.spans.append((stage, None if started is None else started - trace.start, seconds))
+
+@contextlib.contextmanager
+def span(stage: str):
+    """Time the enclosed block as one `stage` of the current request."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(stage, time.perf_counter() - t0, t0)
+
+def traced_call(fn, *args, **kwargs):
+    """
+    Pool-side wrapper: run fn(*args, **kwargs) and return (result, [(stage, seconds)]) so
+    the spans recorded in a worker process reach the parent's metrics via absorb().
+    """
+    trace = Trace(getattr(fn, "__name__", "job"))
+    token = _current.set(trace)
+    try:
+        result = fn(*args, **kwargs)
+    finally:
+        _current.reset(token)
+    return result, [(stage, seconds) for stage, _, seconds in trace.spans]
+
+def absorb(traced):
+    """Parent side of traced_call: record the worker's spans, return its result."""
+    result, spans = traced
+    for stage, seconds in spans:
+        record(stage, seconds)
+    return result
+
+_slow_hooks: List[Callable[[dict], None]] = []
+
+def on_slow_request(hook: Callable[[dict], None]):
+    """hook(summary) runs after every slow request; summary has stages_ms and, when profiled, top stacks."""
+    _slow_hooks.append(hook)
+    return hook
+
+def start_trace(name: str) -> Trace:
+    """Open the request-level trace on this context; close it with finish_trace()."""
+    trace = Trace(name)
+    trace._token = _current.set(trace)
+    if PROFILE_SLOW and (PROFILE_SAMPLE_RATE >= 1.0 or _sample()):
+        trace.profile = profiler.watch(threading.get_ident())
+    return trace
+
+def finish_trace(trace: Trace, status: str = "ok"):
+    trace.elapsed = time.perf_counter() - trace.start
+    if trace.profile is not None:
+        profiler.unwatch(threading.get_ident())
+    if trace._token is not None:
+        try:
+            _current.reset(trace._token)
+        except ValueError:
+            _current.set(None)   # finished from another context (e.g. an async view)
+        trace._token = None
+    REQUEST_SECONDS.observe(trace.elapsed, endpoint=trace.name)
+    REQUESTS.inc(endpoint=trace.name, status=status)
+    if 1000 * trace.elapsed >= SLOW_REQUEST_MS:
+        _report_slow(trace)
+
+@contextlib.contextmanager
+def traced(name: str):
+    """start_trace/finish_trace around a block (live frames, CLI runs)."""
+    trace = start_trace(name)
+    status = "ok"
+    try:
+        yield trace
+    except BaseException:
+        status = "error"
+        raise
+    finally:
+        finish_trace(trace, status)
+
+def _report_slow(trace: Trace):
+    SLOW_REQUESTS.inc(endpoint=trace.name)
+    summary = trace.summary()
+    if trace.profile:
+        summary["profile"] = [{"stack": stack, "samples": n} for stack, n in trace.profile.most_common(10)]
+        if PROFILE_DIR:
+            try:
+                os.makedirs(PROFILE_DIR, exist_ok=True)
+                name = f"{time.strftime('%Y%m%d-%H%M%S')}-{trace.name.strip('/').replace('/', '_') or 'root'}.folded"
+                path = os.path.join(PROFILE_DIR, name)
+                with open(path, "w") as f:
+                    f.writelines(f"{stack} {n}\n" for stack, n in trace.profile.items())
+                summary["profile_path"] = path
+            except OSError as e:
+                error("profile_write", e)
+    print(f"⚠ Slow request {trace.name}: {summary['total_ms']} ms {summary['stages_ms']}")
+    for hook in list(_slow_hooks):
+        try:
+            hook(summary)
+        except Exception as e:
+            error("slow_request_hook", e)
+
+# -------------------- sampling profiler --------------------
+_sample_lock = threading.Lock()
+_sample_acc = 0.0
+
+def _sample() -> bool:
+    # deterministic 1-in-N spacing instead of random draws
+    global _sample_acc
+    with _sample_lock:
+        _sample_acc += PROFILE_SAMPLE_RATE
+        if _sample_acc >= 1.0:
+            _sample_acc -= 1.0
+            return True
+        return False
+
+def _fold(frame) -> str:
+    parts = []
+    while frame is not None and len(parts) < PROFILE_MAX_DEPTH:
+        code = frame.f_code
+        parts.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+        frame = frame.f_back
+    return ";".join(reversed(parts))
+
+class SamplingProfiler:
+    """
+    One background thread that samples the stacks of watched threads every interval via
+    sys._current_frames(). Costs nothing while no thread is watched.
+    """
+
+    def __init__(self, interval_ms: float = PROFILE_INTERVAL_MS):
+        self.interval = interval_ms / 1000.0
+        self._watched: Dict[int, _Tally] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def watch(self, thread_id: int) -> _Tally:
+        with self._lock:
+            stacks = self._watched[thread_id] = _Tally()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+                self._thread.start()
+        self._wake.set()
+        return stacks
+
+    def unwatch(self, thread_id: int) -> Optional[_Tally]:
+        with self._lock:
+            return self._watched.pop(thread_id, None)
+
+    def _run(self):
+        while True:
+            with self._lock:
+                idle = not self._watched
+                if idle:
+                    self._wake.clear()
+            if idle:
+                self._wake.wait()
+                continue
+            time.sleep(self.interval)
+            frames = sys._current_frames()
+            with self._lock:
+                for thread_id, stacks in self._watched.items():
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        stacks[_fold(frame)] += 1
+
+profiler = SamplingProfiler()
+
+def render() -> str:
+    return registry.render()
@@ -3,17 +3,37 @@
 # from pytesseract import pytesseract
 # pytesseract.tesseract_cmd = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
 
+import os
+import bisect
 import numpy as np
 import cv2
-import mss
-import re
+from concurrent.futures import ProcessPoolExecutor
 from typing import Dict, List, Tuple, Optional
-from pytesseract import image_to_data, Output
+import ocr_engine
+import metrics
+from aho_corasick import AhoCorasick
+from ocr_tokens import OcrTokens, OcrLine, Transform, build_lines
+from ocr_engine import get_engine
+from text_regions import propose_text_regions, estimate_glyph_height
+from capture import FrameRef, get_capture, read_frame
+from preprocess_stream import needs_streaming, preprocess_streaming, iter_preprocessed_strips
 
 MIN_CONF = 0
-UPSCALE = 1.9 
+UPSCALE = 1.9               # used when no text-like structure is found to measure
 BOTTOM_BAND = 0.2 
 
+# Adaptive scaling: each OCR input is resized so its text lines are about this tall
+TARGET_GLYPH_HEIGHT = 28    # preprocessed pixels per text-line component
+MIN_SCALE = 0.5             # HiDPI/4K captures are shrunk down to this
+MAX_SCALE = 3.0
+MERGE_GAP = 3               # source px between token boxes still merged into one (the old 6 px at 1.9x)
+
+# Tiled OCR: the preprocessed frame is cut into horizontal strips that are OCRed in parallel
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", "0")) or (os.cpu_count() or 1)
+STRIP_HEIGHT = 480          # preprocessed pixels owned by each strip
+STRIP_OVERLAP = 96          # extra context above and below each strip (must exceed a text line)
+TILED_MIN_PIXELS = 2_000_000  # smaller images go to a single Tesseract call
+
 # -------------------- Capture --------------------
 def capture_screen(monitor_index: int = 1, image_path: Optional[str] = None) -> np.ndarray:
     if image_path:
@@ -22,12 +42,15 @@ def capture_screen(monitor_index: int = 1, image_path: Optional[str] = None) ->
             raise FileNotFoundError(f"Could not load image from path: {image_path}")
         return np.ascontiguousarray(img, dtype=np.uint8)
     else:
-        with mss.mss() as sct:
-            raw = sct.grab(sct.monitors[monitor_index])   # BGRA
-            return np.array(raw)[:, :, :3].copy()         # BGR
+        # persistent mss handle; one BGRA->BGR pass into a fresh array
+        with metrics.span("capture"):
+            return get_capture(monitor_index).grab()
 
 def preprocess_for_ocr(img_bgr: np.ndarray, invert_if_dark=True, upscale=UPSCALE,
                        binarize: Optional[str] = "otsu") -> np.ndarray:
+    if needs_streaming(img_bgr.shape, upscale or 1.0):
+        # 8K / multi-monitor frames: same output, built tile by tile under OCR_MEMORY_BUDGET_MB
+        return preprocess_streaming(img_bgr, invert_if_dark, upscale, binarize)
     if upscale and upscale != 1.0:
         img_bgr = cv2.resize(img_bgr, None, fx=upscale, fy=upscale, interpolation=cv2.INTER_CUBIC)
 
@@ -45,116 +68,334 @@ def preprocess_for_ocr(img_bgr: np.ndarray, invert_if_dark=True, upscale=UPSCALE
     else:
         return gray
 
-def _image_to_data_with_offset(img_gray: np.ndarray, cfg: str, offset_xy=(0, 0)) -> Dict[str, List]:
-    data = image_to_data(img_gray, output_type=Output.DICT, config=cfg, lang="eng")
-    offx, offy = offset_xy
-    for i in range(len(data["text"])):
-        data["left"][i] += offx
-        data["top"][i]  += offy
-    return data
+def choose_scale(img_bgr: np.ndarray) -> float:
+    """Resize factor that brings the measured text height to TARGET_GLYPH_HEIGHT."""
+    glyph = estimate_glyph_height(img_bgr)
+    if not glyph:
+        return UPSCALE
+    return float(np.clip(TARGET_GLYPH_HEIGHT / glyph, MIN_SCALE, MAX_SCALE))
+
+def _as_tokens(ocr) -> OcrTokens:
+    return ocr if isinstance(ocr, OcrTokens) else OcrTokens.from_dict(ocr)
+
+def _image_to_data(img_gray: np.ndarray, opts: dict, transform: Optional[Transform] = None) -> OcrTokens:
+    with metrics.span("ocr_pass"):
+        tokens = OcrTokens.from_dict(get_engine().image_to_data(img_gray, **opts))
+    return transform.to_source(tokens) if transform else tokens
+
+# -------------------- Tiled OCR --------------------
+_pool: Optional[ProcessPoolExecutor] = None
+
+def _init_worker():
+    # one Tesseract per core: keep each from spawning its own OpenMP threads
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+    # each worker process owns a single engine handle, never one inherited through fork
+    ocr_engine.ENGINE_POOL_SIZE = 1
+    ocr_engine._engine = None
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=OCR_WORKERS, initializer=_init_worker)
+    return _pool
+
+def _warm_worker():
+    """Load this process's engine and run Tesseract once on a blank line, so its models are in memory."""
+    engine = get_engine()
+    engine.image_to_data(np.full((32, 96), 255, dtype=np.uint8), psm=7)
+    return engine.name, os.getpid()
+
+def warm_up(workers: bool = True) -> dict:
+    """
+    Pre-load OCR before the first frame: the engine in this process and, when OCR fans out
+    to the process pool, every worker with its own engine. Returns {"engine", "workers"}.
+    """
+    name, _ = _warm_worker()
+    pids = set()
+    if workers and OCR_WORKERS > 1:
+        # submitted back to back, each job finds no idle worker, so the pool starts all of them
+        futures = [_get_pool().submit(_warm_worker) for _ in range(OCR_WORKERS)]
+        pids = {fut.result()[1] for fut in futures}
+    return {"engine": name, "workers": len(pids)}
+
+def _ocr_strip(strip: np.ndarray, opts: dict, y0: int, own_y1: int, own_y2: int) -> OcrTokens:
+    """OCR one strip and keep only the tokens whose vertical centre lies in the strip's own zone."""
+    tokens = _image_to_data(strip, opts, Transform(1.0, 0, y0))
+    return tokens.select(tokens.centers_in_rows(own_y1, own_y2))
+
+def _stack_blocks(parts: List[OcrTokens]) -> OcrTokens:
+    """
+    Concatenate separately OCRed parts, numbering each part's blocks after the previous
+    part's highest block so their (block, par, line) keys never collide and lines never merge
+    across parts.
+    """
+    next_block = 0
+    for tokens in parts:
+        if not len(tokens):
+            continue
+        tokens.data["block_num"] += next_block - int(tokens.data["block_num"].min())
+        next_block = int(tokens.data["block_num"].max()) + 1
+    return OcrTokens.concat(parts)
+
+def _tiled_image_to_data(prep: np.ndarray, opts: dict, strip_height: int = STRIP_HEIGHT,
+                         overlap: int = STRIP_OVERLAP) -> OcrTokens:
+    """
+    Same result as a single image_to_data call, computed on overlapping horizontal strips
+    in a process pool. Every strip reads `overlap` extra pixels above and below the band it
+    owns, so a line crossing a seam is read whole by exactly one strip.
+    """
+    H = prep.shape[0]
+    futures = []
+    for own_y1 in range(0, H, strip_height):
+        own_y2 = min(H, own_y1 + strip_height)
+        y0, y1 = max(0, own_y1 - overlap), min(H, own_y2 + overlap)
+        futures.append(_get_pool().submit(metrics.traced_call, _ocr_strip, prep[y0:y1], opts, y0, own_y1, own_y2))
+
+    # keep (block, par, line) keys unique across strips so lines never merge over a seam
+    return _stack_blocks([metrics.absorb(fut.result()) for fut in futures])
+
+def _streamed_image_to_data(img_bgr: np.ndarray, scale: float, opts: dict, strip_height: int = STRIP_HEIGHT,
+                            overlap: int = STRIP_OVERLAP) -> OcrTokens:
+    """
+    _tiled_image_to_data for frames too large to preprocess in memory: each strip is
+    preprocessed only when it is submitted, and at most two strips per worker are in
+    flight, so the full-size preprocessed frame never exists.
+    """
+    pool = _get_pool()
+    pending, parts = [], []
+
+    def collect(fut):
+        parts.append(metrics.absorb(fut.result()))
+
+    for strip, y0, own_y1, own_y2 in iter_preprocessed_strips(img_bgr, strip_height, overlap, upscale=scale):
+        pending.append(pool.submit(metrics.traced_call, _ocr_strip, strip, opts, y0, own_y1, own_y2))
+        if len(pending) >= 2 * OCR_WORKERS:
+            collect(pending.pop(0))
+    for fut in pending:
+        collect(fut)
+    return _stack_blocks(parts)
+
+def _use_tiled(shape, psm: int, tiled: Optional[bool]) -> bool:
+    """shape: (height, width) of the preprocessed image."""
+    if tiled is not None:
+        return tiled
+    # single line/word modes read one line anyway; cutting them up only hurts
+    return psm not in (7, 8, 13) and OCR_WORKERS > 1 and shape[0] * shape[1] >= TILED_MIN_PIXELS \
+        and shape[0] > STRIP_HEIGHT + STRIP_OVERLAP
+
+def _ocr_image(img_bgr: np.ndarray, opts: dict, origin=(0, 0), tiled: Optional[bool] = False) -> OcrTokens:
+    """
+    Scale, preprocess and OCR one image (a frame or a crop of it at `origin`).
+    The scale is picked from the image's own text height and undone afterwards, so the
+    tokens come back in source-frame pixels.
+    """
+    scale = choose_scale(img_bgr)
+    transform = Transform(scale, *origin)
+    H, W = img_bgr.shape[:2]
+    if _use_tiled((int(round(H * scale)), int(round(W * scale))), opts["psm"], tiled):
+        if needs_streaming(img_bgr.shape, scale):
+            return transform.to_source(_streamed_image_to_data(img_bgr, scale, opts))
+        with metrics.span("preprocess"):
+            prep = preprocess_for_ocr(img_bgr, upscale=scale)
+        return transform.to_source(_tiled_image_to_data(prep, opts))
+    with metrics.span("preprocess"):
+        prep = preprocess_for_ocr(img_bgr, upscale=scale)
+    return _image_to_data(prep, opts, transform)
+
+# -------------------- Region OCR --------------------
+def _ocr_shared(ref: FrameRef, opts: dict, rect) -> OcrTokens:
+    """Worker side of a shared-memory job: crop the frame straight out of the ring."""
+    x, y, w, h = rect
+    return _ocr_image(read_frame(ref)[y:y+h, x:x+w], opts, (x, y))
+
+def run_ocr_jobs(img_bgr: np.ndarray, jobs, frame_ref: Optional[FrameRef] = None) -> OcrTokens:
+    """
+    OCR (rect, opts) jobs: each source-pixel rect with its own psm/whitelist options, in the
+    process pool when there are several. Tokens come back in frame coordinates.
+
+    frame_ref: when img_bgr lives in a capture.FrameRing, workers read their crops from
+               shared memory and only the small FrameRef is pickled per job. Keep the
+               slot pinned (FrameRing.pin) until this returns.
+    """
+    rects = [((x, y, w, h), {"dpi": 220, "whitelist": None, **opts})
+             for (x, y, w, h), opts in jobs if w > 0 and h > 0]
+    jobs = [(img_bgr[y:y+h, x:x+w], opts, (x, y)) for (x, y, w, h), opts in rects]
+    if OCR_WORKERS > 1 and len(jobs) > 1 and frame_ref is not None:
+        futures = [_get_pool().submit(metrics.traced_call, _ocr_shared, frame_ref, opts, rect) for rect, opts in rects]
+        results = [metrics.absorb(fut.result()) for fut in futures]
+    elif OCR_WORKERS > 1 and len(jobs) > 1:
+        futures = [_get_pool().submit(metrics.traced_call, _ocr_image, *job) for job in jobs]
+        results = [metrics.absorb(fut.result()) for fut in futures]
+    elif len(jobs) == 1:
+        # a lone job may still be split into strips on the pool
+        results = [_ocr_image(*jobs[0], tiled=None)]
+    else:
+        results = [_ocr_image(*job) for job in jobs]
+
+    # regions are OCRed separately, so keep their (block, par, line) keys apart
+    return _stack_blocks(results)
 
 def run_ocr(img_bgr: np.ndarray, *, psm: int = 11, dpi: int = 220,
-            whitelist: Optional[str] = None, roi: Optional[Tuple[int,int,int,int]] = None) -> Dict[str, List]:
+            whitelist: Optional[str] = None, roi: Optional[Tuple[int,int,int,int]] = None,
+            tiled: Optional[bool] = None, propose: bool = False) -> OcrTokens:
+    """
+    Returns the tokens as OcrTokens (columnar) with boxes in img_bgr's pixel coordinates;
+    call .to_dict() for image_to_data's dict of lists.
+
+    Every OCR input (frame, roi, proposed region) is scaled by its own measured text height
+    (see choose_scale) rather than a fixed factor.
+
+    tiled: split the preprocessed image into strips OCRed on a process pool.
+           None picks it automatically for large images when more than one worker is available.
+    propose: find text-bearing regions first (text_regions) and OCR only those; blank areas,
+             images and video are skipped. Falls back to the whole frame when text covers most of
+             it, or when no region is proposed (a missed heading must still be read).
+    """
+    opts = {"psm": psm, "dpi": dpi, "whitelist": whitelist}
+    if propose and not roi:
+        regions = propose_text_regions(img_bgr)
+        if regions:
+            return run_ocr_jobs(img_bgr, [(r, opts) for r in regions])
+        metrics.WHOLE_FRAME_OCR.inc(reason="dense" if regions is None else "no_proposals")
     if roi:
         x, y, w, h = roi
-        sub = img_bgr[y:y+h, x:x+w]
-        prep = preprocess_for_ocr(sub)
-        cfg  = f"--oem 3 --psm {psm} -c preserve_interword_spaces=1 -c user_defined_dpi={dpi}"
-        if whitelist:
-            cfg += f" -c tessedit_char_whitelist={whitelist}"
-        return _image_to_data_with_offset(prep, cfg, offset_xy=(x, y))
-    else:
-        prep = preprocess_for_ocr(img_bgr)
-        cfg  = f"--oem 3 --psm {psm} -c preserve_interword_spaces=1 -c user_defined_dpi={dpi}"
-        if whitelist:
-            cfg += f" -c tessedit_char_whitelist={whitelist}"
-        return image_to_data(prep, output_type=Output.DICT, config=cfg, lang="eng")
-
-def merge_ocr_dicts(a: Dict[str, List], b: Dict[str, List]) -> Dict[str, List]:
-    if not a: return b
-    if not b: return a
-    out = {}
-    for k in a.keys():
-        out[k] = a[k] + b[k]
-    return out
-
-def _build_lines(ocr: dict, min_conf: int = MIN_CONF):
-    lines = {}
-    N = len(ocr["text"])
-    for i in range(N):
-        txt = (ocr["text"][i] or "").strip()
-        if not txt:
-            continue
-        try:
-            conf = float(ocr["conf"][i])
-        except Exception:
-            conf = 0.0
-        if conf < min_conf:
-            continue
-        x, y, w, h = ocr["left"][i], ocr["top"][i], ocr["width"][i], ocr["height"][i]
-        key = (ocr["block_num"][i], ocr["par_num"][i], ocr["line_num"][i])
-        tok = {"text": txt, "conf": conf, "box": (x, y, w, h)}
-        if key not in lines:
-            lines[key] = {"text": txt, "tokens": [tok], "x1": x, "y1": y, "x2": x + w, "y2": y + h}
-        else:
-            L = lines[key]
-            L["text"] += ("" if L["text"].endswith(" ") else " ") + txt
-            L["tokens"].append(tok)
-            L["x1"], L["y1"] = min(L["x1"], x), min(L["y1"], y)
-            L["x2"], L["y2"] = max(L["x2"], x + w), max(L["y2"], y + h)
-    out = []
-    for L in lines.values():
-        idx = 0
-        for t in L["tokens"]:
-            s = L["text"].find(t["text"], idx)
-            if s < 0: s = L["text"].find(t["text"])
-            e = s + len(t["text"])
-            t["span"] = (s, e)
-            idx = e + 1
-        out.append({
-            "text": L["text"],
-            "line_box": (L["x1"], L["y1"], L["x2"] - L["x1"], L["y2"] - L["y1"]),
-            "tokens": L["tokens"]
-        })
-    return out
-
-def extract_text_list(ocr: dict, min_conf: int = MIN_CONF):
+        return _ocr_image(img_bgr[y:y+h, x:x+w], opts, (x, y), tiled)
+    return _ocr_image(img_bgr, opts, (0, 0), tiled)
+
+def merge_ocr_dicts(a, b) -> OcrTokens:
+    """
+    Merge two OCR results (OcrTokens or image_to_data dicts) of the same frame.
+    b's blocks are renumbered after a's so their lines never mix, and where both read the
+    same spot only the higher-confidence token is kept.
+    """
+    if a is None or not len(a): return _as_tokens(b) if b is not None else OcrTokens.empty()
+    if b is None or not len(b): return _as_tokens(a)
+    a, b = _as_tokens(a), _as_tokens(b).copy()
+    b.data["block_num"] += int(a.data["block_num"].max(initial=0)) + 1
+    return OcrTokens.concat([a, b]).dedupe()
+
+def _build_lines(ocr, min_conf: int = MIN_CONF) -> List[OcrLine]:
+    return build_lines(_as_tokens(ocr), min_conf=min_conf)
+
+def extract_text_list(ocr, min_conf: int = MIN_CONF):
     lines = _build_lines(ocr, min_conf=min_conf)
-    return [L["text"] for L in lines]
+    return [L.text for L in lines]
+
+def _merge_token_boxes(token_boxes):
+    """Merge horizontally adjacent token boxes on the same visual line."""
+    token_boxes = sorted(token_boxes, key=lambda b: b[0])
+    merged = [token_boxes[0]]
+    for x, y, w, h in token_boxes[1:]:
+        px, py, pw, ph = merged[-1]
+        if x <= px + pw + MERGE_GAP and abs(y - py) < max(h, ph):
+            nx1, ny1 = min(px, x), min(py, y)
+            nx2, ny2 = max(px + pw, x + w), max(py + ph, y + h)
+            merged[-1] = (nx1, ny1, nx2 - nx1, ny2 - ny1)
+        else:
+            merged.append((x, y, w, h))
+    return merged
+
+def _span_boxes(line: OcrLine, s: int, e: int):
+    """Boxes covering characters [s, e) of a line: merged token boxes, or the line box if no token overlaps."""
+    # token spans are sorted and disjoint, so the overlapping tokens are one contiguous run
+    i = int(np.searchsorted(line.ends, s, side="right"))
+    j = int(np.searchsorted(line.starts, e, side="left"))
+    if i >= j:
+        return [line.line_box]
+    return _merge_token_boxes([tuple(int(v) for v in b) for b in line.token_boxes[i:j]])
 
-def find_text_boxes(ocr: dict, query: str, *, case_sensitive=False, whole_word=False, min_conf: int = MIN_CONF):
+def _is_word_boundary(text: str, i: int) -> bool:
+    """Same as regex \\b at position i."""
+    before = i > 0 and (text[i - 1].isalnum() or text[i - 1] == "_")
+    after = i < len(text) and (text[i].isalnum() or text[i] == "_")
+    return before != after
+
+class OcrResult:
+    """
+    OCR tokens with the line/token/span index built once, so many lookups against the
+    same frame don't rebuild lines or recompile patterns.
+
+    .text is the frame's text, lines joined by "\n"; character offsets into it (e.g. a
+    Finding's start/end) resolve to token boxes with boxes_for_span.
+    """
+
+    def __init__(self, ocr, min_conf: int = MIN_CONF):
+        self.ocr = _as_tokens(ocr)
+        self.lines = _build_lines(self.ocr, min_conf=min_conf)
+        self.texts = [L.text for L in self.lines]
+        self.text = "\n".join(self.texts)
+        self.line_starts = []
+        pos = 0
+        for t in self.texts:
+            self.line_starts.append(pos)
+            pos += len(t) + 1
+        self._lower = None
+
+    def boxes_for_span(self, start: int, end: int) -> List[Tuple[int, int, int, int]]:
+        """
+        Boxes covering characters [start, end) of .text, merged per line; a span crossing
+        line breaks gets boxes on each line. O(log lines + tokens touched).
+        """
+        boxes = []
+        i = max(0, bisect.bisect_right(self.line_starts, start) - 1)
+        while i < len(self.lines) and self.line_starts[i] < end:
+            L, off = self.lines[i], self.line_starts[i]
+            s, e = max(0, start - off), min(len(L.text), end - off)
+            if s < e:
+                boxes.extend(_span_boxes(L, s, e))
+            i += 1
+        return boxes
+
+    def boxes_for_findings(self, findings) -> List[Tuple[int, int, int, int]]:
+        """Boxes for every finding's span (Finding objects, or (start, end) pairs)."""
+        boxes = []
+        for f in findings:
+            start, end = (f.start, f.end) if hasattr(f, "start") else f
+            boxes.extend(self.boxes_for_span(start, end))
+        return boxes
+
+    def _line_texts(self, case_sensitive: bool):
+        if case_sensitive:
+            return self.texts
+        if self._lower is None:
+            self._lower = [t.lower() for t in self.texts]
+        return self._lower
+
+    def find_spans(self, queries, *, case_sensitive=False, whole_word=False) -> Dict[str, List[Tuple[int, int]]]:
+        """
+        Every match of every query in one pass over the lines (Aho-Corasick).
+        Returns {query: [(start, end) offsets into .text]}; matches never cross a line break.
+        """
+        queries = [q for q in dict.fromkeys(queries) if q]
+        result = {q: [] for q in queries}
+        if not queries:
+            return result
+        patterns = queries if case_sensitive else [q.lower() for q in queries]
+        matcher = AhoCorasick(patterns)
+        edge = _is_word_boundary if whole_word else None
+        for li, s, e, pi in matcher.iter_line_matches(self._line_texts(case_sensitive), edge):
+            result[queries[pi]].append((self.line_starts[li] + s, self.line_starts[li] + e))
+        return result
+
+    def find_all(self, queries, *, case_sensitive=False, whole_word=False) -> Dict[str, List[Tuple[int, int, int, int]]]:
+        """
+        Boxes for every query in one pass over the lines (see find_spans).
+        Returns {query: [merged boxes]}, with the same per-match semantics as find_text_boxes.
+        """
+        spans = self.find_spans(queries, case_sensitive=case_sensitive, whole_word=whole_word)
+        return {q: [box for s, e in found for box in self.boxes_for_span(s, e)] for q, found in spans.items()}
+
+    def find_boxes(self, query: str, *, case_sensitive=False, whole_word=False):
+        if not query:
+            return []
+        return self.find_all([query], case_sensitive=case_sensitive, whole_word=whole_word)[query]
+
+def find_text_boxes(ocr, query: str, *, case_sensitive=False, whole_word=False, min_conf: int = MIN_CONF):
+    """ocr: an OcrResult, or a raw OCR dict (indexed on the fly)."""
     if not query:
         return []
-    lines = _build_lines(ocr, min_conf=min_conf)
-    flags = 0 if case_sensitive else re.IGNORECASE
-    pattern = r"\b" + re.escape(query) + r"\b" if whole_word else re.escape(query)
-    rx = re.compile(pattern, flags)
-    boxes = []
-    for L in lines:
-        line_text = L["text"] if case_sensitive else L["text"].lower()
-        for m in rx.finditer(line_text):
-            s, e = m.span()
-            token_boxes = []
-            for t in L["tokens"]:
-                ts, te = t["span"]
-                if te <= s or ts >= e:
-                    continue
-                token_boxes.append(t["box"])
-            if not token_boxes:
-                boxes.append(L["line_box"])
-            else:
-                token_boxes.sort(key=lambda b: b[0])
-                merged = [token_boxes[0]]
-                for x, y, w, h in token_boxes[1:]:
-                    px, py, pw, ph = merged[-1]
-                    if x <= px + pw + 6 and abs(y - py) < max(h, ph):
-                        nx1, ny1 = min(px, x), min(py, y)
-                        nx2, ny2 = max(px + pw, x + w), max(py + ph, y + h)
-                        merged[-1] = (nx1, ny1, nx2 - nx1, ny2 - ny1)
-                    else:
-                        merged.append((x, y, w, h))
-                boxes.extend(merged)
-    return boxes
+    index = ocr if isinstance(ocr, OcrResult) else OcrResult(ocr, min_conf=min_conf)
+    return index.find_boxes(query, case_sensitive=case_sensitive, whole_word=whole_word)
 
 # -------------------- EXAMPLE RUN --------------------
 if __name__ == "__main__":
@@ -177,7 +418,7 @@ if __name__ == "__main__":
 
 
     ocr = merge_ocr_dicts(ocr_all, ocr_band)
-    print(f"[OK] OCR tokens merged: {len(ocr['text'])}")
+    print(f"[OK] OCR tokens merged: {len(ocr)}")
 
     lines = extract_text_list(ocr, min_conf=MIN_CONF)
     print("\n--- Lines ---")
@@ -0,0 +1,157 @@
+# OCR backends behind ocr.run_ocr.
+#
+# "tesserocr" keeps a pool of long-lived in-process Tesseract API handles (model loaded once
+# per handle, no temp files, no subprocess). "pytesseract" shells out to the tesseract binary
+# per call and is used when tesserocr is not installed.
+#   pip install tesserocr        (optional)
+#   OCR_ENGINE=auto|tesserocr|pytesseract   OCR_ENGINE_POOL=<handles per process>
+
+import os
+import queue
+import threading
+import atexit
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+import numpy as np
+
+# Both bindings are imported on first engine creation, not at import time: tesserocr loads
+# libtesseract and pytesseract pulls in PIL, neither of which a cold start needs yet
+tesserocr = None
+
+OCR_ENGINE = os.getenv("OCR_ENGINE", "auto")
+ENGINE_POOL_SIZE = int(os.getenv("OCR_ENGINE_POOL", "0")) or (os.cpu_count() or 1)
+OCR_LANG = "eng"
+
+_TSV_KEYS = ("level", "page_num", "block_num", "par_num", "line_num", "word_num",
+             "left", "top", "width", "height", "conf", "text")
+
+class OcrEngine:
+    """Runs Tesseract on a preprocessed (gray/binary) image and returns image_to_data's dict shape."""
+    name = "base"
+
+    def image_to_data(self, img_gray: np.ndarray, *, psm: int = 11, dpi: int = 220,
+                      whitelist: Optional[str] = None) -> Dict[str, List]:
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+class PytesseractEngine(OcrEngine):
+    name = "pytesseract"
+
+    def image_to_data(self, img_gray, *, psm=11, dpi=220, whitelist=None):
+        from pytesseract import image_to_data, Output
+        cfg = f"--oem 3 --psm {psm} -c preserve_interword_spaces=1 -c user_defined_dpi={dpi}"
+        if whitelist:
+            cfg += f" -c tessedit_char_whitelist={whitelist}"
+        return image_to_data(img_gray, output_type=Output.DICT, config=cfg, lang=OCR_LANG)
+
+def _parse_tsv(tsv: str) -> Dict[str, List]:
+    """Parse Tesseract's TSV renderer output (no header row) into the pytesseract dict shape."""
+    out: Dict[str, List] = {k: [] for k in _TSV_KEYS}
+    for row in tsv.splitlines():
+        cols = row.split("\t", 11)
+        if len(cols) < 11:
+            continue
+        if len(cols) == 11:
+            cols.append("")
+        for k, v in zip(_TSV_KEYS[:10], cols[:10]):
+            out[k].append(int(v))
+        out["conf"].append(float(cols[10]))
+        out["text"].append(cols[11])
+    return out
+
+class TesserocrEngine(OcrEngine):
+    """
+    Pool of PyTessBaseAPI handles. Each handle is used by one thread at a time; handles are
+    created on demand up to pool_size and reused for the life of the process.
+    """
+    name = "tesserocr"
+
+    def __init__(self, pool_size: Optional[int] = None, lang: str = OCR_LANG):
+        if _import_tesserocr() is None:
+            raise RuntimeError("tesserocr is not installed")
+        self.pool_size = max(1, pool_size or ENGINE_POOL_SIZE)
+        self.lang = lang
+        self._idle: "queue.Queue" = queue.Queue()
+        self._all = []
+        self._lock = threading.Lock()
+        # fail fast (missing traineddata etc.) so get_engine can fall back
+        self._idle.put(self._new_handle())
+
+    def _new_handle(self):
+        api = tesserocr.PyTessBaseAPI(lang=self.lang, oem=tesserocr.OEM.DEFAULT)
+        api.SetVariable("preserve_interword_spaces", "1")
+        self._all.append(api)
+        return api
+
+    @contextmanager
+    def _handle(self):
+        try:
+            api = self._idle.get_nowait()
+        except queue.Empty:
+            api = None
+            with self._lock:
+                if len(self._all) < self.pool_size:
+                    api = self._new_handle()
+            if api is None:
+                api = self._idle.get()
+        try:
+            yield api
+        finally:
+            self._idle.put(api)
+
+    def image_to_data(self, img_gray, *, psm=11, dpi=220, whitelist=None):
+        img = np.ascontiguousarray(img_gray, dtype=np.uint8)
+        h, w = img.shape[:2]
+        bpp = 1 if img.ndim == 2 else img.shape[2]
+        with self._handle() as api:
+            api.SetPageSegMode(psm)
+            api.SetVariable("user_defined_dpi", str(dpi))
+            api.SetVariable("tessedit_char_whitelist", whitelist or "")
+            api.SetImageBytes(img.tobytes(), w, h, bpp, img.strides[0])
+            api.SetSourceResolution(dpi)
+            api.Recognize()
+            tsv = api.GetTSVText(0)
+            api.Clear()
+        return _parse_tsv(tsv)
+
+    def close(self):
+        with self._lock:
+            for api in self._all:
+                api.End()
+            self._all = []
+
+_engine: Optional[OcrEngine] = None
+_engine_lock = threading.Lock()
+
+def get_engine() -> OcrEngine:
+    """Process-wide OCR engine, created on first use."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = _create_engine(OCR_ENGINE)
+                atexit.register(_engine.close)
+    return _engine
+
+def _import_tesserocr():
+    """The tesserocr module, or None when it is not installed (optional dependency)."""
+    global tesserocr
+    if tesserocr is None:
+        try:
+            import tesserocr as module
+        except ImportError:
+            return None
+        tesserocr = module
+    return tesserocr
+
+def _create_engine(kind: str) -> OcrEngine:
+    if kind in ("auto", "tesserocr") and _import_tesserocr() is not None:
+        try:
+            return TesserocrEngine()
+        except Exception as e:
+            print(f"✗ tesserocr engine unavailable ({e}), falling back to pytesseract")
+    elif kind == "tesserocr":
+        print("✗ tesserocr is not installed, falling back to pytesseract")
+    return PytesseractEngine()
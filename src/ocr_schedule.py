@@ -0,0 +1,102 @@
+# Region scheduling for frame OCR: text regions are proposed once and each one is handed to
+# exactly one OCR profile (full-frame sparse text, or the bottom status-bar band), so no
+# pixel is recognized twice.
+
+import numpy as np
+import metrics
+from typing import List, NamedTuple, Optional, Tuple
+from ocr import BOTTOM_BAND, run_ocr_jobs, merge_ocr_dicts
+from ocr_tokens import OcrTokens
+from capture import FrameRef
+from text_regions import propose_text_regions, estimate_glyph_height
+
+Rect = Tuple[int, int, int, int]
+
+BAND_WHITELIST = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_-"
+SINGLE_LINE_FACTOR = 1.8   # a region up to this many glyph heights tall counts as one line
+
+class OcrProfile(NamedTuple):
+    name: str
+    psm: int
+    whitelist: Optional[str] = None
+    rows: Tuple[float, float] = (0.0, 1.0)   # share of frame height the profile may take regions from
+    single_line: bool = False                 # only accept one-line regions (psm 7)
+
+    def opts(self) -> dict:
+        return {"psm": self.psm, "whitelist": self.whitelist}
+
+FULL_PROFILE = OcrProfile("full", psm=11)
+BAND_PROFILE = OcrProfile("band", psm=7, whitelist=BAND_WHITELIST, rows=(1.0 - BOTTOM_BAND, 1.0), single_line=True)
+# later profiles are more specific and win a region they accept
+FRAME_PROFILES = (FULL_PROFILE, BAND_PROFILE)
+
+def _accepts(profile: OcrProfile, img: np.ndarray, rect: Rect) -> bool:
+    H = img.shape[0]
+    x, y, w, h = rect
+    if y < profile.rows[0] * H or y + h > profile.rows[1] * H:
+        return False
+    if profile.single_line:
+        glyph = estimate_glyph_height(img[y:y+h, x:x+w])
+        return glyph is not None and h <= SINGLE_LINE_FACTOR * glyph
+    return True
+
+def _profile_rect(profile: OcrProfile, shape) -> Rect:
+    H, W = shape[:2]
+    y1, y2 = int(profile.rows[0] * H), int(profile.rows[1] * H)
+    return (0, y1, W, y2 - y1)
+
+def _owner(profiles, img: np.ndarray, rect: Rect) -> OcrProfile:
+    """The most specific profile that accepts rect, else the first."""
+    return next((p for p in reversed(profiles[1:]) if _accepts(p, img, rect)), profiles[0])
+
+def schedule(img: np.ndarray, profiles=FRAME_PROFILES) -> Optional[List[Tuple[Rect, OcrProfile]]]:
+    """
+    Assign every proposed text region to one profile: the most specific profile that
+    accepts it, else the first. None when text covers most of the frame or no region was
+    proposed at all (see ocr_scheduled).
+    """
+    regions = propose_text_regions(img)
+    if not regions:
+        # "no proposals" is not "no text": the filters can miss headings or low-contrast text
+        metrics.WHOLE_FRAME_OCR.inc(reason="dense" if regions is None else "no_proposals")
+        return None
+    return [(rect, _owner(profiles, img, rect)) for rect in regions]
+
+def schedule_regions(img: np.ndarray, regions, profiles=FRAME_PROFILES) -> List[Tuple[Rect, OcrProfile]]:
+    """
+    schedule() restricted to parts of the frame (a live session's changed tiles): text is
+    proposed inside each region and every proposal goes to the profile that owns it on the
+    whole frame. A region without proposals is read whole, by its own owner.
+    """
+    out = []
+    for x, y, w, h in regions:
+        if w <= 0 or h <= 0:
+            continue
+        proposed = propose_text_regions(img[y:y+h, x:x+w])
+        rects = [(x + rx, y + ry, rw, rh) for rx, ry, rw, rh in proposed] if proposed else [(x, y, w, h)]
+        out.extend((rect, _owner(profiles, img, rect)) for rect in rects)
+    return out
+
+def ocr_regions(img: np.ndarray, regions, profiles=FRAME_PROFILES, frame_ref: Optional[FrameRef] = None) -> OcrTokens:
+    """
+    OCR only these regions of a frame, with the same profiles ocr_scheduled would pick for
+    the text in them, so an incremental update reads text the way a full pass does.
+    """
+    plan = schedule_regions(img, regions, profiles)
+    return run_ocr_jobs(img, [(rect, p.opts()) for rect, p in plan], frame_ref)
+
+def ocr_scheduled(img: np.ndarray, profiles=FRAME_PROFILES, frame_ref: Optional[FrameRef] = None) -> OcrTokens:
+    """
+    OCR a frame with each profile running only on the regions scheduled to it.
+    On text-dense frames, or when nothing was proposed, each profile reads its whole area instead;
+    the overlapping readings are then merged, keeping the higher-confidence token.
+    frame_ref: img's slot in a capture.FrameRing, so OCR workers read it from shared memory.
+    """
+    plan = schedule(img, profiles)
+    if plan is not None:
+        return run_ocr_jobs(img, [(rect, p.opts()) for rect, p in plan], frame_ref)
+
+    merged = None
+    for p in profiles:
+        merged = merge_ocr_dicts(merged, run_ocr_jobs(img, [(_profile_rect(p, img.shape), p.opts())], frame_ref))
+    return merged if merged is not None else OcrTokens.empty()
@@ -0,0 +1,228 @@
+import numpy as np
+from typing import Dict, List, Optional, Sequence
+
+# Numeric columns of Tesseract's image_to_data output, stored as one structured array
+TOKEN_DTYPE = np.dtype([
+    ("level", np.int16), ("page_num", np.int16),
+    ("block_num", np.int32), ("par_num", np.int32), ("line_num", np.int32), ("word_num", np.int32),
+    ("left", np.int32), ("top", np.int32), ("width", np.int32), ("height", np.int32),
+    ("conf", np.float32),
+])
+COLUMNS = TOKEN_DTYPE.names + ("text",)
+
+class OcrTokens:
+    """
+    Columnar OCR result: numeric fields in a NumPy structured array, text in a parallel
+    object array. Filtering, offsetting and scaling are vectorized.
+    to_dict()/from_dict() convert to and from image_to_data's dict of lists.
+    """
+    __slots__ = ("data", "text")
+
+    def __init__(self, data: np.ndarray, text: np.ndarray):
+        self.data = data
+        self.text = text
+
+    @classmethod
+    def empty(cls) -> "OcrTokens":
+        return cls(np.zeros(0, dtype=TOKEN_DTYPE), np.zeros(0, dtype=object))
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, List]) -> "OcrTokens":
+        n = len(d.get("text", []))
+        data = np.zeros(n, dtype=TOKEN_DTYPE)
+        for name in TOKEN_DTYPE.names:
+            if name == "conf":
+                data[name] = np.asarray(d["conf"], dtype=np.float32) if n else 0
+            elif name in d:
+                data[name] = d[name]
+        text = np.empty(n, dtype=object)
+        text[:] = [(t or "") for t in d.get("text", [])]
+        return cls(data, text)
+
+    @classmethod
+    def concat(cls, parts: Sequence["OcrTokens"]) -> "OcrTokens":
+        parts = [p for p in parts if p is not None and len(p)]
+        if not parts:
+            return cls.empty()
+        if len(parts) == 1:
+            return parts[0]
+        return cls(np.concatenate([p.data for p in parts]), np.concatenate([p.text for p in parts]))
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def to_dict(self) -> Dict[str, List]:
+        out = {name: self.data[name].tolist() for name in TOKEN_DTYPE.names}
+        out["text"] = self.text.tolist()
+        return out
+
+    def copy(self) -> "OcrTokens":
+        return OcrTokens(self.data.copy(), self.text.copy())
+
+    # -------------------- vectorized ops --------------------
+    def select(self, mask) -> "OcrTokens":
+        return OcrTokens(self.data[mask], self.text[mask])
+
+    def words_mask(self, min_conf: float = 0) -> np.ndarray:
+        """Rows that carry text with confidence >= min_conf."""
+        has_text = np.fromiter((bool(t.strip()) for t in self.text), dtype=bool, count=len(self.text))
+        return has_text & (self.data["conf"] >= min_conf)
+
+    def words(self, min_conf: Optional[float] = None) -> "OcrTokens":
+        """Drop layout rows (empty text), and low-confidence words if min_conf is given."""
+        return self.select(self.words_mask(-np.inf if min_conf is None else min_conf))
+
+    def boxes(self) -> np.ndarray:
+        """(N, 4) int array of x, y, w, h."""
+        d = self.data
+        return np.stack([d["left"], d["top"], d["width"], d["height"]], axis=1)
+
+    def offset(self, dx: int, dy: int) -> "OcrTokens":
+        """Shift boxes in place; returns self."""
+        self.data["left"] += dx
+        self.data["top"] += dy
+        return self
+
+    def scaled(self, factor: float) -> "OcrTokens":
+        """Copy with box coordinates multiplied by factor."""
+        out = self.copy()
+        for name in ("left", "top"):
+            out.data[name] = np.floor(self.data[name] * factor)
+        for name in ("width", "height"):
+            out.data[name] = np.round(self.data[name] * factor)
+        return out
+
+    def intersecting(self, rects) -> np.ndarray:
+        """Mask of tokens whose box intersects any of the (x, y, w, h) rects."""
+        d = self.data
+        x1, y1 = d["left"], d["top"]
+        x2, y2 = x1 + d["width"], y1 + d["height"]
+        hit = np.zeros(len(d), dtype=bool)
+        for rx, ry, rw, rh in rects:
+            hit |= (x1 < rx + rw) & (rx < x2) & (y1 < ry + rh) & (ry < y2)
+        return hit
+
+    def centers_in_rows(self, y1: float, y2: float) -> np.ndarray:
+        cy = self.data["top"] + self.data["height"] / 2
+        return (cy >= y1) & (cy < y2)
+
+    def dedupe(self, min_overlap: float = 0.5, cell: int = 64) -> "OcrTokens":
+        """
+        Drop tokens that overlap an already kept token by at least min_overlap of the smaller
+        box, visiting tokens by descending confidence so the better reading survives.
+        Kept boxes are bucketed in a uniform grid of `cell` px, so each token is only
+        compared with its neighbours. Layout rows (empty text) are kept as they are.
+        """
+        words = self.words_mask()
+        idx = np.flatnonzero(words)
+        if len(idx) < 2:
+            return self
+        b = self.boxes()
+        order = idx[np.argsort(-self.data["conf"][idx], kind="stable")]
+        grid: Dict[tuple, List[int]] = {}
+        keep = ~words
+        for i in order:
+            x, y, w, h = (int(v) for v in b[i])
+            cells = [(cx, cy) for cx in range(x // cell, (x + max(w, 1) - 1) // cell + 1)
+                     for cy in range(y // cell, (y + max(h, 1) - 1) // cell + 1)]
+            dup = False
+            seen = set()
+            for c in cells:
+                for j in grid.get(c, ()):
+                    if j in seen:
+                        continue
+                    seen.add(j)
+                    xj, yj, wj, hj = b[j]
+                    iw = min(x + w, xj + wj) - max(x, xj)
+                    ih = min(y + h, yj + hj) - max(y, yj)
+                    if iw > 0 and ih > 0 and iw * ih >= min_overlap * max(1, min(w * h, wj * hj)):
+                        dup = True
+                        break
+                if dup:
+                    break
+            if dup:
+                continue
+            keep[i] = True
+            for c in cells:
+                grid.setdefault(c, []).append(i)
+        return self.select(keep)
+
+class Transform:
+    """
+    Maps coordinates of a preprocessed OCR input back to the source image:
+    source = origin + preprocessed / scale.
+    """
+    __slots__ = ("scale", "dx", "dy")
+
+    def __init__(self, scale: float = 1.0, dx: int = 0, dy: int = 0):
+        self.scale = scale
+        self.dx = dx
+        self.dy = dy
+
+    def to_source(self, tokens: OcrTokens) -> OcrTokens:
+        """Tokens in source-image pixels (offsets in place when there is no scaling)."""
+        out = tokens if self.scale == 1.0 else tokens.scaled(1.0 / self.scale)
+        return out.offset(self.dx, self.dy)
+
+    def __repr__(self):
+        return f"Transform(scale={self.scale:.3f}, dx={self.dx}, dy={self.dy})"
+
+class OcrLine:
+    """One text line: joined text, bounding box and its tokens' boxes and character spans."""
+    __slots__ = ("text", "line_box", "key", "token_text", "token_conf", "token_boxes", "starts", "ends")
+
+    def __init__(self, text, line_box, key, token_text, token_conf, token_boxes, starts, ends):
+        self.text = text
+        self.line_box = line_box
+        self.key = key
+        self.token_text = token_text
+        self.token_conf = token_conf
+        self.token_boxes = token_boxes
+        self.starts = starts
+        self.ends = ends
+
+def build_lines(tokens: OcrTokens, min_conf: float = 0) -> List[OcrLine]:
+    """
+    Group word tokens into lines by (block_num, par_num, line_num), in order of first
+    appearance; tokens keep their original order within a line.
+    """
+    words = tokens.select(tokens.words_mask(min_conf))
+    n = len(words)
+    if not n:
+        return []
+    d = words.data
+    keys = np.stack([d["block_num"], d["par_num"], d["line_num"]], axis=1)
+    uniq, first, inverse = np.unique(keys, axis=0, return_index=True, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    # rank lines by first appearance, then stable-sort tokens by line rank
+    rank = np.empty(len(uniq), dtype=np.int64)
+    rank[np.argsort(first, kind="stable")] = np.arange(len(uniq))
+    token_rank = rank[inverse]
+    order = np.argsort(token_rank, kind="stable")
+    bounds = np.flatnonzero(np.diff(token_rank[order])) + 1
+    groups = np.split(order, bounds)
+
+    texts = [t.strip() for t in words.text]
+    lengths = np.fromiter((len(t) for t in texts), dtype=np.int64, count=n)
+    boxes = words.boxes()
+    conf = d["conf"]
+
+    lines = []
+    for idx in groups:
+        b = boxes[idx]
+        x1, y1 = b[:, 0].min(), b[:, 1].min()
+        x2, y2 = (b[:, 0] + b[:, 2]).max(), (b[:, 1] + b[:, 3]).max()
+        ln = lengths[idx]
+        starts = np.concatenate(([0], np.cumsum(ln + 1)[:-1]))
+        token_text = [texts[i] for i in idx]
+        lines.append(OcrLine(
+            text=" ".join(token_text),
+            line_box=(int(x1), int(y1), int(x2 - x1), int(y2 - y1)),
+            key=tuple(int(v) for v in keys[idx[0]]),
+            token_text=token_text,
+            token_conf=conf[idx],
+            token_boxes=b,
+            starts=starts,
+            ends=starts + ln,
+        ))
+    return lines
@@ -1,20 +1,64 @@
+import os
+import sys
 from typing import Optional
 from src.sanitizer import pre_scrub
 from src.detectors.fallback_regex import run_fallback
 from src.detectors.gemini_detector import detect_with_gemini
+from src.detectors.llm_backend import CircuitOpenError
+from src.detectors.cascade import triage, join_segments, rebase_to_segments, settled_findings, cascade_stats
 from src.schema import Findings, Finding
-from src.redactor import blackout_regions, blur_regions
 
-def classify_text(text: str, privacy_first: bool = True, use_fallback: bool = True) -> Findings:
-    scrubbed = text
-    if privacy_first:
-        scrubbed, _ = pre_scrub(text)  # mask blatant secrets before sending upstream
+# ocr, redactor and their helpers import each other flat (like app.py/detector.py), so src/ has to be importable too
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+import cv2
+import metrics
+from ocr import OcrResult
+from redactor import load_bgr, draw_blackout
 
+def classify_text(text: str, privacy_first: bool = True, use_fallback: bool = True,
+                  cascade: bool = True) -> Findings:
+    """
+    cascade: settle clearly clean / clearly sensitive lines locally and send only the
+             ambiguous ones to the LLM (counts in cascade_stats). False sends the whole text.
+    """
     # First pass: fast regex to catch obvious items 
-    base = run_fallback(scrubbed) if use_fallback else Findings(findings=[])
+    regex = run_fallback(text)
+    base = regex if use_fallback else Findings(findings=[])
+
+    scrubbed = text
+    if privacy_first:
+        # mask blatant secrets before sending upstream (same length, so offsets still line up)
+        scrubbed, _ = pre_scrub(text, regex.findings)
 
-    # Second pass: LLM classification to add kinds, spans, dedupe/confirm
-    llm = detect_with_gemini(scrubbed)
+    # Second pass: LLM classification to add kinds, spans, dedupe/confirm.
+    # While the backend's circuit is open (or the call fails) the regex pass stands alone.
+    if cascade:
+        segments, _ = triage(scrubbed, regex.findings)
+        upstream = join_segments(segments)
+        if not use_fallback:
+            # lines settled as sensitive never reach the LLM: their regex hits are the verdict
+            base = Findings(findings=settled_findings(regex.findings, segments))
+    else:
+        segments, upstream = None, scrubbed
+    try:
+        if upstream.strip():
+            llm = detect_with_gemini(upstream)
+            cascade_stats.add(llm_calls=1)
+        else:
+            llm = Findings(findings=[])
+            cascade_stats.add(llm_skipped=1)
+        if segments is not None:
+            llm = Findings(findings=rebase_to_segments(llm.findings, segments))
+    except CircuitOpenError:
+        cascade_stats.add(llm_circuit_open=1)
+        llm = Findings(findings=[])
+    except Exception as e:
+        cascade_stats.add(llm_failures=1)
+        if not use_fallback:
+            raise
+        metrics.error("llm_spans", e)
+        metrics.FALLBACKS.inc(reason="llm_error")
+        llm = Findings(findings=[])
 
     # naive merge by overlapping spans + kind
     merged = base.findings[:]
@@ -26,8 +70,25 @@ def classify_text(text: str, privacy_first: bool = True, use_fallback: bool = Tr
     merged.sort(key=lambda f: (f.start, f.end))
     return Findings(findings=merged)
 
-def classify_and_redact(image_path, ocr_results):
-    findings = classify_text(ocr_results["text"])
-    boxes = map_findings_to_boxes(findings, ocr_results)
-    blackout_regions(image_path, boxes, "output.png")
-    return "output.png"
+def map_findings_to_boxes(findings: Findings, ocr_results, with_kinds: bool = False):
+    """
+    Pixel boxes for each finding's span. ocr_results is an OcrResult (or raw OCR tokens,
+    indexed here); spans are offsets into its .text.
+    with_kinds: also return the finding kind of each box, as (boxes, kinds)
+    """
+    index = ocr_results if isinstance(ocr_results, OcrResult) else OcrResult(ocr_results)
+    if not with_kinds:
+        return index.boxes_for_findings(findings.findings)
+    boxes, kinds = [], []
+    for f in findings.findings:
+        found = index.boxes_for_span(f.start, f.end)
+        boxes.extend(found)
+        kinds.extend([f.kind] * len(found))
+    return boxes, kinds
+
+def classify_and_redact(image_path, ocr_results, output_path="output.png"):
+    index = ocr_results if isinstance(ocr_results, OcrResult) else OcrResult(ocr_results)
+    findings = classify_text(index.text)
+    boxes = map_findings_to_boxes(findings, index)
+    cv2.imwrite(output_path, draw_blackout(load_bgr(image_path), boxes))
+    return output_path
@@ -0,0 +1,131 @@
+# Bounded-memory version of ocr.preprocess_for_ocr for very large captures (8K, multi-monitor).
+# Pass 1 scales the frame band by band and builds the histogram of the scaled gray image;
+# invert/normalize/Otsu are then folded into one 256-entry lookup table. Pass 2 scales and maps one band of rows
+# at a time, so the working set is bounded by the tile size instead of the frame size.
+
+import os
+import numpy as np
+import cv2
+from typing import Iterator, Optional, Tuple
+
+OCR_MEMORY_BUDGET = int(os.getenv("OCR_MEMORY_BUDGET_MB", "256")) * 2**20
+WORK_BYTES_PER_PIXEL = 6      # in-memory path: scaled BGR + gray + normalized + thresholded
+TILE_BYTES_PER_PIXEL = 3      # streaming tile: scaled gray + mapped gray + output rows
+STATS_BAND_ROWS = 256         # source rows per band in the statistics pass
+ADAPTIVE_BLOCK = 31           # must match preprocess_for_ocr's adaptiveThreshold block size
+
+def needs_streaming(shape, upscale: float, budget: int = OCR_MEMORY_BUDGET) -> bool:
+    """True when the in-memory preprocessing of this frame would exceed the budget."""
+    h, w = shape[:2]
+    return h * w * upscale * upscale * WORK_BYTES_PER_PIXEL > budget
+
+def tile_rows(width: int, upscale: float, budget: int = OCR_MEMORY_BUDGET) -> int:
+    """Output rows per tile so one tile's working set stays within an eighth of the budget."""
+    return max(64, int(budget // 8 // max(1, int(width * upscale) * TILE_BYTES_PER_PIXEL)))
+
+def _otsu_threshold(hist: np.ndarray) -> int:
+    """Same threshold cv2.THRESH_OTSU picks, computed from a 256-bin histogram."""
+    p = hist.astype(np.float64) / max(1.0, hist.sum())
+    omega = np.cumsum(p)
+    mu = np.cumsum(p * np.arange(256))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sigma_b = (mu[-1] * omega - mu) ** 2 / (omega * (1.0 - omega))
+    return int(np.argmax(np.nan_to_num(sigma_b)))
+
+def gray_lut(img_bgr: np.ndarray, invert_if_dark=True, binarize: Optional[str] = "otsu",
+             upscale: float = 1.0, budget: int = OCR_MEMORY_BUDGET) -> np.ndarray:
+    """
+    One pass over the scaled gray frame in row bands: histogram -> mean/min/max -> a uint8
+    LUT that applies invert-if-dark, min-max normalization and (for "otsu") the global
+    threshold. The statistics are those of the scaled image, as in preprocess_for_ocr:
+    cubic resampling overshoots at edges and so widens the range normalization stretches.
+    """
+    upscale = upscale or 1.0
+    hist = np.zeros(256, dtype=np.int64)
+    if upscale == 1.0:
+        for y in range(0, img_bgr.shape[0], STATS_BAND_ROWS):
+            band = cv2.cvtColor(img_bgr[y:y + STATS_BAND_ROWS], cv2.COLOR_BGR2GRAY)
+            hist += np.bincount(band.ravel(), minlength=256)
+    else:
+        out_h = int(round(img_bgr.shape[0] * upscale))
+        step = tile_rows(img_bgr.shape[1], upscale, budget)
+        for y1 in range(0, out_h, step):
+            band = _scaled_rows(img_bgr, upscale, y1, min(out_h, y1 + step))
+            hist += np.bincount(band.ravel(), minlength=256)
+
+    levels = np.arange(256, dtype=np.float64)
+    mean = float((hist * levels).sum() / max(1, hist.sum()))
+    lut = 255.0 - levels if invert_if_dark and mean < 127 else levels.copy()
+
+    present = lut[hist > 0]
+    lo, hi = (present.min(), present.max()) if len(present) else (0.0, 0.0)
+    # cv2.normalize(NORM_MINMAX) maps a flat image to 0
+    scale = 255.0 / (hi - lo) if hi > lo else 0.0
+    lut = np.clip(np.round((lut - lo) * scale), 0, 255).astype(np.uint8)
+
+    if binarize == "otsu":
+        mapped = np.bincount(lut, weights=hist, minlength=256)
+        t = _otsu_threshold(mapped)
+        lut = np.where(lut > t, 255, 0).astype(np.uint8)
+    return lut
+
+def _scaled_rows(img_bgr: np.ndarray, upscale: float, y1: int, y2: int) -> np.ndarray:
+    """
+    Gray rows [y1, y2) of the image resized by `upscale` (cubic), reading only the source
+    rows they depend on. Gray conversion happens before scaling (both are linear, so this
+    matches to rounding) and the affine offset reproduces cv2.resize's pixel-centre alignment.
+    """
+    H, W = img_bgr.shape[:2]
+    out_w = int(round(W * upscale))
+    r0 = max(0, int(np.floor((y1 + 0.5) / upscale - 0.5)) - 2)
+    r1 = min(H, int(np.ceil((y2 + 0.5) / upscale - 0.5)) + 3)
+    tx = 0.5 * upscale - 0.5
+    ty = upscale * (r0 + 0.5) - 0.5 - y1
+    M = np.float32([[upscale, 0, tx], [0, upscale, ty]])
+    gray = cv2.cvtColor(img_bgr[r0:r1], cv2.COLOR_BGR2GRAY)
+    return cv2.warpAffine(gray, M, (out_w, y2 - y1), flags=cv2.INTER_CUBIC, borderMode=cv2.BORDER_REPLICATE)
+
+def _tile(img_bgr, upscale, lut, binarize, y1, y2) -> np.ndarray:
+    if binarize == "adaptive":
+        # adaptive thresholding is local: read half a block of context on each side
+        pad = ADAPTIVE_BLOCK // 2
+        out_h = int(round(img_bgr.shape[0] * upscale))
+        a, b = max(0, y1 - pad), min(out_h, y2 + pad)
+        gray = cv2.LUT(_scaled_rows(img_bgr, upscale, a, b), lut)
+        binary = cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+                                       cv2.THRESH_BINARY, ADAPTIVE_BLOCK, 5)
+        return binary[y1 - a:y1 - a + (y2 - y1)]
+    return cv2.LUT(_scaled_rows(img_bgr, upscale, y1, y2), lut)
+
+def preprocess_streaming(img_bgr: np.ndarray, invert_if_dark=True, upscale: float = 1.0,
+                         binarize: Optional[str] = "otsu", budget: int = OCR_MEMORY_BUDGET) -> np.ndarray:
+    """
+    preprocess_for_ocr's output, built tile by tile: only the single-channel result is
+    frame-sized; every intermediate is bounded by tile_rows().
+    """
+    upscale = upscale or 1.0
+    H, W = img_bgr.shape[:2]
+    out_h, out_w = int(round(H * upscale)), int(round(W * upscale))
+    lut = gray_lut(img_bgr, invert_if_dark, binarize, upscale, budget)
+    out = np.empty((out_h, out_w), dtype=np.uint8)
+    step = tile_rows(W, upscale, budget)
+    for y1 in range(0, out_h, step):
+        y2 = min(out_h, y1 + step)
+        out[y1:y2] = _tile(img_bgr, upscale, lut, binarize, y1, y2)
+    return out
+
+def iter_preprocessed_strips(img_bgr: np.ndarray, strip_height: int, overlap: int, invert_if_dark=True,
+                             upscale: float = 1.0, binarize: Optional[str] = "otsu"
+                             ) -> Iterator[Tuple[np.ndarray, int, int, int]]:
+    """
+    Preprocessed overlapping strips for tiled OCR, without ever building the whole
+    preprocessed frame. Yields (strip, y0, own_y1, own_y2) in preprocessed coordinates,
+    with the same ownership rule as ocr._tiled_image_to_data.
+    """
+    upscale = upscale or 1.0
+    out_h = int(round(img_bgr.shape[0] * upscale))
+    lut = gray_lut(img_bgr, invert_if_dark, binarize, upscale)
+    for own_y1 in range(0, out_h, strip_height):
+        own_y2 = min(out_h, own_y1 + strip_height)
+        y0, y1 = max(0, own_y1 - overlap), min(out_h, own_y2 + overlap)
+        yield _tile(img_bgr, upscale, lut, binarize, y0, y1), y0, own_y1, own_y2
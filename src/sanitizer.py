@@ -0,0 +1,28 @@
+import os
+from typing import List, Optional, Sequence, Tuple
+from src.schema import Finding
+from src.detectors.fallback_regex import scan_text
+
+# Regex hits at least this confident are masked before text leaves the process
+PRE_SCRUB_MIN_CONF = float(os.getenv("PRE_SCRUB_MIN_CONF", "0.85"))
+MASK_CHAR = "•"
+
+def pre_scrub(text: str, findings: Optional[Sequence[Finding]] = None,
+              min_confidence: float = PRE_SCRUB_MIN_CONF) -> Tuple[str, List[Finding]]:
+    """
+    Mask blatant secrets (high-confidence regex hits) before the text is sent to the LLM.
+    Each hit is replaced by a run of MASK_CHAR of the same length, so offsets in the
+    scrubbed text are offsets in the original and LLM spans need no remapping.
+
+    findings: regex findings already computed for text (scanned here if not given).
+    Returns (scrubbed text, the findings that were masked).
+    """
+    if findings is None:
+        findings = scan_text(text)
+    masked = [f for f in findings if f.confidence >= min_confidence and f.end > f.start]
+    if not masked:
+        return text, []
+    chars = list(text)
+    for f in masked:
+        chars[f.start:f.end] = MASK_CHAR * (f.end - f.start)
+    return "".join(chars), masked
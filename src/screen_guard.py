@@ -0,0 +1,250 @@
+# Long-running local screen guard: captures the monitor continuously, runs detection at a
+# target fps (skipping frames it can't keep up with, reusing results for unchanged frames)
+# and publishes the current redaction boxes to callbacks and to local socket clients as
+# newline-delimited JSON, for overlay tools.
+#
+# With --track-fps, boxes are published at that rate instead: a BoxTracker moves the last
+# detection's boxes with scrolled/moved content every frame, and detection runs in the
+# background only when tracking can't vouch for them.
+#
+#   python screen_guard.py --fps 2 --port 8765 [--categories email password ...]
+#   python screen_guard.py --track-fps 20 --port 8765
+
+import argparse
+import json
+import socket
+import socketserver
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+import metrics
+from box_tracker import TrackedDetector
+from capture import FrameRef, ScreenCapture
+from detector import detector, detect_regions
+from live_session import LiveSession
+
+DEFAULT_FPS = 2.0
+DEFAULT_PORT = 8765
+STATS_WINDOW = 30   # frames averaged for the reported fps/latencies
+
+class _BoxPublisher(socketserver.ThreadingTCPServer):
+    """Localhost TCP server: every connected client receives each update as one JSON line."""
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, port: int):
+        self.clients: List[socket.socket] = []
+        self.clients_lock = threading.Lock()
+        self.latest: Optional[bytes] = None
+        super().__init__(("127.0.0.1", port), _ClientHandler)
+
+    def broadcast(self, line: bytes):
+        self.latest = line
+        with self.clients_lock:
+            clients = list(self.clients)
+        for conn in clients:
+            try:
+                conn.sendall(line)
+            except OSError:
+                self.drop(conn)
+
+    def drop(self, conn):
+        with self.clients_lock:
+            if conn in self.clients:
+                self.clients.remove(conn)
+
+class _ClientHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        server: _BoxPublisher = self.server
+        if server.latest:
+            self.request.sendall(server.latest)
+        with server.clients_lock:
+            server.clients.append(self.request)
+        try:
+            # block until the client hangs up; updates are pushed by broadcast()
+            while self.request.recv(1024):
+                pass
+        except OSError:
+            pass
+        finally:
+            server.drop(self.request)
+
+class ScreenGuard:
+    """
+    Capture -> detect -> publish loop on its own thread.
+
+    Ticks are scheduled at target_fps; when a cycle overruns, the missed ticks are skipped
+    rather than queued, so the guard always works on the newest screen. A LiveSession
+    re-OCRs only changed regions and reuses the last boxes for unchanged frames.
+
+    track_fps: tick at this rate and publish tracked boxes every tick; detection then runs
+               on its own thread whenever the TrackedDetector asks for it.
+    """
+
+    def __init__(self, categories=None, target_fps: float = DEFAULT_FPS, monitor_index: int = 1,
+                 port: Optional[int] = None, ring_slots: int = 3, track_fps: Optional[float] = None):
+        self.categories = list(categories or [])
+        self.target_fps = track_fps or target_fps
+        self.tracked = TrackedDetector(self._detect_pinned) if track_fps else None
+        self.capture = ScreenCapture(monitor_index, ring_slots=ring_slots)
+        self.session = LiveSession()
+        self.callbacks: List[Callable[[dict], None]] = []
+        self.publisher = _BoxPublisher(port) if port else None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stats_lock = threading.Lock()
+        self._timings: Dict[str, deque] = {k: deque(maxlen=STATS_WINDOW)
+                                           for k in ("capture", "detect", "track", "publish", "cycle")}
+        self._ticks = deque(maxlen=STATS_WINDOW)
+        self.frames = self.skipped = self.unchanged = 0
+        self.boxes: list = []
+
+    # -------------------- consumers --------------------
+    def subscribe(self, callback: Callable[[dict], None]):
+        """callback(update) runs on the guard thread after every frame; keep it short."""
+        self.callbacks.append(callback)
+
+    def _publish(self, update: dict):
+        for cb in list(self.callbacks):
+            try:
+                cb(update)
+            except Exception as e:
+                metrics.error("screen_guard_callback", e)
+        if self.publisher:
+            self.publisher.broadcast((json.dumps(update) + "\n").encode("utf-8"))
+
+    # -------------------- loop --------------------
+    def _cycle(self):
+        t0 = time.perf_counter()
+        ref = self.capture.grab_to_ring()
+        t1 = time.perf_counter()
+        ring = self.capture.ring
+        ring.pin(ref)
+        try:
+            _, boxes = detector(self.categories, image=ring.view(ref), session=self.session, frame_ref=ref)
+        finally:
+            ring.unpin(ref)
+        t2 = time.perf_counter()
+        self.boxes = [tuple(int(v) for v in b) for b in boxes]
+        self.frames += 1
+        if not self.session.changed:
+            self.unchanged += 1
+        self._publish({"seq": ref.seq, "ts": time.time(), "boxes": self.boxes,
+                       "changed": self.session.changed, "fps": round(self.stats()["fps"], 2)})
+        t3 = time.perf_counter()
+        with self._stats_lock:
+            for name, dt in (("capture", t1 - t0), ("detect", t2 - t1), ("publish", t3 - t2), ("cycle", t3 - t0)):
+                self._timings[name].append(dt)
+            self._ticks.append(t3)
+
+    def _detect_pinned(self, img, ref: FrameRef):
+        """TrackedDetector's detect: runs on its thread while the frame's ring slot stays pinned."""
+        t0 = time.perf_counter()
+        try:
+            _, boxes, labels = detect_regions(self.categories, image=img, session=self.session, frame_ref=ref)
+        finally:
+            self.capture.ring.unpin(ref)
+        if not self.session.changed:
+            self.unchanged += 1
+        with self._stats_lock:
+            self._timings["detect"].append(time.perf_counter() - t0)
+        return [tuple(int(v) for v in b) for b in boxes], labels
+
+    def _track_cycle(self):
+        t0 = time.perf_counter()
+        ref = self.capture.grab_to_ring()
+        img = self.capture.ring.view(ref)
+        t1 = time.perf_counter()
+        result = self.tracked.track(img)
+        if self.tracked.due():
+            self.capture.ring.pin(ref)
+            self.tracked.start_detection(img, ref)
+        t2 = time.perf_counter()
+        self.boxes = result.boxes
+        self.frames += 1
+        self._publish({"seq": ref.seq, "ts": time.time(), "boxes": self.boxes, "labels": result.labels,
+                       "confidence": round(result.confidence, 3), "detecting": self.tracked.detecting,
+                       "fps": round(self.stats()["fps"], 2)})
+        t3 = time.perf_counter()
+        with self._stats_lock:
+            for name, dt in (("capture", t1 - t0), ("track", t2 - t1), ("publish", t3 - t2), ("cycle", t3 - t0)):
+                self._timings[name].append(dt)
+            self._ticks.append(t3)
+
+    def run(self):
+        """Run the loop on the calling thread until stop()."""
+        period = 1.0 / self.target_fps
+        next_tick = time.perf_counter()
+        while not self._stop.is_set():
+            try:
+                self._track_cycle() if self.tracked else self._cycle()
+            except Exception as e:
+                metrics.error("screen_guard_cycle", e)
+            next_tick += period
+            now = time.perf_counter()
+            if now > next_tick:
+                # overran: drop the ticks we missed instead of bursting to catch up
+                missed = int((now - next_tick) // period) + 1
+                self.skipped += missed
+                next_tick += missed * period
+            self._stop.wait(max(0.0, next_tick - time.perf_counter()))
+
+    def start(self) -> "ScreenGuard":
+        if self.publisher:
+            threading.Thread(target=self.publisher.serve_forever, name="screen-guard-publisher", daemon=True).start()
+        self._thread = threading.Thread(target=self.run, name="screen-guard", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        if self.publisher:
+            self.publisher.shutdown()
+            self.publisher.server_close()
+        self.capture.close()
+
+    # -------------------- reporting --------------------
+    def stats(self) -> dict:
+        """Achieved fps and mean/max per-stage latency (ms) over the last STATS_WINDOW frames."""
+        with self._stats_lock:
+            ticks = list(self._ticks)
+            fps = (len(ticks) - 1) / (ticks[-1] - ticks[0]) if len(ticks) > 1 and ticks[-1] > ticks[0] else 0.0
+            latency = {name: {"mean_ms": round(1000 * sum(v) / len(v), 1), "max_ms": round(1000 * max(v), 1)}
+                       for name, v in self._timings.items() if v}
+        out = {"target_fps": self.target_fps, "fps": fps, "frames": self.frames,
+               "skipped": self.skipped, "unchanged": self.unchanged, "latency": latency}
+        if self.tracked:
+            out["detections"] = self.tracked.detections
+        return out
+
+def main():
+    parser = argparse.ArgumentParser(description="Continuously detect sensitive text on screen")
+    parser.add_argument("--fps", type=float, default=DEFAULT_FPS, help="target detection rate")
+    parser.add_argument("--track-fps", type=float, default=0.0,
+                        help="publish tracked boxes at this rate, detecting in the background (0 disables)")
+    parser.add_argument("--monitor", type=int, default=1)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="localhost port for box updates (0 disables)")
+    parser.add_argument("--categories", nargs="*", default=[])
+    parser.add_argument("--report", type=float, default=10.0, help="seconds between stats reports")
+    args = parser.parse_args()
+
+    guard = ScreenGuard(args.categories, target_fps=args.fps, monitor_index=args.monitor,
+                        port=args.port or None, track_fps=args.track_fps or None).start()
+    print(f"✓ Screen guard running at {guard.target_fps} fps target"
+          + (" with box tracking" if guard.tracked else "")
+          + (f", publishing on 127.0.0.1:{args.port}" if args.port else ""))
+    try:
+        while True:
+            time.sleep(args.report)
+            print(f"Screen guard stats: {json.dumps(guard.stats())}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        guard.stop()
+
+if __name__ == "__main__":
+    main()
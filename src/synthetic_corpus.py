@@ -0,0 +1,242 @@
+# Synthetic screenshot corpus for benchmarks: IDE, terminal, browser and form layouts drawn
+# with OpenCV's built-in Hershey fonts (identical on every machine), with secrets planted at
+# known pixel boxes. Everything is derived from the seed, so a corpus is reproducible.
+#
+#   python synthetic_corpus.py --out corpus/ [--seed 7]   (writes PNGs + ground_truth.json)
+
+import argparse
+import json
+import os
+import random
+import string
+from typing import Dict, Iterator, List, NamedTuple, Tuple
+import numpy as np
+import cv2
+
+Box = Tuple[int, int, int, int]
+
+RESOLUTIONS = ((1280, 720), (1920, 1080), (2560, 1440), (3840, 2160))
+LAYOUTS = ("ide", "terminal", "browser", "form")
+
+class Planted(NamedTuple):
+    kind: str       # category the detector should report it under
+    text: str
+    box: Box        # cap-height box of the secret itself (no surrounding label)
+
+class Sample(NamedTuple):
+    name: str
+    layout: str
+    image: np.ndarray
+    planted: List[Planted]
+
+# -------------------- secrets --------------------
+_WORDS = ("alpha beta build cache client config deploy error event fetch handler index "
+          "item layout logger model module network page parser queue render request "
+          "result route schema server session status stream table target update user "
+          "value worker").split()
+_NAMES = ("jane john maria wei omar li sara noah ava liam".split(),
+          "doe smith garcia chen khan patel brown nguyen wilson lee".split())
+_DOMAINS = ("example.com", "mail.example.org", "corp.example.net")
+
+def _alnum(rng: random.Random, n: int, alphabet: str = string.ascii_letters + string.digits) -> str:
+    return "".join(rng.choice(alphabet) for _ in range(n))
+
+def _luhn_card(rng: random.Random) -> str:
+    digits = [4] + [rng.randrange(10) for _ in range(14)]
+    total = 0
+    for i, d in enumerate(reversed(digits)):
+        d = d * 2 if i % 2 == 0 else d
+        total += d - 9 if d > 9 else d
+    digits.append((10 - total % 10) % 10)
+    s = "".join(map(str, digits))
+    return " ".join(s[i:i + 4] for i in range(0, 16, 4))
+
+def make_secret(kind: str, rng: random.Random) -> str:
+    if kind == "email":
+        return f"{rng.choice(_NAMES[0])}.{rng.choice(_NAMES[1])}{rng.randrange(10, 99)}@{rng.choice(_DOMAINS)}"
+    if kind == "credit_card":
+        return _luhn_card(rng)
+    if kind == "phone":
+        return f"({rng.randrange(200, 999)}) 555-{rng.randrange(1000, 9999)}"
+    if kind == "api_key":
+        return rng.choice(("sk_live_", "pk_test_")) + _alnum(rng, 24)
+    if kind == "aws_key":
+        return "AKIA" + _alnum(rng, 16, string.ascii_uppercase + string.digits)
+    if kind == "token":
+        b64 = string.ascii_letters + string.digits + "_-"
+        return f"eyJhbGciOiJIUzI1NiJ9.eyJ{_alnum(rng, 12, b64)}.{_alnum(rng, 16, b64)}"
+    if kind == "password":
+        return rng.choice(("hunter", "Winter", "s3cret", "Tr0ub4dor")) + _alnum(rng, 4, string.digits)
+    raise ValueError(f"Unknown secret kind: {kind}")
+
+# detector category each planted kind is reported under
+CATEGORY = {"email": "email", "credit_card": "credit_card", "phone": "phone", "api_key": "api_key",
+            "aws_key": "api_key", "token": "token", "password": "password"}
+
+# -------------------- drawing --------------------
+class _Canvas:
+    """Text drawing that records the pixel box of every planted secret."""
+
+    def __init__(self, w: int, h: int, bg, scale: float):
+        self.img = np.full((h, w, 3), bg, dtype=np.uint8)
+        self.scale = scale
+        self.planted: List[Planted] = []
+
+    def _size(self, text: str, font: int, fs: float, th: int) -> Tuple[int, int]:
+        (w, h), _ = cv2.getTextSize(text, font, fs, th)
+        return w, h
+
+    def rect(self, x, y, w, h, color, filled=True):
+        cv2.rectangle(self.img, (int(x), int(y)), (int(x + w), int(y + h)), color, -1 if filled else max(1, int(self.scale)))
+
+    def text(self, x, y, s, color, size=0.6, font=cv2.FONT_HERSHEY_SIMPLEX, thickness=1):
+        """Draw s with its baseline at y; returns the x where the text ends."""
+        fs = size * self.scale
+        th = max(1, int(round(thickness * self.scale)))
+        cv2.putText(self.img, s, (int(x), int(y)), font, fs, color, th, cv2.LINE_AA)
+        return x + self._size(s, font, fs, th)[0]
+
+    def plant(self, x, y, prefix, kind, secret, suffix="", color=(0, 0, 0), size=0.6,
+              font=cv2.FONT_HERSHEY_SIMPLEX, thickness=1):
+        """
+        Draw prefix + secret + suffix on one line and record the secret's box. A secret
+        that would run off the image is left out (only the prefix is drawn).
+        """
+        fs = size * self.scale
+        th = max(1, int(round(thickness * self.scale)))
+        x0 = x + (self._size(prefix, font, fs, th)[0] if prefix else 0)
+        x1 = x + self._size(prefix + secret, font, fs, th)[0]
+        cap = self._size(secret, font, fs, th)[1]
+        if x1 > self.img.shape[1]:
+            self.text(x, y, prefix, color, size, font, thickness)
+            return
+        self.text(x, y, prefix + secret + suffix, color, size, font, thickness)
+        self.planted.append(Planted(CATEGORY[kind], secret, (int(x0), int(y - cap), int(x1 - x0), int(cap))))
+
+def _filler(rng: random.Random, n: int) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(n))
+
+# -------------------- layouts --------------------
+def _ide(c: _Canvas, rng: random.Random, w: int, h: int):
+    s = c.scale
+    side = int(w * 0.18)
+    c.rect(0, 0, side, h, (38, 37, 37))
+    c.rect(side, 0, w - side, int(36 * s), (45, 45, 45))
+    c.text(side + 16 * s, 24 * s, "settings.py", (220, 220, 220), 0.55)
+    for i, name in enumerate(("app.py", "settings.py", "models.py", "routes.py", "utils.py", "tests")):
+        c.text(18 * s, (70 + 30 * i) * s, name, (190, 190, 190), 0.5)
+    code = [
+        lambda y, x: c.text(x, y, "import os", (197, 134, 192)),
+        lambda y, x: c.plant(x, y, 'API_KEY = "', "api_key", make_secret("api_key", rng), '"', (206, 145, 120)),
+        lambda y, x: c.text(x, y, "def handler(event, context):", (220, 220, 170)),
+        lambda y, x: c.text(x, y, f"    return {{'status': 200, 'items': {rng.randrange(3, 40)}}}", (212, 212, 212)),
+        lambda y, x: c.plant(x, y, "aws_access_key_id = ", "aws_key", make_secret("aws_key", rng), "", (156, 220, 254)),
+        lambda y, x: c.plant(x, y, "# maintainer: ", "email", make_secret("email", rng), "", (106, 153, 85)),
+        lambda y, x: c.text(x, y, f"for i in range({rng.randrange(5, 50)}):", (197, 134, 192)),
+        lambda y, x: c.plant(x, y, 'headers = {"Authorization": "Bearer ', "token", make_secret("token", rng), '"}',
+                             (206, 145, 120)),
+        lambda y, x: c.text(x, y, f"    logger.info('{_filler(rng, 4)}')", (212, 212, 212)),
+    ]
+    y, line = 70 * s, 1
+    while y < h - 20 * s:
+        c.text(side + 10 * s, y, f"{line:3d}", (110, 110, 110), 0.5)
+        code[(line - 1) % len(code)](y, side + 70 * s)
+        y += 30 * s
+        line += 1
+
+def _terminal(c: _Canvas, rng: random.Random, w: int, h: int):
+    s = c.scale
+    prompt = "dev@build-box:~/project$ "
+    font = cv2.FONT_HERSHEY_DUPLEX
+    lines = [
+        lambda y: c.plant(14 * s, y, prompt + "export AWS_ACCESS_KEY_ID=", "aws_key", make_secret("aws_key", rng),
+                          "", (200, 200, 200), 0.55, font),
+        lambda y: c.text(14 * s, y, prompt + "git log --oneline -3", (200, 200, 200), 0.55, font),
+        lambda y: c.text(14 * s, y, f"{_alnum(rng, 7, '0123456789abcdef')} {_filler(rng, 5)}", (180, 180, 120), 0.55, font),
+        lambda y: c.plant(14 * s, y, prompt + "mysql -u admin --password=", "password", make_secret("password", rng),
+                          " prod", (200, 200, 200), 0.55, font),
+        lambda y: c.plant(14 * s, y, 'curl -H "Authorization: Bearer ', "token", make_secret("token", rng),
+                          '" api/v1/items', (200, 200, 200), 0.55, font),
+        lambda y: c.text(14 * s, y, f"OK: {rng.randrange(10, 900)} rows in {rng.randrange(1, 99)} ms", (120, 200, 120), 0.55, font),
+    ]
+    y, i = 30 * s, 0
+    while y < h - 10 * s:
+        lines[i % len(lines)](y)
+        y += 28 * s
+        i += 1
+
+def _browser(c: _Canvas, rng: random.Random, w: int, h: int):
+    s = c.scale
+    c.rect(0, 0, w, int(80 * s), (232, 232, 232))
+    c.rect(int(120 * s), int(44 * s), int(w * 0.6), int(28 * s), (255, 255, 255))
+    c.text(130 * s, 64 * s, "https://mail.example.com/inbox", (60, 60, 60), 0.5)
+    c.text(40 * s, 130 * s, "Inbox", (30, 30, 30), 1.0, thickness=2)
+    y = 180 * s
+    while y < h - 40 * s:
+        c.plant(40 * s, y, "From: ", "email", make_secret("email", rng), "", (40, 40, 40), 0.6)
+        c.text(40 * s, y + 28 * s, _filler(rng, 9), (90, 90, 90), 0.55)
+        if rng.random() < 0.4:
+            c.plant(40 * s, y + 56 * s, "Call me at ", "phone", make_secret("phone", rng), " tomorrow",
+                    (90, 90, 90), 0.55)
+        c.rect(30 * s, y + 70 * s, w - 60 * s, max(1, int(s)), (220, 220, 220))
+        y += 100 * s
+
+def _form(c: _Canvas, rng: random.Random, w: int, h: int):
+    s = c.scale
+    c.text(60 * s, 70 * s, "Checkout", (20, 20, 20), 1.1, thickness=2)
+    fields = [("Email", "email"), ("Phone", "phone"), ("Card number", "credit_card"),
+              ("Name on card", None), ("Password", "password")]
+    y, i = 130 * s, 0
+    while y < h - 60 * s:
+        label, kind = fields[i % len(fields)]
+        c.text(60 * s, y, label, (70, 70, 70), 0.55)
+        c.rect(60 * s, y + 10 * s, min(w - 120 * s, 620 * s), 40 * s, (150, 150, 150), filled=False)
+        if kind:
+            c.plant(72 * s, y + 38 * s, "", kind, make_secret(kind, rng), "", (20, 20, 20), 0.65)
+        else:
+            c.text(72 * s, y + 38 * s, f"{rng.choice(_NAMES[0]).title()} {rng.choice(_NAMES[1]).title()}",
+                   (20, 20, 20), 0.65)
+        y += 80 * s
+        i += 1
+
+_LAYOUTS = {"ide": (_ide, (30, 30, 30)), "terminal": (_terminal, (12, 12, 12)),
+            "browser": (_browser, (255, 255, 255)), "form": (_form, (250, 250, 250))}
+
+def render(layout: str, width: int, height: int, seed: int = 0) -> Sample:
+    """One screenshot of the layout at this resolution; text scales with height (HiDPI)."""
+    rng = random.Random(f"{layout}:{width}x{height}:{seed}")
+    draw, bg = _LAYOUTS[layout]
+    c = _Canvas(width, height, bg, height / 1080)
+    draw(c, rng, width, height)
+    return Sample(f"{layout}-{width}x{height}-{seed}", layout, c.img, c.planted)
+
+def iter_samples(resolutions=RESOLUTIONS, layouts=LAYOUTS, per_layout: int = 1, seed: int = 0) -> Iterator[Sample]:
+    """The corpus one screenshot at a time (only one image is held in memory)."""
+    for (w, h) in resolutions:
+        for layout in layouts:
+            for k in range(per_layout):
+                yield render(layout, w, h, seed * 1000 + k)
+
+def generate(resolutions=RESOLUTIONS, layouts=LAYOUTS, per_layout: int = 1, seed: int = 0) -> List[Sample]:
+    return list(iter_samples(resolutions, layouts, per_layout, seed))
+
+def ground_truth(samples: List[Sample]) -> Dict[str, list]:
+    return {s.name: [{"kind": p.kind, "text": p.text, "box": list(p.box)} for p in s.planted] for s in samples}
+
+def main():
+    parser = argparse.ArgumentParser(description="Write the synthetic screenshot corpus to a directory")
+    parser.add_argument("--out", required=True)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--per-layout", type=int, default=1)
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    samples = generate(per_layout=args.per_layout, seed=args.seed)
+    for sample in samples:
+        cv2.imwrite(os.path.join(args.out, f"{sample.name}.png"), sample.image)
+    with open(os.path.join(args.out, "ground_truth.json"), "w", encoding="utf-8") as f:
+        json.dump(ground_truth(samples), f, indent=1)
+    print(f"✓ Wrote {len(samples)} screenshots to {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# Fast text localization ahead of OCR: morphological gradient + Otsu + horizontal closing,
+# then connected components filtered by size and fill. Runs on a downscaled gray frame
+# and returns padded, merged rectangles in source-image pixels.
+
+import numpy as np
+import cv2
+from typing import List, Optional, Tuple
+
+Rect = Tuple[int, int, int, int]
+
+WORK_WIDTH = 1600          # frames wider than this are analysed at reduced size
+MIN_CHAR_HEIGHT = 6        # in work-image pixels
+MAX_LINE_HEIGHT = 120
+PAD = 6                    # padding around each proposal, in work-image pixels
+MAX_REGIONS = 24           # proposals are merged further until there are at most this many
+MAX_COVERAGE = 0.6         # above this share of the frame, OCR the whole frame instead
+
+def _merge_rects(rects: List[Rect], shape, grow: int) -> List[Rect]:
+    """Merge overlapping (or within `grow` px) rectangles by painting them and taking components."""
+    h, w = shape
+    mask = np.zeros((h, w), np.uint8)
+    for x, y, rw, rh in rects:
+        cv2.rectangle(mask, (max(0, x - grow), max(0, y - grow)),
+                      (min(w - 1, x + rw + grow), min(h - 1, y + rh + grow)), 255, -1)
+    n, _, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+    return [tuple(int(v) for v in s[:4]) for s in stats[1:n]]
+
+def _to_work_gray(img_bgr: np.ndarray) -> Tuple[np.ndarray, float]:
+    H, W = img_bgr.shape[:2]
+    s = min(1.0, WORK_WIDTH / float(W))
+    gray = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2GRAY) if img_bgr.ndim == 3 else img_bgr
+    if s < 1.0:
+        gray = cv2.resize(gray, (int(W * s), int(H * s)), interpolation=cv2.INTER_AREA)
+    return gray, s
+
+def _text_components(gray: np.ndarray) -> List[Rect]:
+    """Word/line-shaped connected components of the binarized morphological gradient."""
+    grad = cv2.morphologyEx(gray, cv2.MORPH_GRADIENT, cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3)))
+    bw = cv2.threshold(grad, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)[1]
+    joined = cv2.morphologyEx(bw, cv2.MORPH_CLOSE, cv2.getStructuringElement(cv2.MORPH_RECT, (9, 1)))
+
+    n, _, stats, _ = cv2.connectedComponentsWithStats(joined, connectivity=8)
+    integral = cv2.integral(bw // 255)
+    rects = []
+    for x, y, rw, rh, _ in stats[1:n]:
+        if rh < MIN_CHAR_HEIGHT or rh > MAX_LINE_HEIGHT or rw < MIN_CHAR_HEIGHT:
+            continue
+        filled = integral[y + rh, x + rw] - integral[y, x + rw] - integral[y + rh, x] + integral[y, x]
+        fill = filled / float(rw * rh)
+        # solid blocks (images, buttons) and hairlines are not text
+        if 0.1 <= fill <= 0.9:
+            rects.append((int(x), int(y), int(rw), int(rh)))
+    return rects
+
+def estimate_glyph_height(img_bgr: np.ndarray) -> Optional[float]:
+    """Median height of text-line components in source pixels, or None if no text-like structure."""
+    gray, s = _to_work_gray(img_bgr)
+    rects = _text_components(gray)
+    if not rects:
+        return None
+    return float(np.median([rh for _, _, _, rh in rects])) / s
+
+def propose_text_regions(img_bgr: np.ndarray, max_regions: int = MAX_REGIONS,
+                         max_coverage: float = MAX_COVERAGE) -> Optional[List[Rect]]:
+    """
+    Rectangles (x, y, w, h) in source pixels that likely contain text.
+    Returns [] for a frame with no text-like structure, and None when text covers so much
+    of the frame that OCRing it whole is cheaper than cutting it up. The filters can miss
+    real text (large headings, low contrast), so callers OCR the whole frame on [] as well.
+    """
+    H, W = img_bgr.shape[:2]
+    gray, s = _to_work_gray(img_bgr)
+    h, w = gray.shape
+    rects = _text_components(gray)
+    if not rects:
+        return []
+    grow = PAD
+    merged = _merge_rects(rects, (h, w), grow)
+    while len(merged) > max_regions and grow < max(h, w):
+        grow *= 2
+        merged = _merge_rects(merged, (h, w), grow)
+
+    area = sum(rw * rh for _, _, rw, rh in merged)
+    if area > max_coverage * h * w:
+        return None
+
+    inv = 1.0 / s
+    out = []
+    for x, y, rw, rh in merged:
+        x1, y1 = int(x * inv), int(y * inv)
+        x2, y2 = min(W, int(np.ceil((x + rw) * inv))), min(H, int(np.ceil((y + rh) * inv)))
+        out.append((x1, y1, x2 - x1, y2 - y1))
+    return out
@@ -0,0 +1,99 @@
+# Startup warm-up for the API server. Importing the app is cheap and has no side effects:
+# OCR engines, the OCR worker processes and the LLM client are all created on first use.
+# Warm-up makes that first use on a background thread once started (by the server entry
+# point, or the first /api/ready probe), so the first real request doesn't pay for it, and
+# /api/ready only reports ready once the required steps are done.
+#
+#   WARMUP=0               skip warm-up (ready at once; everything loads on the first request)
+#   WARMUP_OCR_WORKERS=0   warm this process's OCR engine only, not the OCR process pool
+
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+import metrics
+
+WARMUP = os.getenv("WARMUP", "1") == "1"
+WARMUP_OCR_WORKERS = os.getenv("WARMUP_OCR_WORKERS", "1") == "1"
+
+class Warmup:
+    """
+    Named steps run in order on one background thread. Required steps must succeed for the
+    process to be ready; an optional step that fails (the LLM client, say, which has the
+    regex fallback behind it) only marks the process degraded.
+    """
+
+    def __init__(self):
+        self.steps: List[Tuple[str, Callable[[], object], bool]] = []
+        self.results: Dict[str, dict] = {}
+        self.started_at: Optional[float] = None
+        self.elapsed: Optional[float] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+
+    def add(self, name: str, step: Callable[[], object], required: bool = True):
+        """step() -> optional JSON-able detail shown in status()"""
+        self.steps.append((name, step, required))
+        self.results[name] = {"status": "pending", "required": required}
+
+    def start(self, enabled: bool = WARMUP) -> "Warmup":
+        """Run the steps in the background (once; later calls are no-ops)."""
+        with self._lock:
+            if self._thread is not None or self._done.is_set():
+                return self
+            self.started_at = time.perf_counter()
+            if not enabled:
+                for result in self.results.values():
+                    result["status"] = "skipped"
+                self.elapsed = 0.0
+                self._done.set()
+                return self
+            self._thread = threading.Thread(target=self.run, name="warmup", daemon=True)
+            self._thread.start()
+        return self
+
+    def run(self):
+        for name, step, required in self.steps:
+            self.results[name] = {"status": "running", "required": required}
+            t0 = time.perf_counter()
+            try:
+                detail = step()
+                result = {"status": "ok"} if detail is None else {"status": "ok", "detail": detail}
+            except Exception as e:
+                metrics.error(f"warmup_{name}", e)
+                result = {"status": "failed", "error": type(e).__name__}
+            result.update(required=required, ms=round(1000 * (time.perf_counter() - t0), 1))
+            self.results[name] = result
+        self.elapsed = time.perf_counter() - self.started_at
+        self._done.set()
+        print(f"{'✓' if self.ready else '✗'} Warm-up finished in {self.elapsed:.1f}s ({self.state})")
+
+    @property
+    def state(self) -> str:
+        if self.started_at is None:
+            return "not started"
+        if not self._done.is_set():
+            return "warming"
+        results = list(self.results.values())
+        if any(r["status"] == "failed" and r["required"] for r in results):
+            return "failed"
+        if any(r["status"] == "failed" for r in results):
+            return "degraded"
+        return "ready"
+
+    @property
+    def ready(self) -> bool:
+        return self.state in ("ready", "degraded")
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until warm-up has finished (or timeout); returns ready."""
+        self._done.wait(timeout)
+        return self.ready
+
+    def status(self) -> dict:
+        return {"ready": self.ready, "state": self.state,
+                "elapsedMs": None if self.elapsed is None else round(1000 * self.elapsed, 1),
+                "steps": {name: dict(r) for name, r in self.results.items()}}
+
+warmup = Warmup()
@@ -0,0 +1,9 @@
+import os
+import sys
+
+# The server modules import each other flat from src/ (app.py, detector.py, ocr.py ...) while
+# detectors/ and schema are imported as src.*, so both roots go on the path.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (ROOT, os.path.join(ROOT, "src")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
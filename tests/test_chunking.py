@@ -0,0 +1,47 @@
+import pytest
+
+pytest.importorskip("pydantic")
+
+from src.detectors.chunking import chunk_lines, chunk_text, rebase_findings
+from src.detectors.fallback_regex import scan_text
+from src.schema import Finding
+
+TEXT = "\n".join([
+    "Account settings",
+    "email: jane.doe@example.com",
+    "",
+    "billing",
+    "card 4111 1111 1111 1111",
+    "ssn 123-45-6789",
+    "",
+    "notes " + "lorem ipsum " * 20,
+    "password: hunter22",
+])
+
+def test_chunks_cover_every_line_once_in_order():
+    chunks = chunk_text(TEXT, budget=20)
+    assert len(chunks) > 1
+    lines = TEXT.split("\n")
+    assert [i for c in chunks for i in c.lines] == list(range(len(lines)))
+    for c in chunks:
+        assert TEXT[c.offset:c.offset + len(c.text)] == c.text
+
+def test_paragraphs_stay_together_within_budget():
+    lines = ["a" * 8, "b" * 8, "c" * 8, "d" * 8]
+    chunks = chunk_lines(lines, keys=[0, 0, 1, 1], budget=6)
+    assert [c.lines for c in chunks] == [[0, 1], [2, 3]]
+
+def test_rebased_findings_index_the_original_text():
+    direct = {(f.kind, TEXT[f.start:f.end]) for f in scan_text(TEXT)}
+    rebased = []
+    for chunk in chunk_text(TEXT, budget=20):
+        rebased += rebase_findings(scan_text(chunk.text), chunk)
+    assert {(f.kind, TEXT[f.start:f.end]) for f in rebased} == direct
+    assert ("password", "hunter22") in direct
+
+def test_rebase_drops_spans_outside_the_chunk():
+    chunk = chunk_text(TEXT, budget=20)[1]
+    inside = Finding(kind="email", start=0, end=3, value_preview="***", confidence=0.9, reason="test")
+    outside = inside.model_copy(update={"end": len(chunk.text) + 1})
+    rebased = rebase_findings([inside, outside], chunk)
+    assert [(f.start, f.end) for f in rebased] == [(chunk.offset, chunk.offset + 3)]
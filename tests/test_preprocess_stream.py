@@ -0,0 +1,57 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+cv2 = pytest.importorskip("cv2")
+
+from ocr import preprocess_for_ocr
+from preprocess_stream import iter_preprocessed_strips, needs_streaming, preprocess_streaming
+
+TINY_BUDGET = 1     # forces the smallest tiles (64 rows), so every frame crosses many tile seams
+
+def screenshot(dark: bool) -> np.ndarray:
+    """A small editor-like frame: text lines over a soft gradient, light or dark theme."""
+    h, w = 320, 480
+    ramp = np.linspace(0, 40, w, dtype=np.float32)[None, :, None]
+    base = (30.0 if dark else 225.0) + (ramp if dark else -ramp)
+    img = np.clip(np.broadcast_to(base, (h, w, 3)), 0, 255).astype(np.uint8).copy()
+    ink = (230, 230, 230) if dark else (20, 20, 20)
+    for i, y in enumerate(range(24, h, 22)):
+        cv2.putText(img, f"line {i}: api_key = sk_live_{i:04d}abcdEFGH", (8, y),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, ink, 1, cv2.LINE_AA)
+    return img
+
+@pytest.mark.parametrize("dark", [False, True])
+@pytest.mark.parametrize("binarize", [None, "otsu", "adaptive"])
+def test_streamed_matches_in_memory_at_native_scale(dark, binarize):
+    img = screenshot(dark)
+    assert not needs_streaming(img.shape, 1.0)
+    whole = preprocess_for_ocr(img, upscale=1.0, binarize=binarize)
+    streamed = preprocess_streaming(img, upscale=1.0, binarize=binarize, budget=TINY_BUDGET)
+    assert streamed.shape == whole.shape
+    diff = np.abs(streamed.astype(np.int16) - whole.astype(np.int16))
+    if binarize is None:
+        assert diff.max() <= 1                  # LUT vs cv2.normalize rounding only
+    else:
+        assert (diff > 0).mean() <= 0.001
+
+@pytest.mark.parametrize("dark", [False, True])
+@pytest.mark.parametrize("binarize", [None, "otsu"])
+def test_streamed_matches_in_memory_when_scaled(dark, binarize):
+    # gray-then-resize (streamed) vs resize-then-gray (in memory) differ only by rounding
+    img = screenshot(dark)
+    whole = preprocess_for_ocr(img, upscale=1.5, binarize=binarize)
+    streamed = preprocess_streaming(img, upscale=1.5, binarize=binarize, budget=TINY_BUDGET)
+    assert streamed.shape == whole.shape
+    diff = np.abs(streamed.astype(np.int16) - whole.astype(np.int16))
+    if binarize is None:
+        assert diff.mean() < 1.0 and diff.max() <= 4
+    else:
+        assert (diff > 0).mean() <= 0.005
+
+def test_strips_reassemble_the_streamed_frame():
+    img = screenshot(dark=True)
+    streamed = preprocess_streaming(img, upscale=1.5, binarize="otsu")
+    rows = np.empty_like(streamed)
+    for strip, y0, own_y1, own_y2 in iter_preprocessed_strips(img, 100, 20, upscale=1.5, binarize="otsu"):
+        rows[own_y1:own_y2] = strip[own_y1 - y0:own_y2 - y0]
+    assert np.array_equal(rows, streamed)
@@ -0,0 +1,86 @@
+import random
+
+import pytest
+
+from aho_corasick import AhoCorasick
+
+def finditer_spans(text, query):
+    """Non-overlapping matches of query in text, like re.finditer, via str.find."""
+    spans, pos = [], 0
+    while True:
+        i = text.find(query, pos)
+        if i < 0:
+            return spans
+        spans.append((i, i + len(query)))
+        pos = i + len(query)
+
+def test_aho_corasick_finds_overlapping_patterns():
+    matcher = AhoCorasick(["he", "she", "hers", "his"])
+    found = {(s, e, matcher.patterns[pi]) for s, e, pi in matcher.iter_matches("ushers")}
+    assert found == {(1, 4, "she"), (2, 4, "he"), (2, 6, "hers")}
+
+def test_iter_line_matches_agrees_with_str_find():
+    rng = random.Random(7)
+    texts = ["".join(rng.choice("ab ") for _ in range(60)) for _ in range(20)]
+    queries = ["a", "ab", "aba", "bab", "b b", "aaa"]
+    got = {}
+    for ti, s, e, pi in AhoCorasick(queries).iter_line_matches(texts):
+        got.setdefault((ti, queries[pi]), []).append((s, e))
+    for ti, text in enumerate(texts):
+        for q in queries:
+            assert got.get((ti, q), []) == finditer_spans(text, q)
+
+# -------------------- OcrResult.find_spans --------------------
+LINES = [
+    "Login: Jane.Doe@Example.com",
+    "token token TOKEN tok",
+    "ends with end",
+    "start here",
+]
+
+def make_index():
+    pytest.importorskip("numpy")
+    pytest.importorskip("cv2")
+    from ocr import OcrResult
+    d = {k: [] for k in ("level", "page_num", "block_num", "par_num", "line_num", "word_num",
+                         "left", "top", "width", "height", "conf", "text")}
+    for li, line in enumerate(LINES):
+        x = 0
+        for wi, word in enumerate(line.split(" ")):
+            for k, v in (("level", 5), ("page_num", 1), ("block_num", 1), ("par_num", 1), ("line_num", li),
+                         ("word_num", wi), ("left", x), ("top", 20 * li), ("width", 8 * len(word)),
+                         ("height", 14), ("conf", 95.0), ("text", word)):
+                d[k].append(v)
+            x += 8 * (len(word) + 1)
+    return OcrResult(d)
+
+@pytest.mark.parametrize("case_sensitive", [False, True])
+def test_find_spans_matches_str_find_per_line(case_sensitive):
+    index = make_index()
+    queries = ["token", "tok", "oken t", "jane.doe@example.com", "Jane.Doe", "end", "e"]
+    spans = index.find_spans(queries, case_sensitive=case_sensitive)
+    for q in queries:
+        expected = []
+        for off, line in zip(index.line_starts, index.texts):
+            text, query = (line, q) if case_sensitive else (line.lower(), q.lower())
+            expected += [(off + s, off + e) for s, e in finditer_spans(text, query)]
+        assert spans[q] == expected, q
+        for s, e in spans[q]:
+            assert (index.text[s:e] == q) if case_sensitive else (index.text[s:e].lower() == q.lower())
+
+def test_find_spans_never_crosses_a_line_break():
+    index = make_index()
+    assert "end\nstart" in index.text
+    assert index.find_spans(["end\nstart", "end start"]) == {"end\nstart": [], "end start": []}
+
+def test_find_spans_whole_word():
+    index = make_index()
+    spans = index.find_spans(["tok", "token"], whole_word=True)
+    assert [index.text[s:e] for s, e in spans["tok"]] == ["tok"]
+    assert [index.text[s:e] for s, e in spans["token"]] == ["token", "token", "TOKEN"]
+
+def test_boxes_for_span_cover_the_matched_tokens():
+    index = make_index()
+    (s, e), = index.find_spans(["tok"], whole_word=True)["tok"]
+    assert index.boxes_for_span(s, e) == [(8 * len("token token TOKEN "), 20, 8 * 3, 14)]
+    assert index.find_all(["tok"], whole_word=True)["tok"] == index.boxes_for_span(s, e)